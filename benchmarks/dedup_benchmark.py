@@ -0,0 +1,80 @@
+"""Benchmark the PaperLibrary deduplication engines on synthetic libraries of growing size.
+
+Run from the repository root with `python -m benchmarks.dedup_benchmark`.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from syslira_tools.helpers.dedup import find_duplicates, find_near_duplicates
+
+ITEM_TYPES = np.array(["journalArticle", "conferencePaper", "preprint", "bookSection"])
+
+
+def make_library(n_rows: int, duplicate_share: float = 0.1, seed: int = 0) -> pd.DataFrame:
+    """Create a synthetic library where roughly duplicate_share of the rows repeat a title or DOI."""
+    rng = np.random.default_rng(seed)
+    n_unique = max(1, int(n_rows * (1 - duplicate_share)))
+    paper_ids = rng.integers(0, n_unique, n_rows)
+    paper_ids[:n_unique] = np.arange(n_unique)
+
+    titles = pd.Series(paper_ids).map(lambda i: f"A Study of Topic {i}: Methods and Results")
+    # vary casing and punctuation so that normalization is exercised
+    titles[rng.random(n_rows) < 0.5] = titles.str.upper()
+    dois = pd.Series(paper_ids).map(lambda i: f"https://doi.org/10.1000/{i}")
+    dois[rng.random(n_rows) < 0.3] = ""
+
+    return pd.DataFrame(
+        {
+            "title": titles.to_numpy(),
+            "DOI": dois.to_numpy(),
+            "itemType": ITEM_TYPES[rng.integers(0, len(ITEM_TYPES), n_rows)],
+        },
+        index=[f"W{i}" for i in range(n_rows)],
+    )
+
+
+def make_noisy_titles(n_rows: int, duplicate_share: float = 0.1, seed: int = 0) -> pd.DataFrame:
+    """Create a synthetic library where duplicate_share of the titles are noisy copies of others."""
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    vocabulary = np.array(["".join(rng.choice(letters, rng.integers(3, 11))) for _ in range(20_000)])
+    n_unique = int(n_rows * (1 - duplicate_share))
+    titles = [" ".join(vocabulary[rng.integers(0, len(vocabulary), rng.integers(5, 14))]) for _ in range(n_unique)]
+
+    noise = [str.upper, lambda t: t + ".", lambda t: t.title() + ": A Survey", lambda t: t.replace(" ", " &amp; ", 1)]
+    for original in rng.integers(0, n_unique, n_rows - n_unique):
+        titles.append(noise[rng.integers(0, len(noise))](titles[original]))
+
+    return pd.DataFrame({"title": titles}, index=[f"W{i}" for i in range(n_rows)])
+
+
+def run_near_duplicates(sizes=(10_000, 50_000, 200_000)):
+    print(f"{'rows':>10} {'seconds':>10} {'us/row':>10} {'dropped':>10}")
+    for n_rows in sizes:
+        library = make_noisy_titles(n_rows)
+        start = time.perf_counter()
+        to_drop = find_near_duplicates(library)
+        seconds = time.perf_counter() - start
+        print(f"{n_rows:>10} {seconds:>10.3f} {seconds / n_rows * 1e6:>10.2f} {int(to_drop.sum()):>10}")
+
+
+def run(sizes=(1_000, 10_000, 100_000, 1_000_000), repeats: int = 3):
+    print(f"{'rows':>10} {'seconds':>10} {'us/row':>10} {'dropped':>10}")
+    for n_rows in sizes:
+        library = make_library(n_rows)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            to_drop = find_duplicates(library)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{n_rows:>10} {best:>10.3f} {best / n_rows * 1e6:>10.2f} {int(to_drop.sum()):>10}")
+
+
+if __name__ == "__main__":
+    print("Exact title/DOI deduplication")
+    run()
+    print("Near-duplicate title deduplication (MinHash LSH)")
+    run_near_duplicates()
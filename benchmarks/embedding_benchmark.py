@@ -0,0 +1,74 @@
+"""Benchmark CPU embedding throughput of the vector store embeddings.
+
+Embeds synthetic paper chunks with CachedEmbeddings in several configurations (batch size, thread
+count, torch or ONNX backend, int8 quantization) and reports chunks per second, then the
+throughput of re-embedding the same chunks from the embedding cache. Requires
+sentence-transformers, and sentence-transformers[onnx] for the ONNX configurations.
+
+Run from the repository root with `python -m benchmarks.embedding_benchmark`.
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from syslira_tools.helpers.embedding_cache import EmbeddingCache
+from syslira_tools.helpers.embeddings import DEFAULT_EMBEDDING_MODEL, CachedEmbeddings
+
+WORDS = (
+    "model data method results learning analysis system approach performance network training "
+    "evaluation language generation simulation study framework task accuracy dataset"
+).split()
+
+
+def make_chunks(n_chunks: int, chunk_chars: int = 1000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    chunks = []
+    for i in range(n_chunks):
+        words = []
+        while sum(len(word) + 1 for word in words) < chunk_chars:
+            words.append(WORDS[rng.integers(len(WORDS))])
+        chunks.append(f"Chunk {i}. " + " ".join(words))
+    return chunks
+
+
+def run(n_chunks: int = 512):
+    chunks = make_chunks(n_chunks)
+    cores = os.cpu_count() or 1
+    configurations = [
+        {"batch_size": 32, "threads": cores},
+        {"batch_size": 64, "threads": cores},
+        {"batch_size": 64, "threads": max(cores // 2, 1)},
+        {"batch_size": 64, "threads": cores, "quantize": True},
+        {"batch_size": 64, "threads": cores, "backend": "onnx"},
+        {"batch_size": 64, "threads": cores, "backend": "onnx", "quantize": True},
+    ]
+    print(f"{n_chunks} chunks of ~1000 characters, {DEFAULT_EMBEDDING_MODEL}, {cores} cores")
+    print(f"{'configuration':>45} {'load s':>8} {'chunks/s':>10} {'cached/s':>10}")
+    for configuration in configurations:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            embeddings = CachedEmbeddings(cache=EmbeddingCache(cache_dir), **configuration)
+            try:
+                start = time.perf_counter()
+                embeddings.model
+                load_seconds = time.perf_counter() - start
+            except Exception as e:
+                print(f"{str(configuration):>45} unavailable: {e}")
+                continue
+            # warm up
+            embeddings.embed_query(chunks[0])
+
+            start = time.perf_counter()
+            embeddings.embed_documents(chunks)
+            seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            embeddings.embed_documents(chunks)
+            cached_seconds = time.perf_counter() - start
+        print(f"{str(configuration):>45} {load_seconds:>8.1f} {n_chunks / seconds:>10.1f} "
+              f"{n_chunks / cached_seconds:>10.0f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,70 @@
+"""Benchmark saving and loading a PaperLibrary with the parquet store versus CSV.
+
+Run from the repository root with `python -m benchmarks.library_store_benchmark`.
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from syslira_tools.const import UNION_COLUMNS
+from syslira_tools.helpers.library_store import load_library, save_library
+
+
+def make_library(n_rows: int, fulltext_chars: int = 5_000, seed: int = 0) -> pd.DataFrame:
+    """Create a synthetic library with nested creators, tags and relations and a full text per paper."""
+    rng = np.random.default_rng(seed)
+    ids = [f"https://openalex.org/W{i}" for i in range(n_rows)]
+    papers_df = pd.DataFrame(index=ids, columns=sorted(UNION_COLUMNS - {"id"}), dtype=str)
+    papers_df["id"] = ids
+    papers_df["title"] = [f"A Study of Topic {i}: Methods and Results" for i in range(n_rows)]
+    papers_df["DOI"] = [f"10.1000/{i}" for i in range(n_rows)]
+    papers_df["date"] = "2024-01-01"
+    papers_df["itemType"] = "journalArticle"
+    papers_df["abstractNote"] = "We study the topic with several methods and report results. " * 10
+    papers_df["creators"] = [
+        [{"creatorType": "author", "firstName": f"First{j}", "lastName": f"Last{i}"} for j in range(n)]
+        for i, n in enumerate(rng.integers(1, 8, n_rows))
+    ]
+    papers_df["tags"] = [[{"tag": "included"}] if i % 3 == 0 else [] for i in range(n_rows)]
+    papers_df["relations"] = [{} for _ in range(n_rows)]
+    papers_df["collections"] = [["ABCD1234"] for _ in range(n_rows)]
+    papers_df["fulltext"] = "Lorem ipsum dolor sit amet. " * (fulltext_chars // 28)
+    return papers_df
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def run(n_rows: int = 100_000):
+    papers_df = make_library(n_rows)
+    with tempfile.TemporaryDirectory() as directory:
+        store_path = os.path.join(directory, "library")
+        csv_path = os.path.join(directory, "library.csv")
+
+        _, save_seconds = timed(save_library, papers_df, store_path)
+        _, metadata_seconds = timed(load_library, store_path, fulltext=False)
+        _, full_seconds = timed(load_library, store_path)
+        _, csv_save_seconds = timed(papers_df.to_csv, csv_path)
+        _, csv_load_seconds = timed(pd.read_csv, csv_path, index_col=0)
+
+        print(f"{n_rows} papers")
+        print(f"{'format':>22} {'save s':>8} {'load s':>8} {'MiB':>8}")
+        print(f"{'parquet (metadata)':>22} {save_seconds:>8.2f} {metadata_seconds:>8.2f} "
+              f"{directory_size(store_path) / 1024 / 1024:>8.1f}")
+        print(f"{'parquet (+ fulltext)':>22} {'':>8} {full_seconds:>8.2f} {'':>8}")
+        print(f"{'csv':>22} {csv_save_seconds:>8.2f} {csv_load_seconds:>8.2f} "
+              f"{os.path.getsize(csv_path) / 1024 / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,43 @@
+"""Benchmark the OpenAlex select= projection: response bytes and JSON parse time per page.
+
+Requires network access to api.openalex.org. Run from the repository root with
+`python -m benchmarks.openalex_select_benchmark`.
+"""
+import json
+import time
+
+import requests
+from pyalex import Works
+
+from syslira_tools.const import OPENALEX_SELECT_FIELDS
+
+QUERY = {"title": "systematic literature review"}
+
+
+def fetch(url: str, per_page: int, pages: int):
+    """Fetch the first pages of a query, returning total bytes and JSON parse seconds."""
+    total_bytes = 0
+    parse_seconds = 0.0
+    for page in range(1, pages + 1):
+        response = requests.get(url, params={"per-page": per_page, "page": page}, timeout=60)
+        response.raise_for_status()
+        total_bytes += len(response.content)
+        start = time.perf_counter()
+        json.loads(response.content)
+        parse_seconds += time.perf_counter() - start
+    return total_bytes, parse_seconds
+
+
+def run(per_page: int = 200, pages: int = 5):
+    variants = {
+        "full objects": Works().search_filter(**QUERY).url,
+        "select": Works().search_filter(**QUERY).select(OPENALEX_SELECT_FIELDS).url,
+    }
+    print(f"{'variant':>14} {'KiB/page':>10} {'parse ms/page':>14}")
+    for name, url in variants.items():
+        total_bytes, parse_seconds = fetch(url, per_page, pages)
+        print(f"{name:>14} {total_bytes / pages / 1024:>10.1f} {parse_seconds / pages * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    run()
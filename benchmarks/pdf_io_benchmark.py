@@ -0,0 +1,66 @@
+"""Benchmark opening downloaded PDFs through temporary files versus from memory.
+
+Compares the former path of PaperLibrary (write the download to /tmp, open the file, delete it)
+with opening a memory-backed pymupdf Document, for a synthetic collection of PDFs. Parsing
+itself is the same for both paths and is left out.
+
+Run from the repository root with `python -m benchmarks.pdf_io_benchmark`.
+"""
+import os
+import tempfile
+import time
+
+import pymupdf
+
+LOREM = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 40
+
+
+def make_pdf(pages: int) -> bytes:
+    document = pymupdf.open()
+    for _ in range(pages):
+        document.new_page().insert_textbox(pymupdf.Rect(72, 72, 520, 770), LOREM)
+    return document.tobytes()
+
+
+def open_via_temp_file(content: bytes, directory: str, name: str) -> int:
+    path = os.path.join(directory, f"{name}.pdf")
+    with open(path, "wb") as f:
+        f.write(content)
+    with pymupdf.open(path) as document:
+        page_count = document.page_count
+        document.load_page(page_count - 1).get_text()
+    os.remove(path)
+    return page_count
+
+
+def open_in_memory(content: bytes) -> int:
+    with pymupdf.open(stream=content, filetype="pdf") as document:
+        page_count = document.page_count
+        document.load_page(page_count - 1).get_text()
+    return page_count
+
+
+def run(n_documents: int = 500, pages: int = 20):
+    contents = [make_pdf(pages + i % 10) for i in range(n_documents)]
+    total_bytes = sum(len(content) for content in contents)
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        for i, content in enumerate(contents):
+            open_via_temp_file(content, directory, f"A{i}")
+        temp_file_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for content in contents:
+        open_in_memory(content)
+    memory_seconds = time.perf_counter() - start
+
+    print(f"{n_documents} PDFs, {total_bytes / 1024 / 1024:.1f} MiB")
+    print(f"{'path':>12} {'seconds':>10} {'ms/PDF':>10} {'MiB written':>12}")
+    print(f"{'temp file':>12} {temp_file_seconds:>10.3f} {temp_file_seconds / n_documents * 1000:>10.2f} "
+          f"{total_bytes / 1024 / 1024:>12.1f}")
+    print(f"{'in memory':>12} {memory_seconds:>10.3f} {memory_seconds / n_documents * 1000:>10.2f} {0:>12.1f}")
+
+
+if __name__ == "__main__":
+    run()
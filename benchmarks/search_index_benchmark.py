@@ -0,0 +1,67 @@
+"""Benchmark building, querying and persisting the BM25 search index of PaperLibrary.
+
+Indexes a synthetic library whose words follow a Zipf distribution, so that frequent words have
+long postings as in real abstracts and full texts.
+
+Run from the repository root with `python -m benchmarks.search_index_benchmark`.
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from syslira_tools.helpers.search_index import BM25Index
+
+
+def make_documents(n_documents: int, vocabulary_size: int = 50_000, fulltext_words: int = 300, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f"word{i}" for i in range(vocabulary_size)])
+
+    def text(n_words):
+        return " ".join(vocabulary[np.minimum(rng.zipf(1.2, n_words), vocabulary_size) - 1])
+
+    return [
+        {"title": text(10), "abstractNote": text(150), "fulltext": text(fulltext_words)}
+        for _ in range(n_documents)
+    ]
+
+
+def run(n_documents: int = 100_000, n_queries: int = 200):
+    documents = make_documents(n_documents)
+    index = BM25Index()
+    start = time.perf_counter()
+    index.add_many([f"W{i}" for i in range(n_documents)], documents)
+    build_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(1)
+    queries = [
+        " ".join(f"word{word}" for word in rng.integers(0, 2_000, rng.integers(1, 6)))
+        for _ in range(n_queries)
+    ]
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, k=10)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "search_index.npz")
+        start = time.perf_counter()
+        index.save(path)
+        save_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        BM25Index.load(path)
+        load_seconds = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+    print(f"{n_documents} documents, {len(index._postings)} terms")
+    print(f"build {build_seconds:.1f} s, save {save_seconds:.2f} s, load {load_seconds:.2f} s, "
+          f"{size / 1024 / 1024:.1f} MiB")
+    print(f"query latency ms: median {np.median(latencies):.1f}, p95 {np.percentile(latencies, 95):.1f}, "
+          f"max {latencies.max():.1f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,4 +1,5 @@
 from syslira_tools import ZoteroClient, OpenAlexClient, PaperLibrary
+from syslira_tools.helpers.pdf_parsing import BatchPdfParser, DEFAULT_MAX_MEMORY_MB, DEFAULT_TIMEOUT
 from loguru import logger
 import os
 
@@ -22,15 +23,23 @@ def get_paper_collection(collection_key, get_fulltext=True):
     openalex_client = OpenAlexClient()
     openalex_client.init()
 
+    # Parse PDFs in worker processes, limiting the time and memory per document
+    pdf_parser = BatchPdfParser(
+        timeout=float(os.environ.get("PDF_PARSE_TIMEOUT", DEFAULT_TIMEOUT)),
+        max_memory_mb=int(os.environ.get("PDF_PARSE_MAX_MEMORY_MB", DEFAULT_MAX_MEMORY_MB)),
+    )
+
     # Set up paper library
     paper_library = PaperLibrary(
         zotero_client=zotero_client,
         openalex_client=openalex_client,
         collection_key=collection_key,
+        pdf_parser=pdf_parser,
     )
 
     # get papers
-    result = paper_library.update_from_zotero(get_fulltext=get_fulltext, deduplicate=False)
+    with pdf_parser:
+        result = paper_library.update_from_zotero(get_fulltext="parsed" if get_fulltext else None, deduplicate=False)
     logger.info(result)
 
     return paper_library.get_library_df()
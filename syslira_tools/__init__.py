@@ -1,4 +1,6 @@
+from .clients.local_zotero_client import LocalZoteroClient
 from .clients.openalex_client import OpenAlexClient
 from .clients.paper_library import PaperLibrary
 from .clients.scopus_client import ScopusClient
+from .clients.sqlite_paper_library import SQLitePaperLibrary
 from .clients.zotero_client import ZoteroClient
\ No newline at end of file
@@ -1,4 +1,6 @@
+from .local_zotero_client import LocalZoteroClient
 from .openalex_client import OpenAlexClient
 from .paper_library import PaperLibrary
 from .scopus_client import ScopusClient
+from .sqlite_paper_library import SQLitePaperLibrary
 from .zotero_client import ZoteroClient
\ No newline at end of file
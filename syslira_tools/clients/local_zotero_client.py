@@ -0,0 +1,465 @@
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from syslira_tools.clients.zotero_client import DOWNLOAD_CHUNK_SIZE, PDF_CONTENT_TYPE, ZoteroClient
+
+# Default Zotero data directory of a workstation
+DEFAULT_ZOTERO_DATA_DIR = os.path.join(os.path.expanduser("~"), "Zotero")
+# linkMode values of itemAttachments, as named by the web API
+LINK_MODES = {0: "imported_file", 1: "imported_url", 2: "linked_file", 3: "linked_url", 4: "embedded_image"}
+# Full text extracted by Zotero, in the storage folder of an attachment
+FULLTEXT_CACHE_FILE = ".zotero-ft-cache"
+# Child items and their parents; annotations are only in newer databases
+_CHILD_ITEMS = """
+SELECT itemID, parentItemID FROM itemAttachments WHERE parentItemID IS NOT NULL
+UNION ALL SELECT itemID, parentItemID FROM itemNotes WHERE parentItemID IS NOT NULL
+"""
+_CHILD_ANNOTATIONS = "UNION ALL SELECT itemID, parentItemID FROM itemAnnotations"
+# Modification time of an item or deletion as Unix time, the versions of the local client
+_EPOCH = "CAST(strftime('%s', {}) AS INTEGER)"
+
+
+def _api_date(timestamp: Optional[str]) -> Optional[str]:
+    """Convert a database timestamp (UTC) to the ISO format of the web API."""
+    return f"{timestamp.replace(' ', 'T')}Z" if timestamp else timestamp
+
+
+class LocalZoteroClient(ZoteroClient):
+    """
+    Read-only client for a local Zotero data directory, with the interface of ZoteroClient.
+
+    Items, collections, creators, tags, attachments and full texts are read from zotero.sqlite
+    and the storage folder without the web API, so loading the whole library takes milliseconds
+    and is not rate limited. Items are returned in the JSON format of the web API.
+
+    Zotero locks its database while it is running; point db_path at a copy of zotero.sqlite
+    (e.g. the zotero.sqlite.bak Zotero keeps) in that case. The database is opened read-only.
+
+    The library and item versions of this client are the Unix times of the last local change, so
+    they also advance in libraries that are never synced, but cannot be compared with the versions
+    of the web API: sync with incremental=False after switching between the clients. Items deleted
+    from the trash are reported as deleted until Zotero has synced their deletion.
+    """
+
+    def __init__(
+        self,
+        data_dir: Optional[str] = None,
+        db_path: Optional[str] = None,
+        storage_path: Optional[str] = None,
+        library_id: Optional[str] = None,
+        library_type: str = "user",
+        linked_attachment_base_dir: Optional[str] = None,
+    ):
+        """
+        Initialize the client attributes.
+
+        Args:
+            data_dir: Zotero data directory (default: ~/Zotero).
+            db_path: Zotero database (default: zotero.sqlite in the data directory).
+            storage_path: Storage folder of the attachments (default: storage in the data directory).
+            library_id: Group ID of a group library; the user library needs none.
+            library_type: The type of library (user or group).
+            linked_attachment_base_dir: Base directory of linked files with relative paths, as
+                set in the Zotero preferences.
+        """
+        super().__init__(api_key=None, library_id=library_id, library_type=library_type)
+        self.data_dir = data_dir or DEFAULT_ZOTERO_DATA_DIR
+        self.db_path = db_path or os.path.join(self.data_dir, "zotero.sqlite")
+        self.storage_path = storage_path or os.path.join(self.data_dir, "storage")
+        self.linked_attachment_base_dir = linked_attachment_base_dir
+        self._lock = threading.Lock()
+        self._library_db_id: Optional[int] = None
+        self._child_items = _CHILD_ITEMS
+
+    def init(self, reinit: bool = False) -> str:
+        """
+        Open the Zotero database.
+
+        Args:
+            reinit: Whether to reopen the database if it is already open.
+
+        Returns:
+            str: Message indicating the client has been initialized.
+        """
+        if self.client and not reinit:
+            return "Zotero client already initialized."
+
+        if self.library_type not in ["user", "group"]:
+            raise ValueError("library_type must be 'user' or 'group'")
+        if not os.path.exists(self.db_path):
+            raise ValueError(f"Zotero database {self.db_path} not found.")
+
+        if self.client:
+            self.client.close()
+        self.client = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+        tables = {row[0] for row in self.client.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self._child_items = _CHILD_ITEMS + (_CHILD_ANNOTATIONS if "itemAnnotations" in tables else "")
+
+        if self.library_type == "user":
+            row = self.client.execute("SELECT libraryID FROM libraries WHERE type = 'user'").fetchone()
+        else:
+            if not self.library_id:
+                raise ValueError("Library ID is required for a group library.")
+            row = self.client.execute("SELECT libraryID FROM groups WHERE groupID = ?", (int(self.library_id),)).fetchone()
+        if row is None:
+            raise ValueError(f"No {self.library_type} library found in {self.db_path}.")
+        self._library_db_id = row[0]
+
+        return "Zotero client initialized."
+
+    def close(self):
+        """Close the Zotero database."""
+        if self.client:
+            self.client.close()
+            self.client = None
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[Tuple]:
+        with self._lock:
+            return self.client.execute(sql, tuple(params)).fetchall()
+
+    def _items(self, where: str = "1", params: Iterable[Any] = ()) -> List[Dict]:
+        """
+        Load the items of the library matching a condition on the items table.
+
+        Args:
+            where: SQL condition on the columns of items.
+            params: Parameters of the condition.
+
+        Returns:
+            list: Items in the JSON format of the web API, ordered by date added.
+        """
+        selected = f"SELECT itemID FROM items WHERE libraryID = ? AND ({where})"
+        params = (self._library_db_id, *params)
+        rows = self._query(
+            f"""
+            SELECT items.itemID, items.key, {_EPOCH.format('clientDateModified')}, typeName, dateAdded, dateModified
+            FROM items JOIN itemTypesCombined USING (itemTypeID)
+            WHERE items.itemID IN ({selected}) ORDER BY dateAdded, items.itemID
+            """,
+            params,
+        )
+        items = {}
+        for item_id, key, version, item_type, date_added, date_modified in rows:
+            items[item_id] = {
+                "key": key,
+                "version": version,
+                "library": {"type": self.library_type, "id": self.library_id},
+                "data": {
+                    "key": key,
+                    "version": version,
+                    "itemType": item_type,
+                    "dateAdded": _api_date(date_added),
+                    "dateModified": _api_date(date_modified),
+                },
+            }
+        if not items:
+            return []
+        datas = {item_id: item["data"] for item_id, item in items.items()}
+        for data in datas.values():
+            if data["itemType"] not in ("attachment", "note", "annotation"):
+                data["creators"] = []
+            data.update(tags=[], collections=[], relations={})
+
+        for item_id, field, value in self._query(
+            f"""
+            SELECT itemID, fieldName, value FROM itemData
+            JOIN fieldsCombined USING (fieldID) JOIN itemDataValues USING (valueID)
+            WHERE itemID IN ({selected})
+            """,
+            params,
+        ):
+            datas[item_id][field] = value
+
+        for item_id, creator_type, first_name, last_name, field_mode in self._query(
+            f"""
+            SELECT itemID, creatorType, firstName, lastName, fieldMode FROM itemCreators
+            JOIN creators USING (creatorID) JOIN creatorTypes USING (creatorTypeID)
+            WHERE itemID IN ({selected}) ORDER BY itemID, orderIndex
+            """,
+            params,
+        ):
+            if field_mode == 1:
+                creator = {"creatorType": creator_type, "name": last_name}
+            else:
+                creator = {"creatorType": creator_type, "firstName": first_name, "lastName": last_name}
+            datas[item_id].setdefault("creators", []).append(creator)
+
+        for item_id, name, tag_type in self._query(
+            f"SELECT itemID, name, type FROM itemTags JOIN tags USING (tagID) WHERE itemID IN ({selected})", params
+        ):
+            datas[item_id].setdefault("tags", []).append({"tag": name, "type": tag_type} if tag_type else {"tag": name})
+
+        for item_id, collection_key in self._query(
+            f"""
+            SELECT itemID, collections.key FROM collectionItems JOIN collections USING (collectionID)
+            WHERE itemID IN ({selected})
+            """,
+            params,
+        ):
+            datas[item_id].setdefault("collections", []).append(collection_key)
+
+        for item_id, parent_key in self._query(
+            f"""
+            SELECT children.itemID, items.key FROM ({self._child_items}) AS children
+            JOIN items ON items.itemID = children.parentItemID
+            WHERE children.itemID IN ({selected})
+            """,
+            params,
+        ):
+            datas[item_id]["parentItem"] = parent_key
+
+        for item_id, link_mode, content_type, charset, path, mtime, md5 in self._query(
+            f"""
+            SELECT itemID, linkMode, contentType, charset, path, storageModTime, storageHash
+            FROM itemAttachments LEFT JOIN charsets USING (charsetID)
+            WHERE itemID IN ({selected})
+            """,
+            params,
+        ):
+            data = datas[item_id]
+            data.update(linkMode=LINK_MODES.get(link_mode), contentType=content_type or "", charset=charset or "")
+            if path and path.startswith("storage:"):
+                data.update(filename=path[len("storage:"):], md5=md5, mtime=mtime)
+            elif path:
+                data["path"] = path
+
+        for item_id, note in self._query(f"SELECT itemID, note FROM itemNotes WHERE itemID IN ({selected})", params):
+            datas[item_id]["note"] = note or ""
+
+        for (item_id,) in self._query(f"SELECT itemID FROM deletedItems WHERE itemID IN ({selected})", params):
+            datas[item_id]["deleted"] = 1
+
+        return list(items.values())
+
+    def _top_level_condition(self, collection_key: Optional[str] = None, top: bool = True) -> Tuple[str, List[Any]]:
+        """SQL condition on items selecting the items, not in the trash, of a collection or the library."""
+        conditions = ["itemID NOT IN (SELECT itemID FROM deletedItems)"]
+        params = []
+        if top:
+            conditions.append(f"itemID NOT IN (SELECT itemID FROM ({self._child_items}))")
+        if collection_key:
+            in_collection = (
+                "SELECT itemID FROM collectionItems JOIN collections USING (collectionID) "
+                "WHERE collections.key = ? AND collections.libraryID = ?"
+            )
+            # child items are listed with the collections of their parents, as by the web API
+            conditions.append(
+                f"(itemID IN ({in_collection}) OR itemID IN "
+                f"(SELECT itemID FROM ({self._child_items}) WHERE parentItemID IN ({in_collection})))"
+            )
+            params.extend([collection_key, self._library_db_id] * 2)
+        return " AND ".join(conditions), params
+
+    def _library_version(self) -> int:
+        """
+        Unix time of the last change of an item of the library, including deletions.
+
+        Timestamps only have whole seconds, so a change in the current second can still be followed
+        by another one with the same timestamp; the version is at most the last completed second,
+        so the changes of the current second are fetched again with the next sync.
+        """
+        return self._query(
+            f"""
+            SELECT MIN(MAX(COALESCE((SELECT MAX({_EPOCH.format('clientDateModified')}) FROM items WHERE libraryID = ?), 0),
+                           COALESCE((SELECT MAX({_EPOCH.format('dateDeleted')}) FROM syncDeleteLog WHERE libraryID = ?), 0)),
+                       {_EPOCH.format("'now'")} - 1)
+            """,
+            (self._library_db_id, self._library_db_id),
+        )[0][0]
+
+    def get_all_items(self, collection_key: Optional[str] = None):
+        """Get all top-level items of a collection, or of the library."""
+        return self._items(*self._top_level_condition(collection_key))
+
+    def get_items_since(self, collection_key: Optional[str] = None, since: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """
+        Get the top-level items changed since a library version, see ZoteroClient.get_items_since
+        and the versions of this client.
+        """
+        version = self._library_version()
+        where, params = self._top_level_condition(collection_key)
+        if since is not None:
+            where += f" AND {_EPOCH.format('clientDateModified')} > ?"
+            params.append(since)
+        return self._items(where, params), version
+
+    def get_deleted_item_keys(self, since: int) -> List[str]:
+        """Get the keys of the items deleted since a library version, whose deletion was not synced yet."""
+        return [row[0] for row in self._query(
+            f"""
+            SELECT key FROM syncDeleteLog JOIN syncObjectTypes USING (syncObjectTypeID)
+            WHERE name = 'item' AND libraryID = ? AND {_EPOCH.format('dateDeleted')} > ?
+            """,
+            (self._library_db_id, since),
+        )]
+
+    def get_changed_item_versions(self, since: int) -> Dict[str, int]:
+        """Get the keys and versions of all items changed since a library version, including trashed items."""
+        return dict(self._query(
+            f"SELECT key, {_EPOCH.format('clientDateModified')} FROM items "
+            f"WHERE libraryID = ? AND {_EPOCH.format('clientDateModified')} > ?",
+            (self._library_db_id, since),
+        ))
+
+    def get_changed_attachment_parents(self, since: int) -> Set[str]:
+        """Get the keys of the items whose attachments changed since a library version."""
+        return {row[0] for row in self._query(
+            f"""
+            SELECT parents.key FROM itemAttachments
+            JOIN items ON items.itemID = itemAttachments.itemID
+            JOIN items AS parents ON parents.itemID = itemAttachments.parentItemID
+            WHERE items.libraryID = ? AND {_EPOCH.format('items.clientDateModified')} > ?
+            """,
+            (self._library_db_id, since),
+        )}
+
+    def get_items_by_key(self, item_keys: Iterable[str]) -> List[Dict]:
+        """Get items by key."""
+        item_keys = list(item_keys)
+        items = []
+        # stay below SQLite's limit of query parameters
+        for start in range(0, len(item_keys), 500):
+            batch = item_keys[start:start + 500]
+            items.extend(self._items(f"key IN ({', '.join('?' * len(batch))})", batch))
+        return items
+
+    def get_item(self, item_key: str):
+        """Get a specific item by key."""
+        items = self._items("key = ?", (item_key,))
+        if not items:
+            raise ValueError(f"Item {item_key} not found in {self.db_path}.")
+        return items[0]
+
+    def get_collection_items(self, collection_key: str):
+        """Get all items of a collection, including child items."""
+        return self._items(*self._top_level_condition(collection_key, top=False))
+
+    def get_collections(self) -> List[Dict]:
+        """Get all collections of the library, in the JSON format of the web API."""
+        rows = self._query(
+            """
+            SELECT collections.key, collections.version, collections.collectionName, parents.key,
+                (SELECT COUNT(*) FROM collectionItems WHERE collectionID = collections.collectionID)
+            FROM collections LEFT JOIN collections AS parents ON parents.collectionID = collections.parentCollectionID
+            WHERE collections.libraryID = ? ORDER BY collections.collectionName
+            """,
+            (self._library_db_id,),
+        )
+        return [
+            {
+                "key": key,
+                "version": version,
+                "meta": {"numItems": num_items},
+                "data": {"key": key, "version": version, "name": name, "parentCollection": parent_key or False},
+            }
+            for key, version, name, parent_key, num_items in rows
+        ]
+
+    def search_items(self, query: str):
+        """Search the top-level items by title, creator and year, like the quick search of the web API."""
+        pattern = f"%{query}%"
+        where, params = self._top_level_condition()
+        return self._items(
+            f"""
+            {where} AND (
+                itemID IN (
+                    SELECT itemID FROM itemData JOIN fieldsCombined USING (fieldID) JOIN itemDataValues USING (valueID)
+                    WHERE fieldName IN ('title', 'date') AND value LIKE ?
+                )
+                OR itemID IN (
+                    SELECT itemID FROM itemCreators JOIN creators USING (creatorID)
+                    WHERE lastName LIKE ? OR firstName LIKE ?
+                )
+            )
+            """,
+            [*params, pattern, pattern, pattern],
+        )
+
+    def get_pdf_attachments(self, collection_key: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """Get the PDF attachments of all items of a collection, or of the library, by parent key."""
+        where, params = self._top_level_condition(collection_key, top=False)
+        attachments = {}
+        for item in self._items(f"{where} AND itemID IN (SELECT itemID FROM itemAttachments WHERE contentType = ?)",
+                                [*params, PDF_CONTENT_TYPE]):
+            if item["data"].get("parentItem"):
+                attachments.setdefault(item["data"]["parentItem"], []).append(self.attachment_info(item))
+        return attachments
+
+    def get_children(self, item_key: str):
+        """Get children of an item (e.g., attachments)."""
+        return self._items(
+            f"itemID IN (SELECT children.itemID FROM ({self._child_items}) AS children "
+            f"JOIN items ON items.itemID = children.parentItemID WHERE items.key = ?)",
+            (item_key,),
+        )
+
+    def get_fulltext(self, item_key: str):
+        """
+        Get the full text Zotero extracted from an attachment.
+
+        Returns:
+            dict: The content with the indexed and total pages (PDFs) or characters (other files).
+        """
+        path = os.path.join(self.storage_path, item_key, FULLTEXT_CACHE_FILE)
+        if not os.path.exists(path):
+            raise ValueError(f"No full text of item {item_key} in {self.storage_path}.")
+        with open(path, encoding="utf-8") as f:
+            fulltext = {"content": f.read()}
+        rows = self._query(
+            """
+            SELECT indexedPages, totalPages, indexedChars, totalChars FROM fulltextItems
+            JOIN items USING (itemID) WHERE items.key = ? AND items.libraryID = ?
+            """,
+            (item_key, self._library_db_id),
+        )
+        if rows:
+            indexed_pages, total_pages, indexed_chars, total_chars = rows[0]
+            if total_pages is not None:
+                fulltext.update(indexedPages=indexed_pages, totalPages=total_pages)
+            else:
+                fulltext.update(indexedChars=indexed_chars, totalChars=total_chars)
+        return fulltext
+
+    def get_file_path(self, item_key: str) -> str:
+        """
+        Get the path of the file of an attachment, in the storage folder or linked.
+
+        Raises:
+            ValueError: If the attachment has no file or the file does not exist.
+        """
+        data = self.get_item(item_key)["data"]
+        if data.get("filename"):
+            path = os.path.join(self.storage_path, item_key, data["filename"])
+        elif data.get("path", "").startswith("attachments:"):
+            if not self.linked_attachment_base_dir:
+                raise ValueError(f"linked_attachment_base_dir is required for the file of item {item_key}.")
+            path = os.path.join(self.linked_attachment_base_dir, data["path"][len("attachments:"):])
+        elif data.get("path"):
+            path = data["path"]
+        else:
+            raise ValueError(f"Item {item_key} has no file.")
+        if not os.path.exists(path):
+            raise ValueError(f"File {path} of item {item_key} not found.")
+        return path
+
+    def get_file(self, item_key: str) -> bytes:
+        """Get the file of an attachment."""
+        with open(self.get_file_path(item_key), "rb") as f:
+            return f.read()
+
+    def download_file(self, item_key: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> bytearray:
+        """Read the file of an attachment into a buffer, see ZoteroClient.download_file."""
+        path = self.get_file_path(item_key)
+        buffer = bytearray(os.path.getsize(path))
+        with open(path, "rb") as f:
+            size = f.readinto(buffer)
+        del buffer[size:]
+        return buffer
+
+    def _read_only(self, *args, **kwargs):
+        raise ValueError("LocalZoteroClient is read-only, use ZoteroClient to write to Zotero.")
+
+    create_items = update_item = write_items = check_items = item_template = _read_only
+    add_to_collection = create_new_collections = _read_only
@@ -1,22 +1,65 @@
+import functools
+import math
 import os
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import pyalex
+import requests
 from pyalex import Works, Authors
-import time
+from pyalex.api import BaseOpenAlex, OpenAlexResponseList
+
+from syslira_tools.const import OPENALEX_SELECT_FIELDS
+from syslira_tools.helpers.dedup import normalize_doi
+from syslira_tools.helpers.rate_limit import RateLimiter
+from syslira_tools.helpers.response_cache import ResponseCache
+
+# Maximum page size allowed by the API
+MAX_PER_PAGE = 200
+# Page-based paging only reaches the first 10,000 results of a query
+MAX_PAGED_RESULTS = 10000
+# Maximum number of values in a single OR filter
+MAX_OR_VALUES = 100
+# Upper bound for concurrent requests, the polite pool allows 10 requests per second
+MAX_WORKERS = 10
 
 
 class OpenAlexClient:
     """Client for interacting with the OpenAlex API via pyalex."""
 
-    def __init__(self, email: Optional[str] = None):
+    def __init__(
+        self,
+        email: Optional[str] = None,
+        max_workers: int = 1,
+        requests_per_second: float = 10.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        offline: bool = False,
+        select: Optional[List[str]] = OPENALEX_SELECT_FIELDS,
+    ):
         """
         Initialize the OpenAlex client.
 
         Args:
             email: Email to identify your API requests (polite pool).
+            max_workers: Number of concurrent requests when fetching multiple pages
+                (default: 1 for sequential requests, capped at MAX_WORKERS).
+            requests_per_second: Request budget shared by all methods of the client.
+            rate_limiter: Rate limiter to use instead of one created from requests_per_second,
+                e.g. to share a budget between clients.
+            cache: Response cache to serve repeated requests from (default: no caching).
+            offline: Whether to serve requests only from the cache, never from the network.
+            select: Default field projection for returned works (default: the fields PaperLibrary
+                reads, see const.OPENALEX_SELECT_FIELDS; None or empty for full work objects).
         """
+        if offline and cache is None:
+            raise ValueError("Offline mode requires a response cache.")
         self.initialized = False
         self.email = email if email else os.environ.get("OPENALEX_EMAIL")
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter or RateLimiter(requests_per_second=requests_per_second)
+        self.cache = cache
+        self.offline = offline
+        self.select = select
 
     def init(self) -> str:
         """Initialize the OpenAlex client with the provided credentials."""
@@ -27,6 +70,57 @@ class OpenAlexClient:
 
         return "OpenAlex client initialized."
 
+    def get_request_metrics(self) -> Dict[str, int]:
+        """Get the number of requests, retries, throttled responses and failed calls so far."""
+        return self.rate_limiter.metrics
+
+    def _request(self, fn, *args, **kwargs) -> Any:
+        """Send a single API request through the rate limiter, retrying retryable failures."""
+        return self.rate_limiter.call(fn, *args, **kwargs)
+
+    @staticmethod
+    def _without_retries(query: BaseOpenAlex) -> BaseOpenAlex:
+        """
+        Send the requests of a pyalex query through a session without retries. The session of
+        pyalex retries throttled responses itself and then raises RetryErrors without a status, so
+        retries are left to the rate limiter; pyalex.config stays untouched for other users.
+        """
+        query._get_from_url = functools.partial(type(query)._get_from_url, query, session=requests.Session())
+        return query
+
+    def _get_cached(self, key: str, url: str, fetch) -> Any:
+        """Serve a JSON serializable response from the cache, or fetch and cache it."""
+        if self.cache is None:
+            return fetch()
+
+        # offline, expired responses are still the best data there is
+        cached = self.cache.get(key, allow_expired=self.offline)
+        if cached is not None:
+            return cached
+        if self.offline:
+            raise ValueError(f"Response for {url} is not cached, cannot request it in offline mode.")
+
+        response = fetch()
+        self.cache.set(key, response)
+        return response
+
+    def _get(self, query: BaseOpenAlex, **params) -> List[Dict[str, Any]]:
+        """Get a list of results for a pyalex query, with page, per_page or cursor params."""
+        query = self._without_retries(query)
+        if self.cache is None:
+            return self._request(query.get, **params)
+
+        # the URL holds endpoint, search, filter and select; paging params are added by get
+        url = query.url
+        key = ResponseCache.make_key(url, params)
+
+        def fetch() -> Dict[str, Any]:
+            results = self._request(query.get, **params)
+            return {"results": list(results), "meta": results.meta}
+
+        response = self._get_cached(key, url, fetch)
+        return OpenAlexResponseList(response["results"], response["meta"], query.resource_class)
+
     def get_papers_count(
         self, query: dict, filter_args: Optional[Dict[str, Any]] = None
     ) -> int:
@@ -41,19 +135,112 @@ class OpenAlexClient:
             Total number of papers matching the search query.
         """
         self.init()
-        result = (
+        # Get the count of results from the metadata of a minimal page
+        result = self._get(self._works_query(query, filter_args), per_page=1).meta["count"]
+        return result
+
+    def _resolve_select(self, select: Optional[List[str]], required: Optional[List[str]] = None) -> Optional[List[str]]:
+        """
+        Resolve the field projection of a call.
+
+        Args:
+            select: Fields requested for the call, None for the client's default, empty for all fields.
+            required: Fields the caller needs in any case.
+
+        Returns:
+            The fields to select, or None for full work objects.
+        """
+        select = self.select if select is None else select
+        if not select:
+            return None
+        return list(dict.fromkeys([*select, *(required or [])]))
+
+    @staticmethod
+    def _project(works: Works, select: Optional[List[str]]) -> Works:
+        """Apply a resolved field projection to a pyalex works query."""
+        return works.select(select) if select else works
+
+    def _works_query(
+        self, query: dict, filter_args: Optional[Dict[str, Any]] = None, select: Optional[List[str]] = None
+    ) -> Works:
+        """Build a pyalex works query from search and filter arguments and a resolved projection."""
+        works = (
             Works()
             .search_filter(**query)
             .filter(**filter_args if filter_args is not None else {})  # Apply any additional filters
-            .count()  # Get the count of results
         )
-        return result
+        return self._project(works, select)
+
+    def _get_page(
+        self,
+        query: dict,
+        filter_args: Optional[Dict[str, Any]],
+        page: int,
+        per_page: int = MAX_PER_PAGE,
+        select: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Fetch a single page of search results."""
+        return self._get(self._works_query(query, filter_args, select), page=page, per_page=per_page)
+
+    def _get_cursor_page(
+        self,
+        query: dict,
+        filter_args: Optional[Dict[str, Any]],
+        cursor: str,
+        per_page: int = MAX_PER_PAGE,
+        select: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Fetch a single page of search results with cursor paging."""
+        return self._get(self._works_query(query, filter_args, select), cursor=cursor, per_page=per_page)
+
+    def iter_papers(
+        self,
+        query: dict,
+        limit: int = None,
+        filter_args: Optional[Dict[str, Any]] = None,
+        select: Optional[List[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the papers matching a search query, fetching pages lazily with cursor paging.
+
+        Unlike search_papers, this is not limited to the first 10,000 results and only holds one
+        page of results in memory at a time.
+
+        Args:
+            query: The search query.
+            limit: Maximum number of papers to yield (default: None for all results).
+            filter_args: Additional filters to apply to the search.
+            select: Fields to return (default: the client's projection, empty list for all fields).
+
+        Yields:
+            Paper objects from OpenAlex, as each page arrives.
+        """
+        self.init()
+
+        select = self._resolve_select(select)
+        cursor = "*"
+        num_yielded = 0
+
+        while cursor:
+            per_page = min(MAX_PER_PAGE, limit - num_yielded) if limit else MAX_PER_PAGE
+            results = self._get_cursor_page(query, filter_args, cursor=cursor, per_page=per_page, select=select)
+            if not results:
+                return
+
+            yield from results
+            num_yielded += len(results)
+
+            if limit and num_yielded >= limit:
+                return
+            cursor = results.meta.get("next_cursor")
 
     def search_papers(
         self,
         query: dict,
         limit: int = None,
         filter_args: Optional[Dict[str, Any]] = None,
+        max_workers: Optional[int] = None,
+        select: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Search for papers on OpenAlex, collecting all results.
@@ -62,34 +249,26 @@ class OpenAlexClient:
             query: The search query.
             limit: Maximum number of papers to return (default: None for all results).
             filter_args: Additional filters to apply to the search.
+            max_workers: Number of pages to fetch concurrently (default: the client's max_workers).
+            select: Fields to return (default: the client's projection, empty list for all fields).
 
         Returns:
             List of paper objects from OpenAlex.
         """
         self.init()
 
+        select = self._resolve_select(select)
+        max_workers = min(max_workers or self.max_workers, MAX_WORKERS)
+        if max_workers > 1:
+            return self._search_papers_concurrent(query, limit, filter_args, max_workers, select)
+
         page = 1
-        per_page = 200  # Maximum allowed by the API
+        per_page = min(MAX_PER_PAGE, limit) if limit else MAX_PER_PAGE
         all_results = []
 
         while True:
-            # Make the API request with the current page
-            results = (
-                Works()
-                .search_filter(**query)
-                .filter(**filter_args if filter_args is not None else {})  # Apply any additional filters
-                .get(page=page, per_page=per_page)
-            )
-
-            # if 429 error, wait and retry
-            if (
-                results
-                and "status_code" in results
-                and results["status_code"] == 429
-                or page % 10 == 0
-            ):
-                time.sleep(1)
-                continue
+            # Make the API request with the current page (throttling is handled by the rate limiter)
+            results = self._get_page(query, filter_args, page=page, per_page=per_page, select=select)
 
             # If no results or empty list, we've reached the end
             if not results:
@@ -104,7 +283,7 @@ class OpenAlexClient:
                 break
 
             # Check if we've retrieved all available results
-            if len(results) < per_page:
+            if len(results) < per_page or page * per_page >= MAX_PAGED_RESULTS:
                 break
 
             # Move to the next page
@@ -112,33 +291,181 @@ class OpenAlexClient:
 
         return all_results
 
-    def get_paper_by_doi(self, doi: str) -> Dict[str, Any]:
+    def _search_papers_concurrent(
+        self,
+        query: dict,
+        limit: Optional[int],
+        filter_args: Optional[Dict[str, Any]],
+        max_workers: int,
+        select: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for papers on OpenAlex, fetching the pages after the first one concurrently.
+
+        The first page tells the total result count, from which the remaining pages are
+        requested in a bounded thread pool. Pages are combined in their original order.
+        """
+        per_page = min(MAX_PER_PAGE, limit) if limit else MAX_PER_PAGE
+        first_page = self._get_page(query, filter_args, page=1, per_page=per_page, select=select)
+
+        total = min(first_page.meta["count"], MAX_PAGED_RESULTS)
+        if limit:
+            total = min(total, limit)
+        num_pages = math.ceil(total / per_page)
+
+        all_results = list(first_page)
+        if num_pages > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                pages = executor.map(
+                    lambda page: self._get_page(query, filter_args, page=page, per_page=per_page, select=select),
+                    range(2, num_pages + 1),
+                )
+                for results in pages:
+                    all_results.extend(results)
+
+        if limit:
+            all_results = all_results[:limit]  # Trim to exact limit
+        return all_results
+
+    def get_paper_by_doi(self, doi: str, select: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """
         Get a paper by DOI from OpenAlex.
 
+        The DOI is looked up with a filter, as pyalex cannot project single entities, see
+        get_papers_by_dois.
+
+        Args:
+            doi: The DOI of the paper, with or without resolver prefix.
+            select: Fields to return (default: the client's projection, empty list for all fields).
+
+        Returns:
+            Paper object from OpenAlex, or None if no paper has the DOI.
+        """
+        found, _ = self.get_papers_by_dois([doi], max_workers=1, select=select)
+        return found.get(doi)
+
+    def _get_works_by_values(
+        self,
+        filter_key: str,
+        values: List[str],
+        max_workers: Optional[int] = None,
+        select: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the works matching any of the values of a filter, packing the values into OR filters.
+
         Args:
-            doi: The DOI of the paper.
+            filter_key: The filter to match, e.g. doi or openalex.
+            values: The values to match.
+            max_workers: Number of batches to fetch concurrently (default: the client's max_workers).
+            select: Resolved field projection.
 
         Returns:
-            Paper object from OpenAlex.
+            List of matching paper objects from OpenAlex.
+        """
+        batches = [values[i:i + MAX_OR_VALUES] for i in range(0, len(values), MAX_OR_VALUES)]
+
+        def fetch(batch: List[str]) -> List[Dict[str, Any]]:
+            # a value may match more than one work, so leave room beyond the batch size
+            works = self._project(Works().filter_or(**{filter_key: batch}), select)
+            return self._get(works, per_page=MAX_PER_PAGE)
+
+        max_workers = min(max_workers or self.max_workers, MAX_WORKERS, max(len(batches), 1))
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(fetch, batches))
+        else:
+            results = [fetch(batch) for batch in batches]
+
+        return [work for batch_results in results for work in batch_results]
+
+    def get_papers_by_dois(
+        self, dois: List[str], max_workers: Optional[int] = None, select: Optional[List[str]] = None
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """
+        Get papers by DOI from OpenAlex, requesting up to MAX_OR_VALUES DOIs at once.
+
+        Args:
+            dois: The DOIs of the papers, with or without resolver prefix.
+            max_workers: Number of batches to fetch concurrently (default: the client's max_workers).
+            select: Fields to return (default: the client's projection, empty list for all fields).
+
+        Returns:
+            Mapping of the given DOIs to their paper objects, and the DOIs that were not found.
         """
         self.init()
-        work = Works()[f"https://doi.org/{doi}"]
-        return work
 
-    def get_author_works(self, author_id: str, limit: int = 25) -> List[Dict[str, Any]]:
+        # the same DOI may be given in several spellings
+        normalized_dois = {}
+        for doi in dois:
+            normalized = normalize_doi(doi)
+            if normalized:
+                normalized_dois.setdefault(normalized, []).append(doi)
+
+        found = {}
+        select = self._resolve_select(select, required=["doi"])
+        for work in self._get_works_by_values("doi", list(normalized_dois), max_workers, select):
+            for doi in normalized_dois.get(normalize_doi(work.get("doi")), []):
+                found.setdefault(doi, work)
+
+        missing = [doi for doi in dict.fromkeys(dois) if doi not in found]
+        return found, missing
+
+    @staticmethod
+    def _normalize_openalex_id(work_id: Any) -> str:
+        """Get the short form (e.g. W2741809807) of an OpenAlex work id or URL."""
+        if not isinstance(work_id, str):
+            return ""
+        return work_id.strip().rstrip("/").split("/")[-1].upper()
+
+    def get_papers_by_ids(
+        self, work_ids: List[str], max_workers: Optional[int] = None, select: Optional[List[str]] = None
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """
+        Get papers by OpenAlex ID, requesting up to MAX_OR_VALUES IDs at once.
+
+        Args:
+            work_ids: The OpenAlex IDs of the papers, short (W123) or as URL.
+            max_workers: Number of batches to fetch concurrently (default: the client's max_workers).
+            select: Fields to return (default: the client's projection, empty list for all fields).
+
+        Returns:
+            Mapping of the given IDs to their paper objects, and the IDs that were not found.
+        """
+        self.init()
+
+        normalized_ids = {}
+        for work_id in work_ids:
+            normalized = self._normalize_openalex_id(work_id)
+            if normalized:
+                normalized_ids.setdefault(normalized, []).append(work_id)
+
+        found = {}
+        select = self._resolve_select(select, required=["id"])
+        for work in self._get_works_by_values("openalex", list(normalized_ids), max_workers, select):
+            for work_id in normalized_ids.get(self._normalize_openalex_id(work.get("id")), []):
+                found.setdefault(work_id, work)
+
+        missing = [work_id for work_id in dict.fromkeys(work_ids) if work_id not in found]
+        return found, missing
+
+    def get_author_works(
+        self, author_id: str, limit: int = 25, select: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get works by a specific author.
 
         Args:
             author_id: The OpenAlex ID of the author.
             limit: Maximum number of papers to return (default: 25).
+            select: Fields to return (default: the client's projection, empty list for all fields).
 
         Returns:
             List of paper objects from OpenAlex.
         """
         self.init()
-        works = Works().filter(author=author_id).get(per_page=limit)
+        works = self._project(Works().filter(author=author_id), self._resolve_select(select))
+        works = self._get(works, per_page=limit)
         return works
 
     def search_authors(self, query: str, limit: int = 25) -> List[Dict[str, Any]]:
@@ -153,38 +480,45 @@ class OpenAlexClient:
             List of author objects from OpenAlex.
         """
         self.init()
-        authors = Authors().search(query).get(per_page=limit)
+        authors = self._get(Authors().search(query), per_page=limit)
         return authors
 
-    def get_related_works(self, work_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_related_works(
+        self, work_id: str, limit: int = 10, select: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get works related to a specific work.
 
         Args:
             work_id: The OpenAlex ID of the work.
             limit: Maximum number of papers to return (default: 10).
+            select: Fields to return (default: the client's projection, empty list for all fields).
 
         Returns:
             List of related paper objects from OpenAlex.
         """
         self.init()
-        work = Works()[work_id]
-        related_works = Works().filter(related_to=work_id).get(per_page=limit)
+        related_works = self._project(Works().filter(related_to=work_id), self._resolve_select(select))
+        related_works = self._get(related_works, per_page=limit)
         return related_works
 
-    def get_cited_by(self, work_id: str, limit: int = 25) -> List[Dict[str, Any]]:
+    def get_cited_by(
+        self, work_id: str, limit: int = 25, select: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get works that cite a specific work.
 
         Args:
             work_id: The OpenAlex ID of the work.
             limit: Maximum number of papers to return (default: 25).
+            select: Fields to return (default: the client's projection, empty list for all fields).
 
         Returns:
             List of paper objects from OpenAlex that cite the specified work.
         """
         self.init()
-        cited_by = Works().filter(cites=work_id).get(per_page=limit)
+        cited_by = self._project(Works().filter(cites=work_id), self._resolve_select(select))
+        cited_by = self._get(cited_by, per_page=limit)
         return cited_by
 
     @staticmethod
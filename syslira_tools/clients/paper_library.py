@@ -1,24 +1,54 @@
-import contextlib
-import io
+import itertools
 import json
 import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 
 from pandas import notna
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
 
+import numpy as np
 import pandas as pd
 
 from syslira_tools.const import UNION_COLUMNS, ITEMTYPE_MAP
-from syslira_tools.clients.zotero_client import ZoteroClient
+from syslira_tools.clients.zotero_client import PDF_CONTENT_TYPE, ZoteroClient
 from syslira_tools.clients.openalex_client import OpenAlexClient
 from syslira_tools.helpers.obj_util import getattr_or_empty_str
 from syslira_tools.helpers.conversion import convert_inverted_index
+from syslira_tools.helpers.fulltext_cache import FulltextCache
+from syslira_tools.helpers.library_store import (
+    FULLTEXT_COLUMNS,
+    SEARCH_INDEX_FILE,
+    SYNC_STATE_FILE,
+    load_library,
+    save_library,
+)
+from syslira_tools.helpers.pdf_parsing import BatchPdfParser, ParseResult
+from syslira_tools.helpers.search_index import FIELD_WEIGHTS, BM25Index
+from syslira_tools.helpers.zotero_index import ZoteroItemIndex
+from syslira_tools.helpers.dedup import (
+    DEFAULT_PRIORITY,
+    ITEMTYPE_PRIORITY,
+    MinHashLSH,
+    dedup_keys,
+    find_duplicates,
+    find_near_duplicates,
+    normalize_title,
+)
 from loguru import logger
-import pymupdf.layout
-import pymupdf4llm
 from tqdm.asyncio import tqdm
 import os
 
+if TYPE_CHECKING:
+    # requires the optional LangChain dependencies
+    from syslira_tools.helpers.vector_store import IncrementalVectorStore
+
+# concurrent Zotero requests while retrieving full texts
+DEFAULT_IO_WORKERS = 8
+# Items from which on their attachments are listed in bulk, 100 per request, instead of one request per item
+BULK_ATTACHMENT_MIN_ITEMS = 100
+# paper fields whose text is chunked into the vector store, in order
+VECTOR_STORE_FIELDS = ["title", "abstractNote", "fulltext"]
+
 
 class PaperLibrary:
     """Manager for the paper library with local storage, Zotero and OpenAlex integration."""
@@ -30,6 +60,10 @@ class PaperLibrary:
             openalex_client: OpenAlexClient,  # Add OpenAlex client
             collection_key: str = None,
             local_storage_path: str = None,
+            similarity_threshold: float = 0.85,
+            pdf_parser: Optional[BatchPdfParser] = None,
+            fulltext_cache: Optional[FulltextCache] = None,
+            vector_store: Optional["IncrementalVectorStore"] = None,
     ):
         """
         Initialize the paper library manager.
@@ -39,20 +73,264 @@ class PaperLibrary:
             zotero_client: Initialized ZoteroClient instance.
             openalex_client: Initialized OpenAlexClient instance (optional).
             collection_key: Default working collection key for Zotero.
+            local_storage_path: Path to a local Zotero storage folder to read PDFs from.
+            similarity_threshold: Title similarity above which papers are near-duplicates
+                when deduplicating with deduplicate="fuzzy".
+            pdf_parser: Parser for PDF attachments (default: a BatchPdfParser with one worker per CPU,
+                started on first use).
+            fulltext_cache: Cache for parsed full texts (default: a FulltextCache in the default
+                cache directory, opened on first use).
+            vector_store: Vector store of paper chunks, updated incrementally whenever papers are
+                added or replaced (optional).
         """
         #self.scopus_client = scopus_client
         self.zotero_client = zotero_client
         self.openalex_client = openalex_client
         self.columns = list(UNION_COLUMNS)
-        self.papers_df = pd.DataFrame(columns=self.columns, dtype=str)
-        self.papers_df.set_index("id", inplace=True)
+        # normalized title / DOI -> ids of the papers with it in insertion order (dicts as ordered
+        # sets), kept in sync with papers_df for deduplication
+        self._title_index: Dict[str, Dict[str, None]] = {}
+        self._doi_index: Dict[str, Dict[str, None]] = {}
+        # built on first fuzzy deduplication
+        self._title_lsh: Optional[MinHashLSH] = None
+        # built on first search
+        self._search_index: Optional[BM25Index] = None
+        # whether the search index lacks full texts that were not loaded, it is not saved then
+        self._search_index_incomplete = False
+        # collection key -> Zotero library version of the last sync
+        self._zotero_versions: Dict[str, int] = {}
+        # collection key -> index of the Zotero items, built on first push
+        self._zotero_item_indexes: Dict[Optional[str], ZoteroItemIndex] = {}
+        # ids of papers loaded without their stored full texts, see load
+        self._unloaded_fulltext_ids: Set[str] = set()
+        self.similarity_threshold = similarity_threshold
+        self._papers_df = pd.DataFrame(columns=self.columns, dtype=str).set_index("id")
         self.collection_key = collection_key
         self.local_storage_path = local_storage_path
+        self._pdf_parser = pdf_parser
+        self._fulltext_cache = fulltext_cache
+        self.vector_store = vector_store
+
+    @property
+    def pdf_parser(self) -> BatchPdfParser:
+        """The parser for PDF attachments, created on first use."""
+        if self._pdf_parser is None:
+            self._pdf_parser = BatchPdfParser()
+        return self._pdf_parser
+
+    @property
+    def fulltext_cache(self) -> FulltextCache:
+        """The cache for parsed full texts, opened on first use."""
+        if self._fulltext_cache is None:
+            self._fulltext_cache = FulltextCache()
+        return self._fulltext_cache
+
+    @property
+    def papers_df(self) -> pd.DataFrame:
+        """The paper library dataframe, indexed by paper id."""
+        return self._papers_df
+
+    @papers_df.setter
+    def papers_df(self, papers_df: pd.DataFrame):
+        # replacing the whole dataframe invalidates the dedup indexes
+        self._papers_df = papers_df
+        self._title_index = {}
+        self._doi_index = {}
+        self._title_lsh = None
+        self._search_index = None
+        self._search_index_incomplete = False
+        # a replaced library needs a full sync
+        self._zotero_versions = {}
+        self._unloaded_fulltext_ids = set()
+        self._index_papers(papers_df)
 
     def get_library_df(self):
         """Return the paper library pandas dataframe"""
         return self.papers_df
 
+    # Storage access, overridden by storage backends such as SQLitePaperLibrary
+
+    def _has_paper(self, paper_id: str) -> bool:
+        """Whether a paper with the given id is in the library."""
+        return paper_id in self._papers_df.index
+
+    def _existing_paper_ids(self, paper_ids: pd.Index) -> List[str]:
+        """The given paper ids that are in the library."""
+        # look up the ids in the hash table of the library index, instead of hashing the library
+        return list(paper_ids[self._papers_df.index.get_indexer(paper_ids) >= 0])
+
+    def _paper_count(self) -> int:
+        """Number of papers in the library."""
+        return len(self._papers_df)
+
+    def _get_papers(self, paper_ids: List[str]) -> pd.DataFrame:
+        """The library papers with the given ids, which must be in the library."""
+        return self._papers_df.loc[paper_ids]
+
+    def _get_paper_field(self, paper_id: str, field: str) -> Any:
+        """Get a single field of a library paper."""
+        return self._papers_df.at[paper_id, field]
+
+    def _find_by_title(self, title: str) -> Optional[str]:
+        """Id of the library paper with the given normalized title, if any."""
+        return next(iter(self._title_index.get(title, ())), None)
+
+    def _find_by_doi(self, doi: str) -> Optional[str]:
+        """Id of the library paper with the given normalized DOI, if any."""
+        return next(iter(self._doi_index.get(doi, ())), None)
+
+    def _find_by_zotero_keys(self, zotero_keys: Iterable[str]) -> Dict[str, str]:
+        """Map Zotero item keys to the ids of the library papers linked to them."""
+        if "zoteroKey" not in self._papers_df.columns:
+            return {}
+        linked = self._papers_df["zoteroKey"]
+        linked = linked[linked.isin(list(zotero_keys))]
+        return dict(zip(linked.values, linked.index))
+
+    def _get_zotero_version(self, collection_key: str) -> Optional[int]:
+        """Zotero library version of the last sync of a collection, if any."""
+        return self._zotero_versions.get(collection_key)
+
+    def _set_zotero_version(self, collection_key: str, version: int):
+        """Record the Zotero library version of a sync of a collection."""
+        self._zotero_versions[collection_key] = version
+
+    def _get_zotero_versions(self) -> Dict[str, int]:
+        """Zotero library versions of the last syncs by collection key."""
+        return dict(self._zotero_versions)
+
+    def _append_papers(self, papers_df: pd.DataFrame):
+        """Append papers whose ids are not in the library yet."""
+        self._papers_df = pd.concat([self._papers_df, papers_df])
+        self._index_papers(papers_df)
+
+    def _index_papers(self, papers_df: pd.DataFrame):
+        """Add the normalized titles and DOIs of the given papers to the dedup indexes, and the papers to the search index."""
+        titles, dois, _ = dedup_keys(papers_df)
+        for paper_id, title, doi in zip(papers_df.index, titles, dois):
+            if title:
+                self._title_index.setdefault(title, {})[paper_id] = None
+            if doi:
+                self._doi_index.setdefault(doi, {})[paper_id] = None
+        if self._title_lsh is not None and "title" in papers_df.columns:
+            self._title_lsh.insert_many(papers_df.index, papers_df["title"].tolist())
+        if self._search_index is not None:
+            self._search_index.add_many(papers_df.index, self._search_documents(papers_df))
+            if self._unloaded_fulltext_ids and not self._unloaded_fulltext_ids.isdisjoint(papers_df.index):
+                self._search_index_incomplete = True
+
+    def _unindex_papers(self, paper_ids: List[str]):
+        """Remove the dedup and search index entries pointing to the given papers."""
+        paper_ids = set(paper_ids)
+        papers_df = self._papers_df.loc[self._existing_paper_ids(pd.Index(list(paper_ids)))]
+        titles, dois, _ = dedup_keys(papers_df)
+        for paper_id, title, doi in zip(papers_df.index, titles, dois):
+            # other papers with the same title or DOI stay in the index
+            for index, key in ((self._title_index, title), (self._doi_index, doi)):
+                paper_ids_with_key = index.get(key)
+                if paper_ids_with_key is not None:
+                    paper_ids_with_key.pop(paper_id, None)
+                    if not paper_ids_with_key:
+                        del index[key]
+        if self._title_lsh is not None:
+            for paper_id in paper_ids:
+                self._title_lsh.remove(paper_id)
+        if self._search_index is not None:
+            for paper_id in paper_ids:
+                self._search_index.remove(paper_id)
+
+    def _remove_papers(self, paper_ids: List[str]):
+        """Remove papers from the library and the dedup indexes."""
+        if len(paper_ids) == 0:
+            return
+        self._unindex_papers(paper_ids)
+        self._unloaded_fulltext_ids.difference_update(paper_ids)
+        self._papers_df = self._papers_df.drop(index=paper_ids, errors="ignore")
+
+    def _set_paper_field(self, paper_id: str, field: str, value: Any):
+        """
+        Set a single field of a library paper, keeping the dedup indexes consistent. Callers that
+        change VECTOR_STORE_FIELDS update the vector store afterwards, see update_vector_store.
+        """
+        reindex = field in ("title", "DOI") or field in FIELD_WEIGHTS
+        if reindex:
+            self._unindex_papers([paper_id])
+        self._papers_df.at[paper_id, field] = value
+        if field in FULLTEXT_COLUMNS:
+            self._unloaded_fulltext_ids.discard(paper_id)
+        if reindex:
+            self._index_papers(self._papers_df.loc[[paper_id]])
+
+    def _paper_priority(self, paper_id: str) -> int:
+        """Deduplication priority of a library paper, see helpers.dedup.ITEMTYPE_PRIORITY."""
+        try:
+            item_type = self._get_paper_field(paper_id, "itemType")
+        except KeyError:
+            return DEFAULT_PRIORITY
+        return ITEMTYPE_PRIORITY.get(item_type, DEFAULT_PRIORITY)
+
+    def _get_title_lsh(self) -> MinHashLSH:
+        """Return the near-duplicate title index of the library, building it on first use."""
+        if self._title_lsh is None or self._title_lsh.threshold != self.similarity_threshold:
+            self._title_lsh = MinHashLSH(threshold=self.similarity_threshold)
+            if "title" in self._papers_df.columns:
+                self._title_lsh.insert_many(self._papers_df.index, self._papers_df["title"].tolist())
+        return self._title_lsh
+
+    @staticmethod
+    def _search_documents(papers_df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """The searchable fields of papers, see helpers.search_index.FIELD_WEIGHTS."""
+        return papers_df.reindex(columns=list(FIELD_WEIGHTS)).to_dict("records")
+
+    def _get_search_index(self) -> BM25Index:
+        """Return the full-text search index of the library, building it on first use."""
+        if self._search_index is None:
+            self._search_index = BM25Index()
+            self._search_index.add_many(self._papers_df.index, self._search_documents(self._papers_df))
+            self._search_index_incomplete = bool(self._unloaded_fulltext_ids)
+        return self._search_index
+
+    def _resolve_against_index(self, papers_df: pd.DataFrame, fuzzy: bool = False) -> tuple[np.ndarray, set]:
+        """
+        Check new papers against the dedup indexes of the library.
+
+        A new paper matching library papers by normalized title or DOI (or by a similar title if
+        fuzzy) only replaces them if its item type ranks higher than all of them, otherwise it is
+        dropped.
+
+        Args:
+            papers_df: New papers, already deduplicated among themselves.
+            fuzzy: Whether to also match near-duplicate titles.
+
+        Returns:
+            tuple: Boolean mask of new papers to keep and the set of library paper ids they replace.
+        """
+        titles, dois, priority = dedup_keys(papers_df)
+        keep = np.ones(len(papers_df), dtype=bool)
+        superseded = set()
+
+        lsh_entries = None
+        if fuzzy and "title" in papers_df.columns:
+            lsh = self._get_title_lsh()
+            lsh_entries = lsh.prepare(papers_df["title"].tolist())
+
+        for position, (paper_id, title, doi) in enumerate(zip(papers_df.index, titles, dois)):
+            matches = {
+                self._find_by_title(title) if title else None,
+                self._find_by_doi(doi) if doi else None,
+            }
+            if lsh_entries is not None:
+                matches |= lsh.query(lsh_entries[position])
+            matches -= {None, paper_id}
+            if not matches:
+                continue
+            if priority[position] < min(self._paper_priority(match) for match in matches):
+                superseded |= matches
+            else:
+                keep[position] = False
+
+        return keep, superseded
+
     # def get_count_search_results_scopus(self, query: str) -> str:
     #     """
     #     Get the number of search results from Scopus.
@@ -177,91 +455,164 @@ class PaperLibrary:
             return f"Error searching for papers on OpenAlex: {e}"
 
     def add_papers_to_library(
-            self, papers: List[Any]
+            self, papers: Iterable[Any], batch_size: Optional[int] = None
     ) -> str:
         """
         Add papers to the library.
 
         Args:
-            papers: List of paper objects from openalex
+            papers: List or iterator of paper objects from openalex, e.g. OpenAlexClient.iter_papers.
+            batch_size: If given, consume the papers in batches of this size, so that only one
+                batch of raw papers is held in memory at a time.
 
         Returns:
             Result and status message.
         """
-
-        if papers:
+        if batch_size is None:
+            papers = list(papers)
+            if not papers:
+                raise ValueError("No papers provided to add to the library.")
             papers_details = self._create_library_items(papers, source="openalex")
             return self.update_library(papers_details)
-        else:
+
+        initial_count = self._paper_count()
+        num_papers = 0
+        duplicates_dropped = 0
+        papers = iter(papers)
+        while batch := list(itertools.islice(papers, batch_size)):
+            num_papers += len(batch)
+            papers_details = self._create_library_items(batch, source="openalex")
+            dropped, changed_ids = self._merge_papers(self._papers_to_df(papers_details), deduplicate=True)
+            duplicates_dropped += dropped
+            if self.vector_store is not None:
+                self.update_vector_store(changed_ids)
+
+        if num_papers == 0:
             raise ValueError("No papers provided to add to the library.")
 
+        final_count = self._paper_count()
+        return (
+            f"Added {final_count - initial_count} new papers from OpenAlex to the library (total count: {final_count}); "
+            f"{duplicates_dropped} duplicates were found and removed."
+        )
+
     def find_duplicates_to_drop(self, papers_df) -> pd.DataFrame:
-        # Find rows that have duplicate titles
-        title_duplicates = papers_df[papers_df.duplicated(subset=["title"], keep=False)]
-
-        if title_duplicates.empty:
-            # No duplicates found, return empty dataframe
-            return pd.DataFrame(columns=papers_df.columns)
-
-        # handling logic for title duplicates
-        grouped = title_duplicates.groupby('title')
-        to_drop_df = pd.DataFrame(columns=self.columns, dtype=str)
-
-        for title, group in grouped:
-            # prioritize journal articles over preprint and conference papers
-            if any(group['itemType'] == 'journalArticle'):
-                to_keep = group[group['itemType'] == 'journalArticle'].iloc[0]
-            elif any(group['itemType'] == 'conferencePaper'):
-                to_keep = group[group['itemType'] == 'conferencePaper'].iloc[0]
-            else:
-                to_keep = group.iloc[0]
+        """
+        Find the papers that duplicate another paper by normalized title or DOI.
 
-            # Get all rows in this group EXCEPT the one we want to keep
-            to_drop_from_group = group[group.index != to_keep.name]
-            to_drop_df = pd.concat([to_drop_df, to_drop_from_group])
+        Of each duplicate group, journal articles are kept over conference papers and conference
+        papers over other item types; ties keep the earliest row.
 
-        return to_drop_df
+        Args:
+            papers_df: Library dataframe to search for duplicates.
 
-    def update_library(self, papers: List[Any] | pd.DataFrame, deduplicate:bool=True) -> str:
+        Returns:
+            pd.DataFrame: The rows of papers_df that should be dropped.
+        """
+        return papers_df[find_duplicates(papers_df)]
+
+    @staticmethod
+    def _papers_to_df(papers: List[Any]) -> pd.DataFrame:
+        """Create a dataframe indexed by paper id from library items."""
+        # Zotero items wrap their fields in "data"
+        papers = [paper["data"] if "data" in paper else paper for paper in papers]
+        # the id is the index only, as in the library dataframe
+        papers_df = pd.DataFrame(papers, index=[paper["id"] for paper in papers])
+        return papers_df.drop(columns="id", errors="ignore")
+
+    def update_library(self, papers: List[Any] | pd.DataFrame, deduplicate: bool | str = True) -> str:
+        """
+        Add new papers to the library, updating papers whose id is already in the library.
+
+        An updated paper combines the new version with the stored one: the fields of the new
+        version replace the stored fields, and stored fields the new version lacks (e.g. a summary,
+        OpenAlex metadata or the full text) are kept. Of papers repeating an id within the new
+        papers, the last one is used.
+
+        Args:
+            papers: Library items (optionally wrapped in Zotero style "data") or a library dataframe.
+            deduplicate: Whether to drop duplicates by normalized title and DOI (True or "exact"), or
+                additionally by near-duplicate titles ("fuzzy", see similarity_threshold). New papers
+                are only checked against the library's dedup indexes, not against the whole library.
+
+        Returns:
+            str: Status message.
+        """
         if isinstance(papers, List):
-            # Create DataFrame from new papers
-            papers = [paper["data"] for paper in papers if "data" in paper]
-            papers_df = pd.DataFrame(
-                papers, index=[paper["id"] for paper in papers]
-            )
+            papers_df = self._papers_to_df(papers)
         elif isinstance(papers, pd.DataFrame):
             papers_df = papers
         else:
             raise ValueError(f"Unknown type {type(papers)}")
 
         # Get initial counts before merge
-        initial_count = len(self.papers_df)
+        initial_count = self._paper_count()
 
-        # Combine with existing library
-        combined_df = pd.concat([self.papers_df, papers_df])
-
-        if deduplicate:
-            title_duplicates = self.find_duplicates_to_drop(combined_df)
-            combined_df_cleaned = combined_df.drop(title_duplicates.index)
-            # get DOI duplicates (ignore empty DOIs)
-            doi_duplicates = combined_df_cleaned[combined_df_cleaned.duplicated(subset=["DOI"], keep=False) & combined_df_cleaned["DOI"].notna() & (combined_df_cleaned["DOI"] != "")]
-            combined_df_cleaned = combined_df_cleaned.drop(doi_duplicates.index)
-            # remove duplicates from combined_df
-            duplicates_dropped = len(combined_df) - len(combined_df_cleaned)
-            combined_df = combined_df_cleaned
+        duplicates_dropped, changed_ids = self._merge_papers(papers_df, deduplicate)
+        if self.vector_store is not None:
+            self.update_vector_store(changed_ids)
 
         # Calculate metrics
-        final_count = len(combined_df)
+        final_count = self._paper_count()
         num_added = final_count - initial_count
 
-        self.papers_df = combined_df
-
         result = f"Added {num_added} new papers from OpenAlex to the library (total count: {final_count}); "
         if deduplicate:
             result += f"{duplicates_dropped} duplicates were found and removed."
 
         return result
 
+    def _merge_papers(self, papers_df: pd.DataFrame, deduplicate: bool | str) -> Tuple[int, List[str]]:
+        """
+        Merge new papers into the library, see update_library.
+
+        Returns:
+            tuple: Number of duplicates dropped and the ids of the papers added, replaced or removed.
+        """
+        if deduplicate not in (True, False, "exact", "fuzzy"):
+            raise ValueError(f"Unknown deduplication mode {deduplicate}")
+        fuzzy = deduplicate == "fuzzy"
+        duplicates_dropped = 0
+        superseded = set()
+        # the last of the new papers with the same id wins, the library index stays unique
+        papers_df = papers_df[~papers_df.index.duplicated(keep="last")]
+
+        if deduplicate:
+            # deduplicate the new batch among itself, then only against the library indexes
+            to_drop = find_duplicates(papers_df)
+            duplicates_dropped += int(to_drop.sum())
+            papers_df = papers_df[~to_drop]
+            if fuzzy:
+                to_drop = find_near_duplicates(papers_df, threshold=self.similarity_threshold)
+                duplicates_dropped += int(to_drop.sum())
+                papers_df = papers_df[~to_drop]
+
+            keep, superseded = self._resolve_against_index(papers_df, fuzzy=fuzzy)
+            duplicates_dropped += int((~keep).sum()) + len(superseded)
+            papers_df = papers_df[keep]
+            self._remove_papers(list(superseded))
+
+        # papers already in the library by id are updated with the new version, which keeps the
+        # stored values of the fields it lacks
+        existing_ids = self._existing_paper_ids(papers_df.index)
+        if existing_ids:
+            stored_df = self._get_papers(existing_ids)
+            columns = list(papers_df.columns) + [column for column in stored_df.columns if column not in papers_df.columns]
+            papers_df = papers_df.combine_first(stored_df).loc[papers_df.index, columns]
+            # papers whose stored full texts are not loaded keep them unless the new version has one
+            unloaded_ids = [
+                paper_id for paper_id in existing_ids
+                if paper_id in self._unloaded_fulltext_ids
+                and papers_df.loc[paper_id].reindex(FULLTEXT_COLUMNS).isna().all()
+            ]
+            self._remove_papers(existing_ids)
+            self._unloaded_fulltext_ids.update(unloaded_ids)
+
+        # Combine with existing library
+        self._append_papers(papers_df)
+
+        return duplicates_dropped, list(papers_df.index) + list(superseded)
+
     # def add_papers_by_doi(
     #     self, doi_list: List[str]
     # ) -> Union[str, tuple[List[Dict[str, Any]], str]]:
@@ -613,13 +964,17 @@ class PaperLibrary:
         papers_details = []
         for paper in papers:
             try:
+                # Projected works carry volume and pages in biblio only
+                biblio = paper.get("biblio") or {}
+
                 # Create a dictionary with the main paper details
                 paper_details = {
                     "title": paper.get("title", ""),
                     "date": paper.get("publication_date", ""),
-                    "volume": paper.get("volume", ""),
-                    "DOI": paper.get("doi", "").replace("https://doi.org/", ""),
-                    "pages": f"{paper.get('first_page', '')}-{paper.get('last_page', '')}",
+                    "volume": paper.get("volume") or biblio.get("volume") or "",
+                    "DOI": (paper.get("doi") or "").replace("https://doi.org/", ""),
+                    "pages": f"{paper.get('first_page') or biblio.get('first_page') or ''}-"
+                             f"{paper.get('last_page') or biblio.get('last_page') or ''}",
                     "itemType": "journalArticle",  # Default
                 }
 
@@ -649,9 +1004,9 @@ class PaperLibrary:
 
                 paper_details["creators"] = creators
 
-                # Set publication information
-                if paper.get("host_venue"):
-                    venue = paper["host_venue"]
+                # Set publication information, host_venue was superseded by primary_location
+                venue = paper.get("host_venue") or (paper.get("primary_location") or {}).get("source")
+                if venue:
                     paper_details["publicationTitle"] = venue.get("display_name", "")
 
                     # Determine item type based on venue type
@@ -667,7 +1022,7 @@ class PaperLibrary:
                         paper_details["itemType"] = "preprint"
 
                     # Add issue information
-                    paper_details["issue"] = venue.get("issue", "")
+                    paper_details["issue"] = venue.get("issue") or biblio.get("issue") or ""
 
                 # Add citation count
                 if paper.get("cited_by_count"):
@@ -746,11 +1101,32 @@ class PaperLibrary:
     #     return f"Updated {len(updated)} papers with OpenAlex metadata."
 
     # Rest of the class methods remain unchanged
-    def update_from_zotero(self, get_fulltext="parsed", deduplicate:bool=False, collection_key:str= "") -> str:
+    def update_from_zotero(
+            self,
+            get_fulltext="parsed",
+            deduplicate: bool | str = False,
+            collection_key: str = "",
+            io_workers: int = DEFAULT_IO_WORKERS,
+            parse_workers: Optional[int] = None,
+            refresh_fulltext: str | bool = False,
+            fulltext_pages: Optional[Iterable[int]] = None,
+            incremental: bool = True,
+    ) -> str:
         """
         Update the local library with papers from Zotero. Also retrieves full text if available.
+
+        The Zotero library version is recorded after every sync. Later syncs of the collection only
+        fetch the items changed since that version, and remove the papers whose items were deleted,
+        trashed or removed from the collection.
+
         Args:
             get_fulltext: Options for full text retrieval: 'parsed', 'raw', or None.
+            io_workers: Number of concurrent Zotero requests while retrieving full texts.
+            parse_workers: Number of PDF parsing processes (default: the library's pdf_parser).
+            refresh_fulltext: True to re-parse all full texts, 'parser' to re-parse full texts
+                cached from another parser version.
+            fulltext_pages: Page numbers (0-based) to retrieve of every full text (default: all pages).
+            incremental: Whether to only fetch the changes since the last sync, if there was one.
 
         Returns:
             str: Status message.
@@ -762,13 +1138,36 @@ class PaperLibrary:
         # Initialize Zotero if not already
         self.zotero_client.init()
 
-        zotero_items = self.zotero_client.get_all_items(
-            collection_key=collection_key
-        )
+        since = self._get_zotero_version(collection_key) if incremental else None
+        zotero_items, version = self.zotero_client.get_items_since(collection_key, since)
+        removed_ids = []
+        if since is not None:
+            if version == since:
+                return f"Zotero collection {collection_key} is unchanged since the last sync."
+            zotero_items, removed_ids = self._collect_zotero_changes(collection_key, since, zotero_items)
         added = []
         updated = []
 
-        for item in tqdm(zotero_items, desc="Updating from Zotero", unit="item"):
+        # download full texts, fetching and parsing concurrently
+        fulltexts = {}
+        if get_fulltext and zotero_items:
+            with tqdm(total=len(zotero_items), desc="Updating from Zotero", unit="item") as progress:
+                item_keys = [item["key"] for item in zotero_items]
+                fulltexts = self.retrieve_fulltexts_from_zotero_items(
+                    item_keys,
+                    get_fulltext,
+                    io_workers=io_workers,
+                    parse_workers=parse_workers,
+                    progress=progress,
+                    refresh=refresh_fulltext,
+                    pages=fulltext_pages,
+                    attachments=self._resolve_pdf_attachments(item_keys, collection_key),
+                )
+
+        existing_ids = self._find_by_zotero_keys([item["key"] for item in zotero_items])
+        # every library paper is updated by one item at most
+        claimed_ids = set(existing_ids.values())
+        for item in zotero_items:
             # create new item
             item["data"]["zoteroKey"] = item["key"]
             item["data"]["id"] = (
@@ -777,31 +1176,76 @@ class PaperLibrary:
                 else item["key"]
             )  # use zotero key if id was never given
 
-            # download full text
             if get_fulltext:
-                if get_fulltext == "parsed":
-                    retrieval_fn = self.retrieve_parsed_fulltext_from_zotero_item
-                else:
-                    retrieval_fn = self.retrieve_fulltext_from_zotero_item
-                fulltext = retrieval_fn(item["key"])
-                item["data"]["fulltext"] = fulltext["content"]
-
-            if item["data"]["title"] not in self.papers_df["title"].values:
+                item["data"]["fulltext"] = fulltexts[item["key"]]["content"]
+
+            existing_id = existing_ids.get(item["key"])
+            if existing_id is None:
+                # an item not linked to a paper yet updates the paper with its title, if no other item does
+                existing_id = self._find_by_title(normalize_title(item["data"]["title"]))
+                if existing_id in claimed_ids:
+                    existing_id = None
+                elif existing_id is not None:
+                    claimed_ids.add(existing_id)
+            if existing_id is None:
                 added.append(item)
             else:
                 # item already exists
-                paper = self.papers_df.loc[self.papers_df["title"] == item["data"]["title"]] # existing paper
-                item["data"]["id"] = paper.index[0]  # use existing id
+                item["data"]["id"] = existing_id  # use existing id
                 updated.append(item)
+
+        if removed_ids:
+            self._remove_papers(removed_ids)
+            if self.vector_store is not None:
+                self.update_vector_store(removed_ids)
         if added or updated:
-            return self.update_library(added + updated, deduplicate)
-        return f"No papers found in Zotero collection {self.collection_key} to update the local library."
+            result = self.update_library(added + updated, deduplicate)
+        else:
+            result = f"No papers found in Zotero collection {collection_key} to update the local library."
+        if removed_ids:
+            result += f" Removed {len(removed_ids)} papers deleted or removed from the collection in Zotero."
+        self._set_zotero_version(collection_key, version)
+        return result
+
+    def _collect_zotero_changes(
+            self, collection_key: str, since: int, changed_items: List[Dict]
+    ) -> Tuple[List[Dict], List[str]]:
+        """
+        Complete the changed items of a collection for an incremental sync.
+
+        Args:
+            collection_key: The synced collection, or None for the whole library.
+            since: Library version of the last sync.
+            changed_items: Top-level items of the collection changed since that version.
+
+        Returns:
+            tuple: The items to update, including items whose attachments changed, and the ids of
+                the library papers to remove.
+        """
+        changed_keys = {item["key"] for item in changed_items}
+        deleted_keys = set(self.zotero_client.get_deleted_item_keys(since))
+        # library papers whose items changed but are not top-level items of the collection any more
+        # were moved to the trash or removed from the collection
+        gone_keys = (deleted_keys | set(self.zotero_client.get_changed_item_versions(since))) - changed_keys
+        removed_ids = list(dict.fromkeys(self._find_by_zotero_keys(gone_keys).values()))
+
+        # items with new or changed attachments are updated for their full text
+        parent_keys = self.zotero_client.get_changed_attachment_parents(since) - changed_keys - gone_keys
+        parent_keys = set(self._find_by_zotero_keys(parent_keys))
+        items = list(changed_items)
+        if parent_keys:
+            items.extend(
+                item for item in self.zotero_client.get_items_by_key(sorted(parent_keys))
+                if not item["data"].get("deleted")
+                and (not collection_key or collection_key in item["data"].get("collections", []))
+            )
+        return items, removed_ids
 
     def update_zotero_from_library(
             self, update_existing: bool = False
     ) -> str:
         """
-        Update the Zotero library with the papers in the local library.
+        Update the Zotero library with the papers in the local library, see push_papers_to_zotero.
 
         Args:
             update_existing: Whether to update existing items in Zotero.
@@ -809,40 +1253,92 @@ class PaperLibrary:
         Returns:
             str: Status message.
         """
-        # Initialize Zotero if not already
-        self.zotero_client.init()
+        results = self.push_papers_to_zotero(update_existing=update_existing)
+        counts = results["status"].value_counts()
+        return (
+            f"Added {counts.get('added', 0)} papers to Zotero library. "
+            f"Updated {counts.get('updated', 0)} existing papers. "
+            f"Skipped {counts.get('skipped', 0) + counts.get('unchanged', 0)} papers. "
+            f"{counts.get('failed', 0)} errors occurred. "
+        )
 
-        added_titles = []
-        updated_titles = []
-        skipped_titles = []
-        error_titles = []
-        errors = []
+    def push_papers_to_zotero(
+            self,
+            paper_ids: Optional[Iterable[str]] = None,
+            collection_key: Optional[str] = None,
+            update_existing: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Create or update papers of the library in Zotero, in batches.
 
-        collection_items = self.zotero_client.get_collection_items(self.collection_key)
+        Items are built from item templates requested once per item type and validated locally,
+        then written 50 at a time (see ZoteroClient.write_items) with their collection already
+        set. The Zotero keys of the written items are stored in the library.
 
-        for paper_id, paper in self.papers_df.iterrows():
-            try:
-                result_status = self._add_item_to_zotero(
-                    paper_id, paper, self.collection_key, collection_items, update_existing
-                )
-                if result_status == "added":
-                    added_titles.append(paper.title)
-                elif result_status == "updated":
-                    updated_titles.append(paper.title)
-                else:
-                    skipped_titles.append(paper.title)
+        Args:
+            paper_ids: Papers to push (default: all papers).
+            collection_key: Collection of the new items (default: the library's collection).
+            update_existing: Whether to update papers that are already in Zotero, otherwise they
+                are skipped.
 
+        Returns:
+            pd.DataFrame: Status ('added', 'updated', 'unchanged', 'skipped' or 'failed'), Zotero
+                key and error of every paper, indexed by paper id.
+        """
+        # Initialize Zotero if not already
+        self.zotero_client.init()
+        collection_key = collection_key or self.collection_key
+        papers_df = self.papers_df if paper_ids is None else self.papers_df.loc[list(paper_ids)]
+        results = pd.DataFrame(index=papers_df.index, columns=["status", "zoteroKey", "error"], dtype=object)
+
+        zotero_index = self._get_zotero_item_index(collection_key)
+        # items of linked papers that are not in the collection, e.g. moved to another collection
+        if "zoteroKey" in papers_df.columns:
+            missing_keys = [key for key in papers_df["zoteroKey"].dropna().unique() if key not in zotero_index]
+            linked_items = {
+                item["key"]: item for item in self.zotero_client.get_items_by_key(missing_keys)
+                if not item["data"].get("deleted")
+            }
+        else:
+            linked_items = {}
+
+        items = []
+        item_paper_ids = []
+        for paper_id, paper in papers_df.iterrows():
+            try:
+                existing_item = self._find_zotero_item(paper_id, paper, zotero_index, linked_items)
+                if existing_item and not update_existing:
+                    results.loc[paper_id, ["status", "zoteroKey"]] = ["skipped", existing_item["key"]]
+                    continue
+                item = self._create_zotero_item(paper_id, collection_key, paper)
+                if existing_item:
+                    item["key"] = existing_item["key"]
+                    item["version"] = existing_item["version"]
+                    # keep the other collections of the item
+                    item["collections"] = list(dict.fromkeys(
+                        existing_item["data"].get("collections", []) + item.get("collections", [])
+                    ))
             except Exception as e:
                 logger.warning(f"Error adding paper {paper['title']} to Zotero: {e}")
-                error_titles.append(paper.title)
-                errors.append(str(e))
-
-        return (
-            f"Added {len(added_titles)} papers to Zotero library. "
-            f"Updated {len(updated_titles)} existing papers. "
-            f"Skipped {len(skipped_titles)} papers. "
-            f"{len(error_titles)} errors occurred. "
-        )
+                results.loc[paper_id, ["status", "error"]] = ["failed", str(e)]
+                continue
+            items.append(item)
+            item_paper_ids.append(paper_id)
+
+        written = self.zotero_client.write_items(items)
+        # papers pushed again in this session are found without waiting for the next refresh
+        zotero_index.add(written["successful"].values())
+        for position, item in written["successful"].items():
+            paper_id = item_paper_ids[position]
+            status = "updated" if "key" in items[position] else "added"
+            results.loc[paper_id, ["status", "zoteroKey"]] = [status, item["key"]]
+            self._set_paper_field(paper_id, "zoteroKey", item["key"])
+        for position, key in written["unchanged"].items():
+            results.loc[item_paper_ids[position], ["status", "zoteroKey"]] = ["unchanged", key]
+        for position, error in written["failed"].items():
+            logger.warning(f"Error adding paper {item_paper_ids[position]} to Zotero: {error}")
+            results.loc[item_paper_ids[position], ["status", "error"]] = ["failed", error]
+        return results
 
     def sync_zotero_collection(
             self, update_existing: bool = False, get_fulltext: bool = False
@@ -870,103 +1366,93 @@ class PaperLibrary:
             f"Local library -> Zotero \n\n: {zotero_update}"
         )
 
-    def _add_item_to_zotero(
-            self, paper_id:str, paper: pd.Series, collection_key: str, collection_items: Optional[List[Dict]] = None, update_existing=False,
-    ) -> str:
+    def _get_zotero_item_index(self, collection_key: Optional[str]) -> ZoteroItemIndex:
+        """
+        Return the index of the items of a Zotero collection, or of the whole library if no
+        collection is given.
+
+        The index is built on first use and afterwards updated with the items changed since the
+        library version it was built at: one request if nothing changed.
+        """
+        index = self._zotero_item_indexes.get(collection_key)
+        if index is None:
+            items, version = self.zotero_client.get_items_since(collection_key)
+            index = self._zotero_item_indexes[collection_key] = ZoteroItemIndex(items, version)
+            return index
+
+        items, version = self.zotero_client.get_items_since(collection_key, index.version)
+        if version != index.version:
+            changed_keys = {item["key"] for item in items}
+            # items that changed but are not top-level items of the collection any more
+            gone_keys = set(self.zotero_client.get_deleted_item_keys(index.version))
+            gone_keys |= set(self.zotero_client.get_changed_item_versions(index.version))
+            index.remove(gone_keys - changed_keys)
+            index.add(items)
+            index.version = version
+        return index
+
+    def _find_zotero_item(
+            self,
+            paper_id: str,
+            paper: pd.Series,
+            zotero_index: ZoteroItemIndex,
+            linked_items: Optional[Dict[str, Dict]] = None,
+    ) -> Optional[Dict]:
         """
-        Add a paper item to Zotero.
+        Find the Zotero item of a paper, by its Zotero key or else by its DOI or title.
 
         Args:
+            paper_id: The ID of the paper.
             paper: The paper details as a pandas Series.
-            collection_key: The key of the collection to add the paper to.
-            update_existing: Whether to update the item if it already exists in Zotero.
+            zotero_index: Index of the items of the collection.
+            linked_items: Items of linked papers outside the collection, by key.
 
         Returns:
-            str: Status message (added, updated, or skipped).
+            dict: The Zotero item, or None if the paper is not in Zotero.
         """
-        # Check if item already exists
-        existing_item = None
-        collection_key = collection_key if collection_key else self.collection_key
-
-        if notna(paper.get("zoteroKey")):
-            # Check if item is already in zotero
-            try:
-                # fixme: there has to be a better way to compare to existing collection items
-                if collection_items:
-                    existing_item = next(
-                        (item for item in collection_items if item["key"] == paper["zoteroKey"]),
-                        None,
-                    )
-                else:
-                    existing_item = self.zotero_client.get_item(paper["zoteroKey"])
-            except Exception as e:
-                existing_item = None
-
-        if not existing_item:
-            # Check if in zotero by title
-            found_titles = self.zotero_client.search_items(paper.title)
-
-            if found_titles:
-                existing_item = found_titles[0]
-                # Update paper in library with zotero key
-                self.papers_df.loc[paper_id, "zoteroKey"] = existing_item["key"]
-
-        if existing_item and update_existing:
-            template = self._create_zotero_item(paper_id, collection_key, paper)
-            result = self.zotero_client.update_item(template)
-            return "updated"
-        elif existing_item:
-            return "skipped"
-        else:
-            # Create new item in zotero
-            zot_item = self._create_zotero_item(paper_id, collection_key, paper)
-            try:
-                result = self.zotero_client.create_items([zot_item])
-            except Exception as e:
-                raise Exception(f"Error creating item in Zotero: {e}")
-
-            if not result.get("successful"):
-                raise Exception(f"Error creating item in Zotero: {result['failed']}")
-
-            # Update the zotero key in the papers library
-            self.papers_df.loc[paper_id, "zoteroKey"] = result["successful"]["0"][
-                "key"
-            ]
+        zotero_key = paper.get("zoteroKey")
+        zotero_key = zotero_key if notna(zotero_key) else None
+        if zotero_key and linked_items and zotero_key in linked_items:
+            return linked_items[zotero_key]
 
-            # Add to collection if specified
-            if collection_key and "successful" in result and result["successful"]:
-                # Get the key of the first successfully created item
-                self.zotero_client.add_to_collection(
-                    collection_key, result["successful"]["0"]
-                )
-
-            return "added"
+        existing_item = zotero_index.find(zotero_key, paper.get("DOI"), paper.get("title"))
+        if existing_item and existing_item["key"] != zotero_key:
+            # Update paper in library with zotero key
+            self._set_paper_field(paper_id, "zoteroKey", existing_item["key"])
+        return existing_item
 
     def _create_zotero_item(self, paper_id: str, collection_key: str, paper: pd.Series) -> Dict:
         """
-        Create a Zotero item template from paper data.
+        Create a Zotero item from paper data, validated against the template of its item type.
 
         Args:
+            paper_id: The ID of the paper, stored in the extra field.
             collection_key: The key of the collection to add the paper to.
             paper: The paper details as a pandas Series.
 
         Returns:
-            dict: Zotero item template.
+            dict: Zotero item data.
         """
         collection_key = collection_key if collection_key else self.collection_key
         template = self.zotero_client.item_template(itemtype=paper.itemType)
 
         # fill template fields with paper data
-        for field in template.keys():
-            template[field] = getattr_or_empty_str(paper, field)
+        for field, default in template.items():
+            value = getattr_or_empty_str(paper, field)
+            if isinstance(default, (list, dict)):
+                # e.g. no creators instead of the empty creator of the template
+                value = value if isinstance(value, (list, dict)) else type(default)()
+            elif not isinstance(value, (list, dict, str)):
+                value = str(value)
+            template[field] = value
         template["extra"] = paper_id
+        # tags of the library are plain strings
+        template["tags"] = [{"tag": tag} if isinstance(tag, str) else tag for tag in template.get("tags", [])]
 
         if collection_key:
             template["collections"] = [collection_key]
 
-        checked_item = self.zotero_client.check_items([template])
-
-        return checked_item[0]
+        return self.zotero_client.validate_item(template)
 
     def get_attachment_info(self, item_key: str) -> Dict:
         """
@@ -988,40 +1474,85 @@ class PaperLibrary:
         children = self.zotero_client.get_children(item_key)
 
         # Extract information about the attachments
-        attachments = []
-        for child in children:
-            content_type = child["data"].get("contentType")
-            key = child["data"].get("key")
-            if key and content_type:
-                attachment = {
-                    "key": key,
-                    "contentType": content_type,
-                    # optional attributes
-                    "title": child["data"]["title"] if hasattr(child["data"], "title") else None,
-                    "linkMode": child["data"]["linkMode"] if hasattr(child["data"], "linkMode") else None,
-                    "url": child["data"]["url"] if hasattr(child["data"], "url") else None,
-                }
-                attachments.append(attachment)
-
+        attachments = [
+            ZoteroClient.attachment_info(child) for child in children
+            if child["data"].get("key") and child["data"].get("contentType")
+        ]
 
         return {"item": item, "attachments": attachments}
 
-    def retrieve_all_zotero_attachments(self) -> str:
+    def _get_pdf_attachments(self, item_key: str) -> List[Dict]:
+        """PDF attachments of a Zotero item, see ZoteroClient.attachment_info."""
+        return [
+            ZoteroClient.attachment_info(child) for child in self.zotero_client.get_children(item_key)
+            if child["data"].get("contentType") == PDF_CONTENT_TYPE
+        ]
+
+    def _resolve_pdf_attachments(
+            self, item_keys: List[str], collection_key: Optional[str] = None
+    ) -> Optional[Dict[str, List[Dict]]]:
+        """
+        List the PDF attachments of many items in bulk, see ZoteroClient.get_pdf_attachments.
+
+        Args:
+            item_keys: Keys of the items, top-level items of the collection.
+            collection_key: Collection of the items (default: the whole library).
+
+        Returns:
+            dict: PDF attachments by item key, or None for few items, whose attachments are
+                cheaper to look up one by one.
+        """
+        if len(item_keys) < BULK_ATTACHMENT_MIN_ITEMS:
+            return None
+        attachments = self.zotero_client.get_pdf_attachments(collection_key)
+        return {item_key: attachments.get(item_key, []) for item_key in item_keys}
+
+    def retrieve_all_zotero_attachments(
+            self, io_workers: int = DEFAULT_IO_WORKERS, parse_workers: Optional[int] = None
+    ) -> str:
+        """
+        Retrieve and parse the PDF attachments of all library papers linked to Zotero items and
+        store their full texts in the library.
+
+        The attachments are listed in bulk for the library's collection, or for the whole Zotero
+        library without one, see ZoteroClient.get_pdf_attachments.
+
+        Args:
+            io_workers: Number of concurrent Zotero requests.
+            parse_workers: Number of parsing processes (default: the library's pdf_parser).
+
+        Returns:
+            str: Status message.
+        """
         # Initialize Zotero if not already
         self.zotero_client.init()
 
         downloaded = []
         errors = []
-
-        for paper_id, paper in self.papers_df.iterrows():
-            if paper["zoteroKey"]:
-                try:
-                    fulltext = self.retrieve_parsed_fulltext_from_zotero_item(paper["zoteroKey"])
-                    self.papers_fulltext_df.at[paper.index, "fulltext"] = fulltext
-                    downloaded.append(paper["title"])
-                except Exception as e:
-                    errors.append(paper["title"])
-                    logger.debug(f"Could not download file for paper {paper['title']}: {e}")
+        changed_ids = []
+
+        linked = self._find_by_zotero_keys(self.papers_df["zoteroKey"].dropna()) \
+            if "zoteroKey" in self.papers_df.columns else {}
+        item_keys = list(linked)
+        with tqdm(total=len(item_keys), desc="Retrieving attachments", unit="item") as progress:
+            fulltexts = self.retrieve_fulltexts_from_zotero_items(
+                item_keys,
+                io_workers=io_workers,
+                parse_workers=parse_workers,
+                progress=progress,
+                attachments=self._resolve_pdf_attachments(item_keys, self.collection_key),
+            )
+        for item_key, paper_id in linked.items():
+            title = self._get_paper_field(paper_id, "title")
+            if fulltexts[item_key]["content"]:
+                self._set_paper_field(paper_id, "fulltext", fulltexts[item_key]["content"])
+                downloaded.append(title)
+                changed_ids.append(paper_id)
+            else:
+                errors.append(title)
+                logger.debug(f"Could not download file for paper {title}")
+        if self.vector_store is not None and changed_ids:
+            self.update_vector_store(changed_ids)
 
         return (
             f"Downloaded {len(downloaded)} files. "
@@ -1030,13 +1561,14 @@ class PaperLibrary:
             f"\n Errors: {errors}"
         )
 
-    def retrieve_fulltext_from_zotero_item(self, item_key: str) -> Dict:
+    def retrieve_fulltext_from_zotero_item(self, item_key: str, attachments: Optional[List[Dict]] = None) -> Dict:
         """
         Retrieve full-text content for a Zotero item and store in library. Will raise exception if
         no attachment was found.
 
         Args:
             item_key: The key of the Zotero item.
+            attachments: PDF attachments of the item if known, see _resolve_pdf_attachments.
 
         Returns:
             dict: Full-text content and metadata.
@@ -1047,109 +1579,308 @@ class PaperLibrary:
             "totalPages": None,
         }
         try:
-            attachments = self.get_attachment_info(item_key).get("attachments")
-
-            if attachments:
-                # Get first attachment that is a PDF
-                pdf_attachments = [
-                    x for x in attachments if x.get("contentType") == "application/pdf"
-                ]
-
-                if not pdf_attachments:
-                    raise Exception(f"No paper attachments found for {item_key}")
-
+            pdf_attachments = self._get_pdf_attachments(item_key) if attachments is None else attachments
 
+            if pdf_attachments:
                 target_attachment = pdf_attachments[0]
 
                 fulltext = self.zotero_client.get_fulltext(target_attachment["key"])
-                result.content = fulltext
+                result.update({key: fulltext.get(key) for key in result})
                 return result
             else:
-                raise Exception(f"No attachments found for {item_key}")
+                raise Exception(f"No PDF attachments found for {item_key}")
 
         except Exception as e:
             logger.warning(f"Could not retrieve full-text content for {item_key}: {e}")
             return result
 
 
-    def retrieve_parsed_fulltext_from_zotero_item(self, item_key: str) -> Dict:
+    @staticmethod
+    def _empty_fulltext_result() -> Dict:
+        return {
+            "content": "",
+            "indexedPages": None,  # number of parsed pages in content
+            "totalPages": None,    # number of pages of the document
+        }
+
+    @staticmethod
+    def _normalize_pages(pages: Optional[Iterable[int]]) -> Optional[List[int]]:
+        """Sort and deduplicate requested page numbers, None for the whole document."""
+        if pages is None:
+            return None
+        pages = sorted(set(pages))
+        if pages and pages[0] < 0:
+            raise ValueError("Page numbers must be non-negative.")
+        return pages
+
+    def _page_options(self, page: int) -> Dict[str, Any]:
+        """Cache options of a single parsed page."""
+        return {**self.pdf_parser.markdown_options, "page": page}
+
+    @staticmethod
+    def _page_fulltext_result(page_texts: Dict[int, str], total_pages: Optional[int]) -> Dict:
+        """Join parsed pages into a full-text result."""
+        return {
+            "content": "".join(page_texts[page] for page in sorted(page_texts)),
+            "indexedPages": len(page_texts),
+            "totalPages": total_pages,
+        }
+
+    def _look_up_fulltext(self, source: str, refresh: str | bool = False, pages: Optional[List[int]] = None) -> Dict:
         """
-        Retrieve full-text content for a Zotero item using PyMuPDF4LLM parsing.
-        Will raise exception if no attachment was found.
+        Look up a parsed full text in the cache, see retrieve_parsed_fulltext_from_zotero_item.
+
+        Returns:
+            dict: The complete result under "cached" if it is cached. For page ranges otherwise the
+            cached page texts under "cached_pages" and the pages left to parse under "missing_pages".
+        """
+        if refresh is True:
+            return {} if pages is None else {"cached_pages": {}, "missing_pages": pages}
+        parser_version = self.pdf_parser.version if refresh == "parser" else None
+        if pages is None:
+            cached = self.fulltext_cache.get(source, self.pdf_parser.markdown_options, parser_version)
+            return {} if cached is None else {"cached": cached}
+
+        # pages are cached one by one, so that further pages can be parsed later
+        cached_pages = {}
+        total_pages = None
+        for page in pages:
+            if total_pages is not None and page >= total_pages:
+                break
+            entry = self.fulltext_cache.get(source, self._page_options(page), parser_version)
+            if entry is not None:
+                cached_pages[page] = entry["content"]
+                total_pages = entry["totalPages"]
+        missing_pages = [
+            page for page in pages if page not in cached_pages and (total_pages is None or page < total_pages)
+        ]
+        if not missing_pages:
+            return {"cached": self._page_fulltext_result(cached_pages, total_pages)}
+        return {"cached_pages": cached_pages, "missing_pages": missing_pages}
+
+    def _fetch_zotero_pdf(
+            self,
+            item_key: str,
+            refresh: str | bool = False,
+            pages: Optional[List[int]] = None,
+            attachments: Optional[List[Dict]] = None,
+    ) -> Dict:
+        """
+        Network stage of the full-text retrieval: look up the cache or locate / download the first
+        PDF attachment.
 
         Args:
             item_key: The key of the Zotero item.
+            refresh: See retrieve_parsed_fulltext_from_zotero_item.
+            pages: Normalized page numbers to retrieve, None for the whole document.
+            attachments: PDF attachments of the item if known, see _resolve_pdf_attachments.
 
         Returns:
-            dict: Full-text content and metadata with hierarchical structure.
+            dict: Either the cached full-text result under "cached", or the "document" to parse, a
+            path in the local storage or the downloaded content, along with the cache lookup of
+            _look_up_fulltext. Both come with the content identity of the attachment under "source".
         """
+        pdf_attachments = self._get_pdf_attachments(item_key) if attachments is None else attachments
 
-        result = {
-            "content": "",
-            "indexedPages": None,  # PyMuPDF4LLM processes all pages
-            "totalPages": None,    # Can extract if needed
-        }
-        try:
-            attachments = self.get_attachment_info(item_key).get("attachments")
+        if not pdf_attachments:
+            raise Exception("No PDF attachments found for item." + item_key)
 
-            if not attachments:
-                raise Exception("No attachments found for item.")
+        target_attachment = pdf_attachments[0]
+        attachment_key = target_attachment["key"]
 
-            # Get first attachment that is a PDF
-            pdf_attachments = [
-                x for x in attachments if x.get("contentType") == "application/pdf"
-            ]
+        # address the content by its hash, else by the attachment version
+        if target_attachment.get("md5"):
+            source = f"md5:{target_attachment['md5']}"
+        else:
+            source = f"zotero:{attachment_key}@{target_attachment.get('version')}"
+
+        lookup = self._look_up_fulltext(source, refresh, pages)
+        if "cached" in lookup:
+            return {**lookup, "source": source}
+
+        if self.local_storage_path:
+            folder_path = os.path.join(self.local_storage_path, f"{attachment_key}")
+            # get first pdf file in folder
+            pdf_files = [f for f in os.listdir(folder_path) if f.endswith('.pdf')]
+            if not pdf_files:
+                raise Exception(f"No PDF files found in local storage for attachment {attachment_key}")
+            return {**lookup, "document": os.path.join(folder_path, pdf_files[0]), "source": source}
+
+        # Download PDF content, it is parsed from memory
+        return {**lookup, "document": self.zotero_client.download_file(attachment_key), "source": source}
+
+    def _store_parsed_fulltext(self, item_key: str, parse_result: ParseResult, pdf: Dict) -> Dict:
+        """Wrap a successful parse of a fetched PDF in a full-text result and save it in the cache."""
+        if not parse_result.ok:
+            raise Exception(parse_result.error)
+        source = pdf["source"]
+        if pdf.get("missing_pages") is None:
+            result = self._empty_fulltext_result()
+            result["content"] = parse_result.markdown
+            result["indexedPages"] = parse_result.page_count
+            result["totalPages"] = parse_result.page_count
+            self.fulltext_cache.set(source, result, self.pdf_parser.markdown_options, self.pdf_parser.version)
+        else:
+            for page, text in parse_result.pages.items():
+                self.fulltext_cache.set(
+                    source,
+                    {"content": text, "totalPages": parse_result.page_count},
+                    self._page_options(page),
+                    self.pdf_parser.version,
+                )
+            result = self._page_fulltext_result({**pdf["cached_pages"], **parse_result.pages}, parse_result.page_count)
+        return result
 
-            if not pdf_attachments:
-                raise Exception("No PDF attachments found for item." + item_key)
-
-            target_attachment = pdf_attachments[0]
-            attachment_key = target_attachment["key"]
-
-            # Check cache first
-            cache_path = f"cache/{item_key}_fulltext.json"
-            if os.path.exists(cache_path):
-                with open(cache_path, "r") as f:
-                    cached_result = json.load(f)
-                return cached_result
-
-            if self.local_storage_path:
-                folder_path = os.path.join(self.local_storage_path, f"{attachment_key}")
-                # get first pdf file in folder
-                pdf_files = [f for f in os.listdir(folder_path) if f.endswith('.pdf')]
-                if not pdf_files:
-                    raise Exception(f"No PDF files found in local storage for attachment {attachment_key}")
-                temp_path = os.path.join(folder_path, pdf_files[0])
-            else:
-                # Download PDF content
-                pdf_content = self.zotero_client.get_file(attachment_key)
+    def retrieve_parsed_fulltext_from_zotero_item(
+            self,
+            item_key: str,
+            refresh: str | bool = False,
+            pages: Optional[Iterable[int]] = None,
+    ) -> Dict:
+        """
+        Retrieve full-text content for a Zotero item using PyMuPDF4LLM parsing.
+        Will raise exception if no attachment was found.
+
+        Parsed full texts are cached by attachment content and parser options. Full texts parsed
+        by another parser version are reused unless refresh asks for re-parsing. With pages, only
+        the given pages are parsed and each page is cached on its own, so that requesting further
+        pages later does not parse the earlier ones again.
 
-                # Save temporarily
-                temp_path = f"/tmp/{attachment_key}.pdf"
-                with open(temp_path, 'wb') as f:
-                    f.write(pdf_content)
+        Args:
+            item_key: The key of the Zotero item.
+            refresh: True to re-parse regardless of the cache, 'parser' to re-parse full texts
+                of other parser versions.
+            pages: Page numbers (0-based) to retrieve, e.g. range(5) for the first five pages
+                (default: the whole document).
 
+        Returns:
+            dict: Full-text content and metadata with hierarchical structure. indexedPages is the
+            number of pages in the content and totalPages the number of pages of the document.
+        """
+        try:
+            pages = self._normalize_pages(pages)
+            pdf = self._fetch_zotero_pdf(item_key, refresh, pages)
+            if "cached" in pdf:
+                return pdf["cached"]
 
             # Parse with PyMuPDF4LLM
-            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()): # disable weirdly persistent print output
-                md_text = pymupdf4llm.to_markdown(temp_path, header=False, footer=False)
+            parse_result = self.pdf_parser.parse(pdf.pop("document"), source=item_key, pages=pdf.get("missing_pages"))
+            return self._store_parsed_fulltext(item_key, parse_result, pdf)
 
+        except Exception as e:
+            logger.error(f"Could not retrieve full-text for item {item_key}: {e}")
+            return self._empty_fulltext_result()
 
-            # Clean up temp file
-            if not self.local_storage_path:
-                os.remove(temp_path)
+    def retrieve_fulltexts_from_zotero_items(
+            self,
+            item_keys: List[str],
+            get_fulltext: str = "parsed",
+            io_workers: int = DEFAULT_IO_WORKERS,
+            parse_workers: Optional[int] = None,
+            progress: Optional[tqdm] = None,
+            refresh: str | bool = False,
+            pages: Optional[Iterable[int]] = None,
+            attachments: Optional[Dict[str, List[Dict]]] = None,
+    ) -> Dict[str, Dict]:
+        """
+        Retrieve the full texts of many Zotero items concurrently.
 
-            result["content"] = md_text
-            # save result in cache
-            # make directory cache in working dir if not exists
-            os.mkdir("cache") if not os.path.exists("cache") else None
-            with open(f"cache/{item_key}_fulltext.json", "w") as f:
-                json.dump(result, f)
-            return result
+        Attachment lookups and downloads run in a bounded thread pool. Downloaded PDFs are queued
+        to the worker processes of the PDF parser, so parsing overlaps with the network and scales
+        with the available cores. Failures of single items are logged and leave their result empty.
 
-        except Exception as e:
-            logger.error(f"Could not retrieve full-text for item {item_key}: {e}")
-            return result
+        Args:
+            item_keys: Keys of the Zotero items.
+            get_fulltext: 'parsed' to parse the PDF attachments, 'raw' for Zotero's indexed full text.
+            io_workers: Number of concurrent network requests.
+            parse_workers: Number of parsing processes for this call (default: the library's pdf_parser).
+            progress: Progress bar advanced for every finished item.
+            refresh: See retrieve_parsed_fulltext_from_zotero_item.
+            pages: Page numbers (0-based) to retrieve of every item (default: the whole documents).
+            attachments: PDF attachments of the items listed in bulk, see _resolve_pdf_attachments
+                (default: looked up per item).
+
+        Returns:
+            dict: Full-text result per item key, as returned by retrieve_parsed_fulltext_from_zotero_item.
+        """
+        self.zotero_client.init()
+
+        results = {item_key: self._empty_fulltext_result() for item_key in item_keys}
+        attachments = attachments or {}
+        if get_fulltext != "parsed":
+            with ThreadPoolExecutor(max_workers=io_workers) as io_pool:
+                item_attachments = [attachments.get(item_key) for item_key in item_keys]
+                fulltexts = io_pool.map(self.retrieve_fulltext_from_zotero_item, item_keys, item_attachments)
+                for item_key, result in zip(item_keys, fulltexts):
+                    results[item_key] = result
+                    if progress is not None:
+                        progress.update(1)
+            return results
+
+        if parse_workers is None:
+            parser = self.pdf_parser
+        else:
+            parser = BatchPdfParser(
+                max_workers=parse_workers,
+                timeout=self.pdf_parser.timeout,
+                max_memory_mb=self.pdf_parser.max_memory_mb,
+                markdown_options=self.pdf_parser.markdown_options,
+            )
+        pages = self._normalize_pages(pages)
+        # bound the downloaded PDFs waiting for a parser, they are held in memory
+        max_in_flight = io_workers + 2 * parser.max_workers
+        pending_keys = iter(dict.fromkeys(item_keys))
+        fetching: Dict[Future, str] = {}
+        parsing: Dict[Future, Tuple[str, Dict]] = {}
+
+        def finish(item_key: str, result: Optional[Dict] = None):
+            if result is not None:
+                results[item_key] = result
+            if progress is not None:
+                progress.update(1)
+
+        try:
+            with ThreadPoolExecutor(max_workers=io_workers) as io_pool:
+                while True:
+                    while len(fetching) < io_workers and len(fetching) + len(parsing) < max_in_flight:
+                        item_key = next(pending_keys, None)
+                        if item_key is None:
+                            break
+                        fetching[
+                            io_pool.submit(
+                                self._fetch_zotero_pdf, item_key, refresh, pages,
+                                attachments.get(item_key),
+                            )
+                        ] = item_key
+                    if not fetching and not parsing:
+                        break
+
+                    done, _ = wait([*fetching, *parsing], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future in fetching:
+                            item_key = fetching.pop(future)
+                            try:
+                                pdf = future.result()
+                            except Exception as e:
+                                logger.error(f"Could not retrieve full-text for item {item_key}: {e}")
+                                finish(item_key)
+                                continue
+                            if "cached" in pdf:
+                                finish(item_key, pdf["cached"])
+                            else:
+                                future = parser.submit(pdf.pop("document"), source=item_key, pages=pdf.get("missing_pages"))
+                                parsing[future] = (item_key, pdf)
+                        else:
+                            item_key, pdf = parsing.pop(future)
+                            try:
+                                finish(item_key, self._store_parsed_fulltext(item_key, future.result(), pdf))
+                            except Exception as e:
+                                logger.error(f"Could not parse full-text for item {item_key}: {e}")
+                                finish(item_key)
+        finally:
+            if parser is not self._pdf_parser:
+                parser.close()
+        return results
 
     def retrieve_pdf_from_zotero_item(self, item_key: str) -> bytes:
         """
@@ -1163,6 +1894,42 @@ class PaperLibrary:
 
 
 
+    def update_vector_store(self, paper_ids: Optional[Iterable[str]] = None) -> str:
+        """
+        Update the vector store with the library papers, embedding only new or changed chunks.
+
+        Called after every update of the library; call it directly after editing paper texts.
+
+        Args:
+            paper_ids: Papers to update, papers no longer in the library are deleted from the
+                store (default: the whole library, deleting all other papers from the store).
+
+        Returns:
+            str: Status message.
+        """
+        if self.vector_store is None:
+            raise ValueError("No vector store configured for the library.")
+        if paper_ids is None:
+            present = list(self.papers_df.index)
+            removed = self.vector_store.paper_ids().difference(present)
+        else:
+            paper_ids = pd.Index(list(paper_ids)).unique()
+            present = self._existing_paper_ids(paper_ids)
+            removed = set(paper_ids).difference(present)
+
+        papers_df = self.papers_df.reindex(index=present, columns=VECTOR_STORE_FIELDS)
+        texts = {}
+        metadatas = {}
+        for paper_id, fields in zip(papers_df.index, papers_df.itertuples(index=False)):
+            texts[paper_id] = "\n\n".join(text for text in fields if isinstance(text, str) and text)
+            metadatas[paper_id] = {"title": fields[0] if isinstance(fields[0], str) else ""}
+        counts = self.vector_store.upsert_texts(texts, metadatas)
+        deleted = counts["deleted"] + self.vector_store.delete_papers(removed)
+        return (
+            f"Vector store updated for {len(texts)} papers: {counts['added']} chunks embedded, "
+            f"{counts['unchanged']} unchanged, {deleted} deleted."
+        )
+
     def get_paper_text(self, paper_id: str, text_type: str = "fulltext") -> str:
         """
         Retrieve the full-text content for a paper in the library.
@@ -1178,9 +1945,9 @@ class PaperLibrary:
         if text_type not in ["fulltext", "abstractNote"]:
             raise ValueError("text_type must be either 'fulltext' or 'abstractNote'.")
 
-        if paper_id in self.papers_df.index:
+        if self._has_paper(paper_id):
             try:
-                text = self.papers_df.at[paper_id, text_type]
+                text = self._get_paper_field(paper_id, text_type)
                 if isinstance(text, str) and text != "":
                     return text
                 raise ValueError(
@@ -1197,6 +1964,24 @@ class PaperLibrary:
             raise ValueError(f"Paper with ID {paper_id} not found in library.")
 
 
+    def search_library(self, query: str, k: int = 10) -> pd.DataFrame:
+        """
+        Search the titles, abstracts and full texts of the library papers, ranked by BM25.
+
+        Args:
+            query: Free-text query.
+            k: Maximum number of papers to return.
+
+        Returns:
+            pd.DataFrame: Matching papers without full texts, best match first, with their score
+                in the column 'score'.
+        """
+        results = self._get_search_index().search(query, k)
+        paper_ids = [paper_id for paper_id, _ in results]
+        papers_df = self.papers_df.loc[paper_ids].drop(columns=["fulltext"], errors="ignore")
+        papers_df["score"] = [score for _, score in results]
+        return papers_df
+
     def set_paper_tags(self, paper_id: str, tags: List[str]) -> str:
         """
         Set tags for a paper in the library.
@@ -1208,8 +1993,8 @@ class PaperLibrary:
         Returns:
             str: Status message.
         """
-        if paper_id in self.papers_df.index:
-            self.papers_df.loc[paper_id, "tags"] = tags
+        if self._has_paper(paper_id):
+            self._set_paper_field(paper_id, "tags", tags)
             return f"Tags {tags} set for paper with ID {paper_id}."
         else:
             raise ValueError(f"Paper with ID {paper_id} not found in library.")
@@ -1225,8 +2010,8 @@ class PaperLibrary:
         Returns:
             str: Status message.
         """
-        if paper_id in self.papers_df.index:
-            self.papers_df.loc[paper_id, "summary"] = summary
+        if self._has_paper(paper_id):
+            self._set_paper_field(paper_id, "summary", summary)
             return f"Summary added for paper with ID {paper_id}."
         else:
             raise ValueError(f"Paper with ID {paper_id} not found in library.")
@@ -1246,4 +2031,53 @@ class PaperLibrary:
             return f"Library exported to {file_path}."
         except Exception as e:
             logger.error(f"Error exporting library to CSV: {e}")
-            raise ValueError(f"Error exporting library to CSV: {e}")
\ No newline at end of file
+            raise ValueError(f"Error exporting library to CSV: {e}")
+
+    def save(self, path: str) -> str:
+        """
+        Save the library to a store directory of parquet files, see helpers.library_store, together
+        with its search index if it was built and the Zotero library versions of its last syncs.
+        A search index lacking the full texts of papers loaded without them is not saved.
+
+        Args:
+            path: Store directory, created if it does not exist.
+
+        Returns:
+            str: Status message.
+        """
+        save_library(self.papers_df, path, unloaded_fulltext_ids=self._unloaded_fulltext_ids)
+        search_index_path = os.path.join(path, SEARCH_INDEX_FILE)
+        if self._search_index is not None and not self._search_index_incomplete:
+            self._search_index.save(search_index_path)
+        elif os.path.exists(search_index_path):
+            # the stored index may not match the saved papers any more
+            os.remove(search_index_path)
+        with open(os.path.join(path, SYNC_STATE_FILE), "w") as f:
+            json.dump({"zotero_versions": self._get_zotero_versions()}, f)
+        return f"Library of {len(self.papers_df)} papers saved to {path}."
+
+    def load(self, path: str, fulltext: bool = True) -> str:
+        """
+        Load the library from a store directory written by save, replacing the current papers.
+
+        Args:
+            path: Store directory.
+            fulltext: Whether to load the full texts. Libraries loaded without them keep the
+                stored full texts when saved to the same directory again, and a stored search
+                index still covers them.
+
+        Returns:
+            str: Status message.
+        """
+        self.papers_df = load_library(path, fulltext=fulltext)
+        if not fulltext:
+            self._unloaded_fulltext_ids = set(self.papers_df.index)
+        search_index_path = os.path.join(path, SEARCH_INDEX_FILE)
+        if os.path.exists(search_index_path):
+            self._search_index = BM25Index.load(search_index_path)
+        sync_state_path = os.path.join(path, SYNC_STATE_FILE)
+        if os.path.exists(sync_state_path):
+            with open(sync_state_path) as f:
+                for collection_key, version in json.load(f)["zotero_versions"].items():
+                    self._set_zotero_version(collection_key, version)
+        return f"Library of {len(self.papers_df)} papers loaded from {path}."
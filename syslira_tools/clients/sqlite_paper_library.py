@@ -0,0 +1,246 @@
+import sqlite3
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from syslira_tools.clients.openalex_client import OpenAlexClient
+from syslira_tools.clients.paper_library import PaperLibrary
+from syslira_tools.clients.zotero_client import ZoteroClient
+from syslira_tools.helpers.dedup import MinHashLSH
+from syslira_tools.helpers.fulltext_cache import FulltextCache
+from syslira_tools.helpers.library_db import LibraryDatabase
+from syslira_tools.helpers.pdf_parsing import BatchPdfParser
+from syslira_tools.helpers.search_index import tokenize
+
+# Prefix of the meta keys holding the Zotero library version of the last sync of a collection
+ZOTERO_VERSION_KEY = "zotero_version:"
+
+if TYPE_CHECKING:
+    # requires the optional LangChain dependencies
+    from syslira_tools.helpers.vector_store import IncrementalVectorStore
+
+
+class SQLitePaperLibrary(PaperLibrary):
+    """
+    PaperLibrary stored in a SQLite database instead of an in-memory dataframe.
+
+    Lookups by id, DOI, normalized title and Zotero key use the indexes of the database, every
+    mutation is a transaction, and several processes can work on the same library file. papers_df
+    is a read-only snapshot of the database, re-read after changes; modify the library through
+    its methods.
+    """
+
+    def __init__(
+            self,
+            zotero_client: ZoteroClient,
+            openalex_client: OpenAlexClient,
+            db_path: str,
+            collection_key: str = None,
+            local_storage_path: str = None,
+            similarity_threshold: float = 0.85,
+            pdf_parser: Optional[BatchPdfParser] = None,
+            fulltext_cache: Optional[FulltextCache] = None,
+            vector_store: Optional["IncrementalVectorStore"] = None,
+    ):
+        """
+        Initialize the paper library, opening or creating its database.
+
+        Args:
+            zotero_client: Initialized ZoteroClient instance.
+            openalex_client: Initialized OpenAlexClient instance.
+            db_path: Path of the SQLite library file, or ':memory:'.
+            collection_key: Default working collection key for Zotero.
+            local_storage_path: Path for local storage of the library.
+            similarity_threshold: Title similarity above which papers are near-duplicates
+                when deduplicating with deduplicate="fuzzy".
+            pdf_parser: Parser for PDF attachments, see PaperLibrary.
+            fulltext_cache: Cache for parsed full texts, see PaperLibrary.
+            vector_store: Vector store of paper chunks, see PaperLibrary.
+        """
+        super().__init__(
+            zotero_client,
+            openalex_client,
+            collection_key=collection_key,
+            local_storage_path=local_storage_path,
+            similarity_threshold=similarity_threshold,
+            pdf_parser=pdf_parser,
+            fulltext_cache=fulltext_cache,
+            vector_store=vector_store,
+        )
+        self.db = LibraryDatabase(db_path)
+        # snapshot of the database for papers_df, valid for one (data version, local change count)
+        self._snapshot: Optional[pd.DataFrame] = None
+        self._snapshot_version = None
+        self._changes = 0
+        # data version of the database the near-duplicate title index was built from
+        self._lsh_version = None
+
+    def _version(self):
+        return self.db.data_version(), self._changes
+
+    @property
+    def papers_df(self) -> pd.DataFrame:
+        """Snapshot of the paper library dataframe, indexed by paper id."""
+        version = self._version()
+        if self._snapshot is None or self._snapshot_version != version:
+            papers_df = self.db.to_df()
+            self._snapshot = papers_df.reindex(
+                columns=[column for column in self.columns if column != "id"]
+                + [column for column in papers_df.columns if column not in self.columns]
+            )
+            self._snapshot_version = version
+        return self._snapshot
+
+    @papers_df.setter
+    def papers_df(self, papers_df: pd.DataFrame):
+        # replaces all papers of the database
+        with self.db.transaction():
+            self.db.clear()
+            self.db.upsert(papers_df)
+            # a replaced library needs a full sync
+            self.db.clear_meta(ZOTERO_VERSION_KEY)
+        self._changes += 1
+        self._title_lsh = None
+
+    def _has_paper(self, paper_id: str) -> bool:
+        return paper_id in self.db
+
+    def _existing_paper_ids(self, paper_ids: pd.Index) -> List[str]:
+        return [paper_id for paper_id in paper_ids if paper_id in self.db]
+
+    def _paper_count(self) -> int:
+        return len(self.db)
+
+    def _get_papers(self, paper_ids: List[str]) -> pd.DataFrame:
+        return self.db.to_df(ids=paper_ids)
+
+    def _get_paper_field(self, paper_id: str, field: str) -> Any:
+        return self.db.get_field(paper_id, field)
+
+    def _find_by_title(self, title: str) -> Optional[str]:
+        return self.db.find_by_title(title)
+
+    def _find_by_doi(self, doi: str) -> Optional[str]:
+        return self.db.find_by_doi(doi)
+
+    def find_by_zotero_key(self, zotero_key: str) -> Optional[str]:
+        """
+        Find the library paper linked to a Zotero item.
+
+        Args:
+            zotero_key: Key of the Zotero item.
+
+        Returns:
+            The id of the paper, or None if no paper is linked to the item.
+        """
+        return self.db.find_by_zotero_key(zotero_key)
+
+    def _find_by_zotero_keys(self, zotero_keys: Iterable[str]) -> Dict[str, str]:
+        linked = {}
+        for zotero_key in zotero_keys:
+            paper_id = self.db.find_by_zotero_key(zotero_key)
+            if paper_id is not None:
+                linked[zotero_key] = paper_id
+        return linked
+
+    def _get_zotero_version(self, collection_key: str) -> Optional[int]:
+        return self.db.get_meta(ZOTERO_VERSION_KEY + collection_key)
+
+    def _set_zotero_version(self, collection_key: str, version: int):
+        self.db.set_meta(ZOTERO_VERSION_KEY + collection_key, version)
+
+    def _get_zotero_versions(self) -> Dict[str, int]:
+        return self.db.get_meta_items(ZOTERO_VERSION_KEY)
+
+    def _index_papers(self, papers_df: pd.DataFrame):
+        # the database maintains the exact indexes, only the near-duplicate index is in memory
+        if self._title_lsh is not None and "title" in papers_df.columns:
+            self._title_lsh.insert_many(papers_df.index, papers_df["title"].tolist())
+
+    def _unindex_papers(self, paper_ids: List[str]):
+        if self._title_lsh is not None:
+            for paper_id in set(paper_ids):
+                self._title_lsh.remove(paper_id)
+
+    def _append_papers(self, papers_df: pd.DataFrame):
+        self.db.upsert(papers_df)
+        self._changes += 1
+        self._index_papers(papers_df)
+
+    def _remove_papers(self, paper_ids: List[str]):
+        if len(paper_ids) == 0:
+            return
+        self.db.delete(paper_ids)
+        self._changes += 1
+        self._unindex_papers(paper_ids)
+
+    def _set_paper_field(self, paper_id: str, field: str, value: Any):
+        self.db.set_field(paper_id, field, value)
+        self._changes += 1
+        if field == "title" and self._title_lsh is not None:
+            self._title_lsh.insert_many([paper_id], [value])
+
+    def _get_title_lsh(self) -> MinHashLSH:
+        # other processes may have changed the library since the index was built
+        data_version = self.db.data_version()
+        if (
+                self._title_lsh is None
+                or self._title_lsh.threshold != self.similarity_threshold
+                or self._lsh_version != data_version
+        ):
+            self._title_lsh = MinHashLSH(threshold=self.similarity_threshold)
+            self._title_lsh.insert_many(*self.db.titles())
+            self._lsh_version = data_version
+        return self._title_lsh
+
+    def _merge_papers(self, papers_df: pd.DataFrame, deduplicate: bool | str) -> Tuple[int, List[str]]:
+        # checking against the library and writing the new papers is one transaction
+        with self.db.transaction():
+            return super()._merge_papers(papers_df, deduplicate)
+
+    def search_fulltext(self, query: str, k: int = 10) -> pd.DataFrame:
+        """
+        Search the titles, abstracts and full texts of the library.
+
+        Args:
+            query: SQLite FTS5 query, e.g. 'transformer AND "protein folding"'.
+            k: Maximum number of papers to return.
+
+        Returns:
+            pd.DataFrame: Matching papers without full texts, best match first, with their BM25
+                score in the column 'score'.
+        """
+        try:
+            results = self.db.search(query, k)
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid full-text query {query!r}: {e}")
+        return self._ranked_papers(results)
+
+    def _ranked_papers(self, results: List[Tuple[str, float]]) -> pd.DataFrame:
+        paper_ids = [paper_id for paper_id, _ in results]
+        papers_df = self.db.to_df(fulltext=False, ids=paper_ids).reindex(paper_ids)
+        papers_df["score"] = [score for _, score in results]
+        return papers_df
+
+    def search_library(self, query: str, k: int = 10) -> pd.DataFrame:
+        """
+        Search the titles, abstracts and full texts of the library papers, ranked by BM25.
+
+        Uses the full-text index of the database, matching any term of the query.
+
+        Args:
+            query: Free-text query.
+            k: Maximum number of papers to return.
+
+        Returns:
+            pd.DataFrame: Matching papers without full texts, best match first, with their score
+                in the column 'score'.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return self._ranked_papers([])
+        return self.search_fulltext(" OR ".join(f'"{term}"' for term in terms), k)
+
+    def close(self):
+        """Close the library database."""
+        self.db.close()
@@ -1,8 +1,28 @@
+import copy
 import os
-from typing import Dict, List, Optional
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from pyzotero import zotero
 
+# Read size when streaming attachment downloads
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Maximum number of item keys per request of the Zotero API
+MAX_KEYS_PER_REQUEST = 50
+# Maximum number of items per write request of the Zotero API
+MAX_ITEMS_PER_WRITE = 50
+# Fields of items to write that are not in the item templates
+WRITE_FIELDS = {"key", "version"}
+PDF_CONTENT_TYPE = "application/pdf"
+
+
+class _ThreadZotero(zotero.Zotero):
+    """pyzotero client of one thread, sharing the HTTP client of the client created by ZoteroClient.init."""
+
+    def __del__(self):
+        # the shared HTTP client stays open for the other threads
+        pass
+
 
 class ZoteroClient:
     """Client for handling Zotero API operations."""
@@ -27,6 +47,10 @@ class ZoteroClient:
         self.client = None
 
         self.collections = {}
+        # item type -> item template
+        self._templates: Dict[str, Dict] = {}
+        # pyzotero clients of the threads calling this client, see _api
+        self._local = threading.local()
 
     def init(self, reinit: bool = False) -> str:
         """
@@ -59,55 +83,259 @@ class ZoteroClient:
 
         return "Zotero client initialized."
 
+    @property
+    def _api(self) -> zotero.Zotero:
+        """
+        The pyzotero client of the calling thread. pyzotero keeps the state of a request (url_params,
+        the last response) on the client, so concurrent threads each use their own, sharing the
+        thread-safe HTTP client and connection pool of the client created by init.
+        """
+        api = getattr(self._local, "api", None)
+        if api is None or api.client is not self.client.client:
+            api = _ThreadZotero(
+                library_id=self.library_id,
+                library_type=self.library_type,
+                api_key=self.api_key,
+                client=self.client.client,
+            )
+            self._local.api = api
+        return api
+
     def get_all_items(self, collection_key: Optional[str] = None):
         """Get all items in the Zotero library."""
         if collection_key:
-            return self.client.everything(self.client.collection_items_top(collection_key))
-        return self.client.everything(self.client.top())
+            return self._api.everything(self._api.collection_items_top(collection_key))
+        return self._api.everything(self._api.top())
+
+    def _library_version(self) -> int:
+        """Library version reported by the last response."""
+        return int(self._api.request.headers.get("last-modified-version", 0))
+
+    def get_items_since(self, collection_key: Optional[str] = None, since: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """
+        Get the top-level items changed since a library version.
+
+        Args:
+            collection_key: Collection to get the items of (default: the whole library).
+            since: Library version of the last sync (default: all items).
+
+        Returns:
+            tuple: The items and the current library version.
+        """
+        params = {} if since is None else {"since": since}
+        if collection_key:
+            first_page = self._api.collection_items_top(collection_key, **params)
+        else:
+            first_page = self._api.top(**params)
+        # the version at the first page; items changed while paging are fetched again next time
+        version = self._library_version()
+        return self._api.everything(first_page), version
+
+    def get_deleted_item_keys(self, since: int) -> List[str]:
+        """Get the keys of the items deleted since a library version."""
+        return self._api.deleted(since=since).get("items", [])
+
+    def get_changed_item_versions(self, since: int) -> Dict[str, int]:
+        """
+        Get the keys and versions of all items changed since a library version, including child
+        items and items moved to the trash.
+        """
+        return self._api.item_versions(since=since, includeTrashed=1)
+
+    def get_changed_attachment_parents(self, since: int) -> Set[str]:
+        """Get the keys of the items whose attachments changed since a library version."""
+        attachments = self._api.everything(self._api.items(since=since, itemType="attachment"))
+        return {item["data"]["parentItem"] for item in attachments if item["data"].get("parentItem")}
+
+    def get_items_by_key(self, item_keys: Iterable[str]) -> List[Dict]:
+        """Get items by key, in as few requests as the API allows."""
+        item_keys = list(item_keys)
+        items = []
+        for start in range(0, len(item_keys), MAX_KEYS_PER_REQUEST):
+            batch = item_keys[start:start + MAX_KEYS_PER_REQUEST]
+            items.extend(self._api.items(itemKey=",".join(batch), limit=len(batch)))
+        return items
 
     def get_item(self, item_key: str):
         """Get a specific item from Zotero by key."""
-        return self.client.item(item_key)
+        return self._api.item(item_key)
 
     def get_collection_items(self, collection_key: str):
-        return self.client.collection_items(collection_key)
+        return self._api.collection_items(collection_key)
+
+    def get_collections(self) -> List[Dict]:
+        """Get all collections of the Zotero library."""
+        return self._api.everything(self._api.collections())
 
     def search_items(self, query: str):
         """Search for items in Zotero by query."""
-        return self.client.items(q=query)
+        return self._api.items(q=query)
 
     def create_items(self, templates: List[Dict]):
         """Create new items in Zotero."""
-        return self.client.create_items(templates)
+        return self._api.create_items(templates)
 
     def update_item(self, template: Dict):
         """Update an existing item in Zotero."""
-        return self.client.update_item(template)
+        return self._api.update_item(template)
 
     def item_template(self, itemtype: str):
-        """Get an item template from Zotero."""
-        return self.client.item_template(itemtype=itemtype)
+        """Get an item template from Zotero, requested once per item type."""
+        if itemtype not in self._templates:
+            self._templates[itemtype] = self._api.item_template(itemtype=itemtype)
+        return copy.deepcopy(self._templates[itemtype])
+
+    def validate_item(self, item: Dict) -> Dict:
+        """
+        Check an item against the template of its item type, without the request of check_items.
+
+        Args:
+            item: Item data.
+
+        Returns:
+            dict: The item.
+
+        Raises:
+            ValueError: If the item has fields its item type does not have, values of the wrong
+                type, or creators or tags Zotero would reject.
+        """
+        template = self.item_template(item.get("itemType"))
+        invalid = set(item).difference(template, WRITE_FIELDS)
+        if invalid:
+            raise ValueError(f"Invalid fields for item type {item.get('itemType')}: {', '.join(sorted(invalid))}")
+        for field, value in item.items():
+            if field in template and not isinstance(value, type(template[field])):
+                raise ValueError(f"Field {field} must be of type {type(template[field]).__name__}.")
+        for creator in item.get("creators", []):
+            if not isinstance(creator, dict) or "creatorType" not in creator \
+                    or not (creator.get("name") or creator.get("lastName") or creator.get("firstName")):
+                raise ValueError(f"Invalid creator: {creator}")
+        for tag in item.get("tags", []):
+            if not isinstance(tag, dict) or not tag.get("tag"):
+                raise ValueError(f"Invalid tag: {tag}")
+        return item
+
+    def write_items(self, items: List[Dict]) -> Dict[str, Dict[int, Any]]:
+        """
+        Create or update items in requests of MAX_ITEMS_PER_WRITE items.
+
+        Items with a key and version update the existing item, all other items are created. A
+        request that fails as a whole fails all of its items.
+
+        Args:
+            items: Item data, validated beforehand.
+
+        Returns:
+            dict: By position in items, the written items under 'successful', the keys of items
+                without changes under 'unchanged' and the error messages under 'failed'.
+        """
+        results = {"successful": {}, "unchanged": {}, "failed": {}}
+        for start in range(0, len(items), MAX_ITEMS_PER_WRITE):
+            batch = items[start:start + MAX_ITEMS_PER_WRITE]
+            try:
+                response = self._api.create_items(batch)
+            except Exception as e:
+                results["failed"].update((start + i, str(e)) for i in range(len(batch)))
+                continue
+            for i, item in response.get("successful", {}).items():
+                results["successful"][start + int(i)] = item
+            for i, key in response.get("unchanged", {}).items():
+                results["unchanged"][start + int(i)] = key
+            for i, error in response.get("failed", {}).items():
+                results["failed"][start + int(i)] = error.get("message", str(error))
+        return results
 
     def check_items(self, templates: List[Dict]):
         """Check if templates are valid for Zotero."""
-        return self.client.check_items(templates)
+        return self._api.check_items(templates)
 
     def add_to_collection(self, collection_key: str, item):
         """Add an item to a Zotero collection."""
-        return self.client.addto_collection(collection_key, item)
+        return self._api.addto_collection(collection_key, item)
+
+    @staticmethod
+    def attachment_info(item: Dict) -> Dict:
+        """Summarize an attachment item: key, content type, link mode, md5, version and more."""
+        data = item["data"]
+        return {
+            "key": data.get("key"),
+            "contentType": data.get("contentType"),
+            # optional attributes
+            "title": data.get("title"),
+            "linkMode": data.get("linkMode"),
+            "url": data.get("url"),
+            "md5": data.get("md5"),
+            "version": item.get("version", data.get("version")),
+        }
+
+    def get_pdf_attachments(self, collection_key: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """
+        Get the PDF attachments of all items of a collection, or of the whole library, in bulk.
+
+        The attachment items are listed page by page, one request per 100 attachments, instead of
+        one request per item as with get_children. The child items of the items of a collection
+        are listed with the collection.
+
+        Args:
+            collection_key: Collection of the parent items (default: the whole library).
+
+        Returns:
+            dict: PDF attachments of each parent item key, see attachment_info; items without PDF
+                attachments are missing.
+        """
+        if collection_key:
+            first_page = self._api.collection_items(collection_key, itemType="attachment")
+        else:
+            first_page = self._api.items(itemType="attachment")
+        attachments = {}
+        for item in self._api.everything(first_page):
+            data = item["data"]
+            if data.get("parentItem") and data.get("contentType") == PDF_CONTENT_TYPE:
+                attachments.setdefault(data["parentItem"], []).append(self.attachment_info(item))
+        return attachments
 
     def get_children(self, item_key: str):
         """Get children of a Zotero item (e.g., attachments)."""
-        return self.client.children(item_key)
+        return self._api.children(item_key)
 
     def get_fulltext(self, item_key: str):
         """Get fulltext of a Zotero item."""
-        return self.client.fulltext_item(item_key)
+        return self._api.fulltext_item(item_key)
 
     def create_new_collections(self, collections: list[dict[str, str]]):
         """Create a new collection in Zotero."""
-        return self.client.create_collection(collections)
+        return self._api.create_collection(collections)
 
     def get_file(self, item_key: str) -> bytes:
         """Get a file attachment from a Zotero item."""
-        return self.client.file(item_key)
\ No newline at end of file
+        return self._api.file(item_key)
+
+    def download_file(self, item_key: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> bytearray:
+        """
+        Download a file attachment in chunks into a single buffer.
+
+        Unlike get_file, the response body is not held twice in memory, and the buffer is
+        preallocated when the server sends the content length.
+
+        Args:
+            item_key: The key of the attachment item.
+            chunk_size: Size of the chunks read from the response.
+
+        Returns:
+            bytearray: The file content.
+        """
+        url = f"{self._api.endpoint}/{self._api.library_type}/{self._api.library_id}/items/{item_key.upper()}/file"
+        with self._api.client.stream("GET", url, headers=self._api.default_headers()) as response:
+            response.raise_for_status()
+            content_length = int(response.headers.get("Content-Length") or 0)
+            buffer = bytearray(content_length)
+            size = 0
+            for chunk in response.iter_bytes(chunk_size):
+                end = size + len(chunk)
+                if end <= content_length:
+                    buffer[size:end] = chunk
+                else:
+                    buffer[size:] = chunk
+                size = end
+            del buffer[size:]
+        return buffer
\ No newline at end of file
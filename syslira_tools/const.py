@@ -69,6 +69,21 @@ UNION_COLUMNS = AR_COLUMNS.union(CP_COLUMNS).union(EXTRA_COLUMNS)
 
 LIBRARY_COLUMNS = CP_COLUMNS.union(AR_COLUMNS).union(EXTRA_COLUMNS)
 
+# Root-level OpenAlex work fields read by PaperLibrary._extract_openalex_papers, used as the
+# default select= projection of OpenAlexClient (volume, pages and venue live in biblio and
+# primary_location)
+OPENALEX_SELECT_FIELDS = [
+    "id",
+    "doi",
+    "title",
+    "publication_date",
+    "authorships",
+    "biblio",
+    "primary_location",
+    "cited_by_count",
+    "abstract_inverted_index",
+]
+
 IDENTIFIER_TYPES = ["DOI", "ISBN", "PMID", "ArXiv", "DBLP", "MAG", "CorpusId"]
 
 ITEMTYPE_MAP = {
@@ -0,0 +1,499 @@
+import html
+import re
+import unicodedata
+from typing import Any, Dict, FrozenSet, Hashable, List, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+# lower value wins when several library items share a title or DOI
+ITEMTYPE_PRIORITY = {
+    "journalArticle": 0,
+    "conferencePaper": 1,
+}
+DEFAULT_PRIORITY = 2
+
+_NON_ALNUM_PATTERN = r"[\W_]+"
+_DOI_PREFIX_PATTERN = r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)"
+_HTML_TAG_PATTERN = r"<[^>]+>"
+_SUBTITLE_PATTERN = r"\s*(?::|\?\s|\s[-\u2013\u2014]\s)"
+# numbers of parts, volumes or editions in normalized titles: arabic numbers anywhere, roman
+# numerals (up to 39) only after a word like "part" or at the end, as "i", "v" or "x" are words too
+_ROMAN_NUMERAL = r"(?=[ivx])x{0,3}(?:ix|iv|v?i{0,3})"
+_NUMBER_PATTERN = (
+    rf"\b\d+\b|\b(?:part|vol|volume|chapter|book|no|section|edition)\s({_ROMAN_NUMERAL})\b|\b({_ROMAN_NUMERAL})$"
+)
+
+# minimum number of words of a main title (without subtitle) to be matched on its own
+MIN_MAIN_TITLE_WORDS = 4
+SHINGLE_SIZE = 3
+_MERSENNE_PRIME = (1 << 31) - 1
+# number of (padded) shingles hashed at once when computing signatures, bounds memory use
+_SIGNATURE_CHUNK_SIZE = 1 << 18
+
+# prepared title of MinHashLSH: signatures and band keys of its variants, whether it has a subtitle
+# and the numbers in it
+TitleEntry = Tuple[np.ndarray, List[List[int]], bool, FrozenSet[str]]
+
+
+def normalize_titles(titles: pd.Series) -> pd.Series:
+    """
+    Normalize titles for duplicate detection (casefold, collapse punctuation and whitespace).
+
+    Args:
+        titles: Series of raw titles.
+
+    Returns:
+        pd.Series: Normalized titles, empty string for missing values.
+    """
+    return (
+        titles.fillna("")
+        .astype(str)
+        .str.casefold()
+        .str.replace(_NON_ALNUM_PATTERN, " ", regex=True)
+        .str.strip()
+    )
+
+
+def normalize_dois(dois: pd.Series) -> pd.Series:
+    """
+    Normalize DOIs for duplicate detection (lowercase, strip resolver prefixes).
+
+    Args:
+        dois: Series of raw DOIs.
+
+    Returns:
+        pd.Series: Normalized DOIs, empty string for missing values.
+    """
+    return (
+        dois.fillna("")
+        .astype(str)
+        .str.strip()
+        .str.lower()
+        .str.replace(_DOI_PREFIX_PATTERN, "", regex=True)
+    )
+
+
+def normalize_title(title: Any) -> str:
+    """Normalize a single title, equivalent to normalize_titles."""
+    if not isinstance(title, str):
+        return ""
+    return re.sub(_NON_ALNUM_PATTERN, " ", title.casefold()).strip()
+
+
+def normalize_doi(doi: Any) -> str:
+    """Normalize a single DOI, equivalent to normalize_dois."""
+    if not isinstance(doi, str):
+        return ""
+    return re.sub(_DOI_PREFIX_PATTERN, "", doi.strip().lower())
+
+
+def itemtype_priority(item_types: pd.Series) -> np.ndarray:
+    """
+    Map item types to their deduplication priority.
+
+    Args:
+        item_types: Series of Zotero item types.
+
+    Returns:
+        np.ndarray: Integer priorities, lower is preferred.
+    """
+    return (
+        item_types.map(ITEMTYPE_PRIORITY)
+        .fillna(DEFAULT_PRIORITY)
+        .to_numpy(dtype=np.int64)
+    )
+
+
+def _column_or_empty(papers_df: pd.DataFrame, column: str) -> pd.Series:
+    if column in papers_df.columns:
+        return papers_df[column].astype(object)
+    return pd.Series([None] * len(papers_df), index=papers_df.index, dtype=object)
+
+
+def dedup_keys(papers_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute the keys used for duplicate detection.
+
+    Args:
+        papers_df: Library dataframe with (some of) the columns title, DOI and itemType.
+
+    Returns:
+        tuple: Normalized titles, normalized DOIs and item type priorities, aligned to the rows.
+    """
+    titles = normalize_titles(_column_or_empty(papers_df, "title")).to_numpy()
+    dois = normalize_dois(_column_or_empty(papers_df, "DOI")).to_numpy()
+    priority = itemtype_priority(_column_or_empty(papers_df, "itemType"))
+    return titles, dois, priority
+
+
+def find_duplicates(papers_df: pd.DataFrame) -> np.ndarray:
+    """
+    Find the rows that duplicate another row by normalized title or DOI.
+
+    Rows are ranked once by item type priority (journalArticle > conferencePaper > other) and
+    original position, so of each duplicate group the best ranked row is kept. Title duplicates
+    are resolved first, DOI duplicates among the remaining rows second. Empty titles and DOIs
+    never match.
+
+    Args:
+        papers_df: Library dataframe with (some of) the columns title, DOI and itemType.
+
+    Returns:
+        np.ndarray: Boolean mask aligned to the rows of papers_df, True for rows to drop.
+    """
+    n_rows = len(papers_df)
+    if n_rows == 0:
+        return np.zeros(0, dtype=bool)
+
+    titles, dois, priority = dedup_keys(papers_df)
+
+    # single stable ranking pass: priority first, original position second
+    order = np.lexsort((np.arange(n_rows), priority))
+    titles, dois = titles[order], dois[order]
+
+    drop_sorted = pd.Series(titles).duplicated().to_numpy() & (titles != "")
+
+    remaining = np.flatnonzero(~drop_sorted)
+    doi_duplicates = pd.Series(dois[remaining]).duplicated().to_numpy() & (dois[remaining] != "")
+    drop_sorted[remaining[doi_duplicates]] = True
+
+    to_drop = np.empty(n_rows, dtype=bool)
+    to_drop[order] = drop_sorted
+    return to_drop
+
+
+def fuzzy_normalize_title(title: Any) -> str:
+    """
+    Normalize a title for near-duplicate detection.
+
+    In addition to normalize_title, HTML entities and tags are removed and accents are stripped.
+
+    Args:
+        title: Raw title.
+
+    Returns:
+        str: Normalized title, empty string for missing values.
+    """
+    if not isinstance(title, str):
+        return ""
+    if "&" in title or "<" in title:
+        title = re.sub(_HTML_TAG_PATTERN, " ", html.unescape(title))
+    if not title.isascii():
+        title = "".join(c for c in unicodedata.normalize("NFKD", title) if not unicodedata.combining(c))
+    return normalize_title(title)
+
+
+def title_numbers(normalized_title: str) -> FrozenSet[str]:
+    """
+    Get the numbers of parts, volumes or editions in a normalized title, see _NUMBER_PATTERN.
+
+    Args:
+        normalized_title: Title normalized with fuzzy_normalize_title.
+
+    Returns:
+        frozenset: The arabic numbers and roman numerals of the title.
+    """
+    return frozenset(
+        match.group(1) or match.group(2) or match.group(0)
+        for match in re.finditer(_NUMBER_PATTERN, normalized_title)
+    )
+
+
+def main_title(title: Any) -> str:
+    """
+    Get the normalized main title of a title with subtitle, see fuzzy_normalize_title.
+
+    Args:
+        title: Raw title.
+
+    Returns:
+        str: Normalized main title, empty string for titles without subtitle.
+    """
+    if not isinstance(title, str):
+        return ""
+    parts = re.split(_SUBTITLE_PATTERN, html.unescape(title), maxsplit=1)
+    if len(parts) == 1:
+        return ""
+    main = fuzzy_normalize_title(parts[0])
+    return main if main != fuzzy_normalize_title(title) else ""
+
+
+def title_variants(title: Any) -> List[str]:
+    """
+    Get the normalized variants of a title used for near-duplicate detection.
+
+    These are the full title and, if the title has a subtitle and the main title is long enough
+    to be distinctive, the main title alone. The main title is only matched against titles
+    without subtitle (see MinHashLSH), so that e.g. the parts of a series are not duplicates.
+
+    Args:
+        title: Raw title.
+
+    Returns:
+        list: Distinct normalized variants, empty for missing or empty titles.
+    """
+    full_title = fuzzy_normalize_title(title)
+    if not full_title:
+        return []
+    variants = [full_title]
+    main = main_title(title)
+    if len(main.split()) >= MIN_MAIN_TITLE_WORDS:
+        variants.append(main)
+    return variants
+
+
+def minhash_signatures(texts: Sequence[str], a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Compute MinHash signatures over the character shingles of the given texts.
+
+    Shingles of all texts are extracted at once; texts are then processed in chunks of similar
+    length, hashing only the distinct shingles of a chunk with the universal hash functions
+    (a * x + b) mod p and taking the minimum over each text's padded shingle row.
+
+    Args:
+        texts: Texts to compute signatures for.
+        a: Multipliers of the hash functions, one per permutation.
+        b: Offsets of the hash functions, one per permutation.
+
+    Returns:
+        np.ndarray: uint32 signatures of shape (len(texts), number of permutations).
+    """
+    num_perm = len(a)
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    if not texts:
+        return signatures
+
+    encoded = [text.encode().ljust(SHINGLE_SIZE) for text in texts]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+
+    # shingle code at every byte position of the joined texts
+    codes = np.zeros(len(data) - SHINGLE_SIZE + 1, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        codes = (codes << np.uint64(8)) | data[offset:len(data) - SHINGLE_SIZE + 1 + offset]
+
+    shingle_counts = lengths - SHINGLE_SIZE + 1
+    text_offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    # chunks of texts with similar shingle counts keep the padding small
+    by_count = np.argsort(shingle_counts, kind="stable")
+    sorted_counts = shingle_counts[by_count].tolist()
+    start = 0
+    while start < len(texts):
+        # texts are sorted by shingle count, so the last text of a chunk sets its width
+        end = start + 1
+        while end < len(texts) and (end + 1 - start) * sorted_counts[end] <= _SIGNATURE_CHUNK_SIZE:
+            end += 1
+        chunk = by_count[start:end]
+        width = sorted_counts[end - 1]
+
+        # padded (texts x width) matrix of shingle positions, padding marked by the mask
+        columns = np.arange(width)
+        in_text = columns[None, :] < shingle_counts[chunk, None]
+        positions = text_offsets[chunk, None] + columns[None, :]
+        unique_codes, inverse = np.unique(codes[positions[in_text]], return_inverse=True)
+
+        # hash table of the distinct shingles plus a padding row that never wins the minimum
+        table = np.empty((len(unique_codes) + 1, num_perm), dtype=np.uint32)
+        table[:-1] = (unique_codes[:, None] * a[None, :] + b[None, :]) % np.uint64(_MERSENNE_PRIME)
+        table[-1] = np.iinfo(np.uint32).max
+        padded = np.full(in_text.shape, len(unique_codes), dtype=np.int64)
+        padded[in_text] = inverse
+
+        signatures[chunk] = table[padded].min(axis=1)
+        start = end
+
+    return signatures
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Choose the LSH banding for a similarity threshold.
+
+    Picks the number of bands and rows per band whose candidate threshold (1/bands)^(1/rows) is
+    closest to, but not above, the similarity threshold, favouring recall as candidates are
+    verified afterwards.
+
+    Args:
+        threshold: Jaccard similarity threshold.
+        num_perm: Number of MinHash permutations.
+
+    Returns:
+        tuple: Number of bands and rows per band.
+    """
+    best = (num_perm, 1)
+    best_distance = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        candidate_threshold = (1 / bands) ** (1 / rows)
+        if candidate_threshold <= threshold and threshold - candidate_threshold < best_distance:
+            best, best_distance = (bands, rows), threshold - candidate_threshold
+    return best
+
+
+class MinHashLSH:
+    """Locality-sensitive hash index over MinHash signatures of titles for near-duplicate lookup."""
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 64, seed: int = 1):
+        """
+        Initialize the index.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity of title shingles to count as duplicate.
+            num_perm: Number of MinHash permutations.
+            seed: Seed of the MinHash hash functions.
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1].")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._band_mixers = rng.integers(1, 1 << 62, self.rows, dtype=np.uint64) | np.uint64(1)
+
+        self._buckets: List[Dict[int, Set[Hashable]]] = [{} for _ in range(self.bands)]
+        self._entries: Dict[Hashable, TitleEntry] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable):
+        return key in self._entries
+
+    def prepare(self, titles: Sequence[Any]) -> List[TitleEntry]:
+        """
+        Compute signatures and band keys for titles, to be passed to insert or query.
+
+        Args:
+            titles: Raw titles.
+
+        Returns:
+            list: One entry per title, with one row of signatures and band keys per title
+                variant, see TitleEntry.
+        """
+        variants = [title_variants(title) for title in titles]
+        signatures = minhash_signatures([v for vs in variants for v in vs], self._a, self._b)
+
+        # combine the rows of each band into a single key
+        banded = signatures[:, :self.bands * self.rows].reshape(-1, self.bands, self.rows)
+        band_keys = np.zeros(banded.shape[:2], dtype=np.uint64)
+        for row in range(self.rows):
+            band_keys = band_keys * self._band_mixers[row] + banded[:, :, row]
+        band_keys = band_keys.tolist()
+
+        entries = []
+        position = 0
+        for title, title_variants_ in zip(titles, variants):
+            end = position + len(title_variants_)
+            numbers = title_numbers(title_variants_[0]) if title_variants_ else frozenset()
+            entries.append((signatures[position:end], band_keys[position:end], bool(main_title(title)), numbers))
+            position = end
+        return entries
+
+    def insert(self, key: Hashable, entry: TitleEntry):
+        """Insert a prepared title under the given key, replacing a previous entry of the key."""
+        if key in self._entries:
+            self.remove(key)
+        if len(entry[0]) == 0:
+            return
+        self._entries[key] = entry
+        for variant_keys in entry[1]:
+            for band, band_key in enumerate(variant_keys):
+                self._buckets[band].setdefault(band_key, set()).add(key)
+
+    def insert_many(self, keys: Sequence[Hashable], titles: Sequence[Any]):
+        """Prepare and insert titles under the given keys."""
+        for key, entry in zip(keys, self.prepare(titles)):
+            self.insert(key, entry)
+
+    def remove(self, key: Hashable):
+        """Remove the entry of the given key if present."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for variant_keys in entry[1]:
+            for band, band_key in enumerate(variant_keys):
+                bucket = self._buckets[band].get(band_key)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._buckets[band][band_key]
+
+    def query(self, entry: TitleEntry) -> Set[Hashable]:
+        """
+        Find the keys of indexed titles similar to a prepared title.
+
+        Candidates sharing a band bucket are verified by their estimated Jaccard similarity.
+
+        Args:
+            entry: Prepared title from prepare.
+
+        Returns:
+            set: Keys of the near-duplicate titles.
+        """
+        candidates = set()
+        for variant_keys in entry[1]:
+            for band, band_key in enumerate(variant_keys):
+                candidates.update(self._buckets[band].get(band_key, ()))
+
+        return {
+            key for key in candidates
+            if self._similarity(entry, self._entries[key]) >= self.threshold
+        }
+
+    @staticmethod
+    def _similarity(
+            entry: TitleEntry, other_entry: TitleEntry
+    ) -> float:
+        """
+        Highest estimated Jaccard similarity between the variants of two titles. The main title
+        of a title with subtitle is only compared to the other full title, if that has none.
+        Titles with different numbers, e.g. of parts or volumes, are not similar.
+        """
+        signatures, _, has_subtitle, numbers = entry
+        other_signatures, _, other_has_subtitle, other_numbers = other_entry
+        if numbers != other_numbers:
+            return 0.0
+        similarity = (signatures[0] == other_signatures[0]).mean()
+        if len(signatures) > 1 and not other_has_subtitle:
+            similarity = max(similarity, (signatures[1] == other_signatures[0]).mean())
+        if len(other_signatures) > 1 and not has_subtitle:
+            similarity = max(similarity, (signatures[0] == other_signatures[1]).mean())
+        return float(similarity)
+
+
+def find_near_duplicates(papers_df: pd.DataFrame, threshold: float = 0.85, num_perm: int = 64) -> np.ndarray:
+    """
+    Find the rows whose title nearly duplicates the title of a better ranked row.
+
+    Rows are visited in the ranking of find_duplicates; each row is checked against an LSH index
+    of the rows kept so far, so candidate pairs are found without comparing all pairs.
+
+    Args:
+        papers_df: Library dataframe with (some of) the columns title and itemType.
+        threshold: Minimum estimated Jaccard similarity of title shingles to count as duplicate.
+        num_perm: Number of MinHash permutations.
+
+    Returns:
+        np.ndarray: Boolean mask aligned to the rows of papers_df, True for rows to drop.
+    """
+    n_rows = len(papers_df)
+    to_drop = np.zeros(n_rows, dtype=bool)
+    if n_rows == 0:
+        return to_drop
+
+    priority = itemtype_priority(_column_or_empty(papers_df, "itemType"))
+    lsh = MinHashLSH(threshold=threshold, num_perm=num_perm)
+    entries = lsh.prepare(_column_or_empty(papers_df, "title").tolist())
+
+    for position in np.lexsort((np.arange(n_rows), priority)).tolist():
+        if lsh.query(entries[position]):
+            to_drop[position] = True
+        else:
+            lsh.insert(position, entries[position])
+
+    return to_drop
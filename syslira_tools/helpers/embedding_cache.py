@@ -0,0 +1,95 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from syslira_tools.helpers.fulltext_cache import DEFAULT_CACHE_DIR
+
+
+class EmbeddingCache:
+    """
+    Persistent cache of text embeddings, backed by SQLite.
+
+    Embeddings are keyed by the SHA-256 of the text and the id of the model that produced them,
+    and stored as float32 vectors, so unchanged chunks are never embedded twice, across runs and
+    vector stores.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Initialize the cache, creating its database if it does not exist.
+
+        Args:
+            root: Cache directory (default: $SYSLIRA_CACHE_DIR or ~/.cache/syslira_tools).
+        """
+        self.root = root or os.environ.get("SYSLIRA_CACHE_DIR") or DEFAULT_CACHE_DIR
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.join(self.root, "embeddings.sqlite"), check_same_thread=False)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, key TEXT NOT NULL, vector BLOB NOT NULL, PRIMARY KEY (model, key))"
+            )
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        """Create the cache key of a text."""
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get_many(self, model: str, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Get cached embeddings.
+
+        Args:
+            model: Id of the embedding model.
+            keys: Keys of the texts, see make_key.
+
+        Returns:
+            dict: Embedding of each cached key; keys that are not cached are missing.
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            # stay below SQLite's limit of query parameters
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({', '.join('?' * len(batch))})",
+                    [model, *batch],
+                ).fetchall()
+                found.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+        return found
+
+    def set_many(self, model: str, embeddings: Dict[str, np.ndarray]):
+        """
+        Store embeddings.
+
+        Args:
+            model: Id of the embedding model.
+            embeddings: Embedding of each key, see make_key.
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, key, vector) VALUES (?, ?, ?)",
+                [
+                    (model, key, np.asarray(vector, dtype=np.float32).tobytes())
+                    for key, vector in embeddings.items()
+                ],
+            )
+
+    def clear(self, model: Optional[str] = None):
+        """Delete the cached embeddings of a model, or of all models."""
+        with self._lock, self._connection:
+            if model is None:
+                self._connection.execute("DELETE FROM embeddings")
+            else:
+                self._connection.execute("DELETE FROM embeddings WHERE model = ?", (model,))
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
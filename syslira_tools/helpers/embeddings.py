@@ -0,0 +1,181 @@
+import functools
+import platform
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from syslira_tools.helpers.embedding_cache import EmbeddingCache
+
+# Embedding model of the vector stores
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
+# Texts per forward pass of the embedding model
+DEFAULT_BATCH_SIZE = 64
+# Texts embedded between writes to the embedding cache, so an interrupted run keeps its progress
+CACHE_WRITE_SIZE = 1024
+# int8 ONNX exports published with the sentence-transformers models on the HuggingFace Hub, by the
+# instruction set they are quantized for; x86 exports in order of preference
+QUANTIZED_ONNX_FILES = {
+    "avx512_vnni": "onnx/model_qint8_avx512_vnni.onnx",
+    "avx512": "onnx/model_qint8_avx512.onnx",
+    "avx2": "onnx/model_qint8_avx2.onnx",
+    "arm64": "onnx/model_qint8_arm64.onnx",
+}
+# CPU flags (as in /proc/cpuinfo) required by the x86 exports
+_X86_EXPORT_FLAGS = {"avx512_vnni": {"avx512f", "avx512_vnni"}, "avx512": {"avx512f"}}
+BACKENDS = ("torch", "onnx")
+
+# loaded models, shared by all embeddings of the process
+_models: Dict[Tuple, Any] = {}
+_models_lock = threading.Lock()
+
+
+def load_model(model_name: str, backend: str = "torch", quantize: bool = False, threads: Optional[int] = None):
+    """
+    Load a SentenceTransformer model for CPU inference, once per process and configuration.
+
+    Args:
+        model_name: Name of the HuggingFace model.
+        backend: 'torch', or 'onnx' for ONNX Runtime (requires sentence-transformers[onnx]).
+        quantize: Whether to run the model with int8 weights: dynamically quantized linear layers
+            with torch, the quantized export of the model for this CPU (see quantized_onnx_variant)
+            with ONNX.
+        threads: Number of CPU threads for inference (default: the library default, usually one
+            per core). With torch this sets the thread count of the whole process.
+
+    Returns:
+        SentenceTransformer: The loaded model.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}.")
+    key = (model_name, backend, quantize, threads)
+    with _models_lock:
+        if key not in _models:
+            _models[key] = _load_model(model_name, backend, quantize, threads)
+        return _models[key]
+
+
+@functools.lru_cache(maxsize=None)
+def quantized_onnx_variant() -> str:
+    """
+    Instruction set of the quantized ONNX export to run on this CPU, a key of QUANTIZED_ONNX_FILES.
+
+    The exports only differ in the quantization scheme tuned for the instruction set and run on any
+    CPU of the architecture. x86 CPU flags are read from /proc/cpuinfo; where it is not available,
+    the AVX2 export is used, which suits every recent x86 CPU.
+
+    Returns:
+        str: 'arm64', 'avx512_vnni', 'avx512' or 'avx2'.
+    """
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "arm64"
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = next((set(line.split(":", 1)[1].split()) for line in f if line.startswith("flags")), set())
+    except OSError:
+        flags = set()
+    return next((variant for variant, required in _X86_EXPORT_FLAGS.items() if required <= flags), "avx2")
+
+
+def _load_model(model_name: str, backend: str, quantize: bool, threads: Optional[int]):
+    # imported on first use, loading torch takes seconds
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "onnx":
+        import onnxruntime
+
+        session_options = onnxruntime.SessionOptions()
+        if threads:
+            session_options.intra_op_num_threads = threads
+        model_kwargs = {"provider": "CPUExecutionProvider", "session_options": session_options}
+        if quantize:
+            model_kwargs["file_name"] = QUANTIZED_ONNX_FILES[quantized_onnx_variant()]
+        return SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+
+    import torch
+
+    if threads:
+        torch.set_num_threads(threads)
+    model = SentenceTransformer(model_name, device="cpu")
+    if quantize:
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain embeddings over a shared SentenceTransformer model with a persistent cache.
+
+    The model is loaded on the first text that is not cached (see load_model), so re-indexing an
+    unchanged corpus does not load it at all. Document embeddings are cached by text and model
+    id (see EmbeddingCache); queries are embedded directly.
+    """
+
+    def __init__(
+            self,
+            model_name: str = DEFAULT_EMBEDDING_MODEL,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            threads: Optional[int] = None,
+            backend: str = "torch",
+            quantize: bool = False,
+            cache: Optional[EmbeddingCache] = None,
+    ):
+        """
+        Initialize the embeddings.
+
+        Args:
+            model_name: Name of the HuggingFace model.
+            batch_size: Texts per forward pass of the model.
+            threads: Number of CPU threads for inference, see load_model.
+            backend: 'torch' or 'onnx', see load_model.
+            quantize: Whether to run the model with int8 weights, see load_model.
+            cache: Embedding cache (default: an EmbeddingCache in the default cache directory).
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}.")
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.threads = threads
+        self.backend = backend
+        self.quantize = quantize
+        self.cache = cache or EmbeddingCache()
+
+    @property
+    def model_id(self) -> str:
+        """Identity of the embeddings, differs between backends and quantization."""
+        if self.backend == "torch" and not self.quantize:
+            return self.model_name
+        if self.backend == "onnx" and self.quantize:
+            # the exports for different instruction sets give slightly different embeddings
+            return f"{self.model_name}@onnx-int8-{quantized_onnx_variant()}"
+        return f"{self.model_name}@{self.backend}{'-int8' if self.quantize else ''}"
+
+    @property
+    def model(self):
+        """The SentenceTransformer model, loaded on first use."""
+        return load_model(self.model_name, self.backend, self.quantize, self.threads)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(
+            texts, batch_size=self.batch_size, convert_to_numpy=True, show_progress_bar=False
+        ).astype(np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, computing only the embeddings that are not cached."""
+        keys = [EmbeddingCache.make_key(text) for text in texts]
+        embeddings = self.cache.get_many(self.model_id, keys)
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in embeddings}
+        missing_keys = list(missing)
+        for start in range(0, len(missing_keys), CACHE_WRITE_SIZE):
+            batch = missing_keys[start:start + CACHE_WRITE_SIZE]
+            computed = dict(zip(batch, self._encode([missing[key] for key in batch])))
+            self.cache.set_many(self.model_id, computed)
+            embeddings.update(computed)
+
+        return [embeddings[key].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query text."""
+        return self._encode([text])[0].tolist()
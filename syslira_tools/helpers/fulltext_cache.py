@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import zlib
+from typing import Any, Dict, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional, falls back to zlib
+    zstandard = None
+
+from syslira_tools.helpers.sqlite_cache import SQLiteLRUCache
+
+# Default cache root, overridable with the SYSLIRA_CACHE_DIR environment variable
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "syslira_tools")
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return zlib.compress(data, 6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class FulltextCache(SQLiteLRUCache):
+    """
+    Content-addressed cache for parsed full texts, backed by SQLite.
+
+    Entries are keyed by the identity of the parsed content (e.g. the MD5 of a Zotero attachment
+    or the attachment key and version) together with the parser options. Each entry records the
+    parser version that produced it; entries from other parser versions are still served unless
+    the current version is required, so a parser upgrade does not silently re-parse a library.
+    Entries are compressed with zstd when available, else zlib, and the least recently used
+    entries are evicted above the size limit.
+    """
+
+    def __init__(
+            self,
+            root: Optional[str] = None,
+            max_size_bytes: int = 2 * 1024 * 1024 * 1024,
+            compression: Optional[str] = None,
+    ):
+        """
+        Initialize the cache, creating its database if it does not exist.
+
+        Args:
+            root: Cache directory (default: $SYSLIRA_CACHE_DIR or ~/.cache/syslira_tools).
+            max_size_bytes: Maximum total size of the stored (compressed) full texts.
+            compression: 'zstd' or 'zlib' (default: zstd if the zstandard package is installed).
+        """
+        self.root = root or os.environ.get("SYSLIRA_CACHE_DIR") or DEFAULT_CACHE_DIR
+        self.compression = compression or ("zstd" if zstandard is not None else "zlib")
+        if self.compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package.")
+        if self.compression not in ("zstd", "zlib"):
+            raise ValueError("compression must be 'zstd' or 'zlib'.")
+
+        super().__init__(
+            os.path.join(self.root, "fulltext.sqlite"),
+            "fulltexts",
+            ["key", "parser_version"],
+            ["codec TEXT NOT NULL", "value BLOB NOT NULL"],
+            max_size_bytes,
+        )
+
+    @staticmethod
+    def make_key(source: str, options: Optional[Dict[str, Any]] = None) -> str:
+        """Create the content address of a source parsed with the given options."""
+        return hashlib.sha256(json.dumps([source, options or {}], sort_keys=True).encode()).hexdigest()
+
+    def get(
+            self,
+            source: str,
+            options: Optional[Dict[str, Any]] = None,
+            parser_version: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached full text.
+
+        Args:
+            source: Identity of the parsed content, e.g. 'md5:<hash>'.
+            options: Parser options the full text was produced with.
+            parser_version: Only accept entries of this parser version (default: the newest entry
+                of any version).
+
+        Returns:
+            The cached full-text result, or None if it is not cached.
+        """
+        key = self.make_key(source, options)
+        query = "SELECT parser_version, codec, value FROM fulltexts WHERE key = ?"
+        params = [key]
+        if parser_version is not None:
+            query += " AND parser_version = ?"
+            params.append(parser_version)
+        with self._lock:
+            row = self._connection.execute(query + " ORDER BY created DESC LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+            self._touch([key, row[0]])
+        return json.loads(_decompress(row[2], row[1]))
+
+    def set(
+            self,
+            source: str,
+            result: Dict[str, Any],
+            options: Optional[Dict[str, Any]] = None,
+            parser_version: str = "",
+    ):
+        """
+        Store a full text, evicting least recently used entries if the cache is full.
+
+        Args:
+            source: Identity of the parsed content, e.g. 'md5:<hash>'.
+            result: JSON serializable full-text result.
+            options: Parser options the full text was produced with.
+            parser_version: Version of the parser that produced the full text.
+        """
+        key = self.make_key(source, options)
+        data = _compress(json.dumps(result).encode(), self.compression)
+        with self._lock:
+            self._store([key, parser_version], [self.compression, data], len(data))
@@ -0,0 +1,328 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from syslira_tools.helpers.dedup import dedup_keys
+
+# Columns stored in their own table columns, indexed for full-text search; all other fields of a
+# paper are stored as one JSON document
+TEXT_COLUMNS = ["title", "abstractNote", "fulltext"]
+# Seconds to wait for the write lock of another process before failing
+DEFAULT_BUSY_TIMEOUT = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    doi TEXT,
+    norm_title TEXT,
+    zotero_key TEXT,
+    item_type TEXT,
+    title TEXT,
+    abstractNote TEXT,
+    fulltext TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS papers_doi ON papers (doi) WHERE doi IS NOT NULL;
+CREATE INDEX IF NOT EXISTS papers_norm_title ON papers (norm_title) WHERE norm_title IS NOT NULL;
+CREATE INDEX IF NOT EXISTS papers_zotero_key ON papers (zotero_key) WHERE zotero_key IS NOT NULL;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+    title, abstractNote, fulltext, content='papers', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS papers_fts_insert AFTER INSERT ON papers BEGIN
+    INSERT INTO papers_fts (rowid, title, abstractNote, fulltext)
+    VALUES (new.rowid, new.title, new.abstractNote, new.fulltext);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_fts_delete AFTER DELETE ON papers BEGIN
+    INSERT INTO papers_fts (papers_fts, rowid, title, abstractNote, fulltext)
+    VALUES ('delete', old.rowid, old.title, old.abstractNote, old.fulltext);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_fts_update AFTER UPDATE OF title, abstractNote, fulltext ON papers BEGIN
+    INSERT INTO papers_fts (papers_fts, rowid, title, abstractNote, fulltext)
+    VALUES ('delete', old.rowid, old.title, old.abstractNote, old.fulltext);
+    INSERT INTO papers_fts (rowid, title, abstractNote, fulltext)
+    VALUES (new.rowid, new.title, new.abstractNote, new.fulltext);
+END;
+"""
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _json_default(value: Any):
+    # numpy scalars from dataframe columns
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _text_or_none(value: Any) -> Optional[str]:
+    return None if _is_missing(value) else str(value)
+
+
+class LibraryDatabase:
+    """
+    SQLite storage of a paper library.
+
+    Every paper is one row keyed by its id, with the deduplication keys (normalized DOI and title)
+    and the Zotero key in indexed columns, so membership and duplicate lookups do not scan the
+    library. Title, abstract and full text are indexed for full-text search with FTS5. The
+    database runs in WAL mode and all mutations are transactions that take the write lock up
+    front, so several processes can share one library file.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = DEFAULT_BUSY_TIMEOUT):
+        """
+        Open the database, creating it if it does not exist.
+
+        Args:
+            path: Path of the SQLite file, or ':memory:'.
+            busy_timeout: Seconds to wait for a lock held by another process.
+        """
+        self.path = path
+        # transactions are managed explicitly, see transaction
+        self._connection = sqlite3.connect(
+            path, timeout=busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        # executescript commits any open transaction, so the script brings its own
+        self._connection.executescript(f"BEGIN IMMEDIATE; {_SCHEMA} COMMIT;")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run a block in one write transaction, rolled back if the block raises.
+
+        Transactions nest; only the outermost one commits.
+        """
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self._connection
+                finally:
+                    self._depth -= 1
+                return
+            self._connection.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            else:
+                self._connection.execute("COMMIT")
+            finally:
+                self._depth = 0
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[Tuple]:
+        with self._lock:
+            return self._connection.execute(sql, tuple(params)).fetchall()
+
+    def data_version(self) -> int:
+        """Counter that changes whenever another connection commits to the database."""
+        return self._query("PRAGMA data_version")[0][0]
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) FROM papers")[0][0]
+
+    def __contains__(self, paper_id: str):
+        return bool(self._query("SELECT 1 FROM papers WHERE id = ?", (paper_id,)))
+
+    def _find(self, column: str, value: str) -> Optional[str]:
+        # the earliest added paper wins, as with the in-memory indexes of PaperLibrary
+        rows = self._query(f"SELECT id FROM papers WHERE {column} = ? ORDER BY rowid LIMIT 1", (value,))
+        return rows[0][0] if rows else None
+
+    def find_by_title(self, normalized_title: str) -> Optional[str]:
+        """Id of the paper with the given normalized title, see helpers.dedup.normalize_title."""
+        return self._find("norm_title", normalized_title) if normalized_title else None
+
+    def find_by_doi(self, normalized_doi: str) -> Optional[str]:
+        """Id of the paper with the given normalized DOI, see helpers.dedup.normalize_doi."""
+        return self._find("doi", normalized_doi) if normalized_doi else None
+
+    def find_by_zotero_key(self, zotero_key: str) -> Optional[str]:
+        """Id of the paper linked to the given Zotero item."""
+        return self._find("zotero_key", zotero_key) if zotero_key else None
+
+    def upsert(self, papers_df: pd.DataFrame):
+        """
+        Insert papers, replacing papers with the same id.
+
+        Args:
+            papers_df: Library dataframe indexed by paper id.
+        """
+        if len(papers_df) == 0:
+            return
+        titles, dois, _ = dedup_keys(papers_df)
+        data_columns = [column for column in papers_df.columns if column not in TEXT_COLUMNS and column != "id"]
+        text_values = {
+            column: papers_df[column].tolist() if column in papers_df.columns else [None] * len(papers_df)
+            for column in TEXT_COLUMNS
+        }
+        data_values = [papers_df[column].tolist() for column in data_columns]
+
+        rows = []
+        for position, paper_id in enumerate(papers_df.index):
+            data = {
+                column: values[position]
+                for column, values in zip(data_columns, data_values)
+                if not _is_missing(values[position])
+            }
+            rows.append((
+                str(paper_id),
+                dois[position] or None,
+                titles[position] or None,
+                _text_or_none(data.get("zoteroKey")) or None,
+                _text_or_none(data.get("itemType")),
+                *(_text_or_none(text_values[column][position]) for column in TEXT_COLUMNS),
+                json.dumps(data, default=_json_default),
+            ))
+        with self.transaction() as connection:
+            connection.executemany(
+                "INSERT INTO papers (id, doi, norm_title, zotero_key, item_type, title, abstractNote, fulltext, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET doi = excluded.doi, norm_title = excluded.norm_title, "
+                "zotero_key = excluded.zotero_key, item_type = excluded.item_type, title = excluded.title, "
+                "abstractNote = excluded.abstractNote, fulltext = excluded.fulltext, data = excluded.data",
+                rows,
+            )
+
+    def delete(self, paper_ids: Iterable[str]):
+        """Delete papers by id."""
+        with self.transaction() as connection:
+            connection.executemany("DELETE FROM papers WHERE id = ?", [(paper_id,) for paper_id in paper_ids])
+
+    def clear(self):
+        """Delete all papers."""
+        with self.transaction() as connection:
+            connection.execute("DELETE FROM papers")
+
+    def get_meta(self, key: str) -> Any:
+        """Get a JSON value stored with the library, e.g. sync state, or None."""
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def set_meta(self, key: str, value: Any):
+        """Store a JSON value with the library, None deletes it."""
+        with self.transaction() as connection:
+            if value is None:
+                connection.execute("DELETE FROM meta WHERE key = ?", (key,))
+            else:
+                connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def get_meta_items(self, prefix: str = "") -> Dict[str, Any]:
+        """Get the stored values whose key starts with prefix, by key without the prefix."""
+        rows = self._query("SELECT key, value FROM meta WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+        return {key[len(prefix):]: json.loads(value) for key, value in rows}
+
+    def clear_meta(self, prefix: str = ""):
+        """Delete the stored values whose key starts with prefix."""
+        with self.transaction() as connection:
+            connection.execute("DELETE FROM meta WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+    def get_field(self, paper_id: str, field: str) -> Any:
+        """
+        Get a single field of a paper.
+
+        Raises:
+            KeyError: If the paper is not in the database.
+        """
+        if field in TEXT_COLUMNS:
+            rows = self._query(f"SELECT {field} FROM papers WHERE id = ?", (paper_id,))
+            if not rows:
+                raise KeyError(paper_id)
+            return np.nan if rows[0][0] is None else rows[0][0]
+        rows = self._query("SELECT data FROM papers WHERE id = ?", (paper_id,))
+        if not rows:
+            raise KeyError(paper_id)
+        return json.loads(rows[0][0]).get(field, np.nan)
+
+    def set_field(self, paper_id: str, field: str, value: Any):
+        """
+        Set a single field of a paper, updating its indexed columns.
+
+        Raises:
+            KeyError: If the paper is not in the database.
+        """
+        with self.transaction():
+            papers_df = self.to_df(ids=[paper_id])
+            if len(papers_df) == 0:
+                raise KeyError(paper_id)
+            if field not in papers_df.columns:
+                papers_df[field] = pd.Series([None], index=papers_df.index, dtype=object)
+            elif not isinstance(value, str):
+                papers_df[field] = papers_df[field].astype(object)
+            papers_df.at[paper_id, field] = value
+            self.upsert(papers_df)
+
+    def titles(self) -> Tuple[List[str], List[Optional[str]]]:
+        """Ids and raw titles of all papers, in insertion order."""
+        rows = self._query("SELECT id, title FROM papers ORDER BY rowid")
+        return [row[0] for row in rows], [row[1] for row in rows]
+
+    def to_df(self, fulltext: bool = True, ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read papers into a library dataframe.
+
+        Args:
+            fulltext: Whether to read the full texts.
+            ids: Ids of the papers to read (default: all papers).
+
+        Returns:
+            pd.DataFrame: Library dataframe indexed by paper id, in insertion order.
+        """
+        columns = ["id", "title", "abstractNote"] + (["fulltext"] if fulltext else []) + ["data"]
+        sql = f"SELECT {', '.join(columns)} FROM papers"
+        params: List[Any] = []
+        if ids is not None:
+            sql += f" WHERE id IN ({', '.join('?' * len(ids))})"
+            params = list(ids)
+        rows = self._query(sql + " ORDER BY rowid", params)
+
+        records = []
+        for row in rows:
+            record = json.loads(row[-1])
+            for column, value in zip(columns[1:-1], row[1:-1]):
+                if value is not None:
+                    record[column] = value
+            records.append(record)
+        return pd.DataFrame(records, index=pd.Index([row[0] for row in rows], dtype=str))
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """
+        Full-text search over title, abstract and full text, ranked by BM25.
+
+        Args:
+            query: FTS5 query, e.g. 'transformer AND "protein folding"'.
+            limit: Maximum number of results.
+
+        Returns:
+            list: Paper ids with their score, best match first (higher is better).
+        """
+        rows = self._query(
+            "SELECT papers.id, bm25(papers_fts) AS rank FROM papers_fts "
+            "JOIN papers ON papers.rowid = papers_fts.rowid "
+            "WHERE papers_fts MATCH ? ORDER BY rank LIMIT ?",
+            (query, limit),
+        )
+        # FTS5 ranks are negated BM25 scores
+        return [(paper_id, -rank) for paper_id, rank in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,215 @@
+import json
+import os
+from typing import Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from syslira_tools.const import UNION_COLUMNS
+
+# Files of a library store directory
+METADATA_FILE = "metadata.parquet"
+FULLTEXT_FILE = "fulltext.parquet"
+SEARCH_INDEX_FILE = "search_index.npz"
+SYNC_STATE_FILE = "zotero_sync.json"
+
+CREATOR_TYPE = pa.struct(
+    [
+        ("creatorType", pa.string()),
+        ("firstName", pa.string()),
+        ("lastName", pa.string()),
+        ("name", pa.string()),
+    ]
+)
+# Columns with a nested type, all others are strings
+NESTED_COLUMN_TYPES = {
+    "creators": pa.list_(CREATOR_TYPE),
+    "collections": pa.list_(pa.string()),
+}
+# Columns whose values vary in shape (Zotero tags are dicts, library tags may be plain strings;
+# relations map to a string or a list), stored JSON encoded
+JSON_COLUMNS = {"tags", "relations"}
+# Columns stored apart from the metadata, so that loading the metadata does not read them
+FULLTEXT_COLUMNS = ["fulltext"]
+
+
+def library_schema(columns: Optional[Iterable[str]] = None) -> pa.Schema:
+    """
+    Build the Arrow schema of the library metadata.
+
+    Args:
+        columns: Library columns (default: UNION_COLUMNS). Columns unknown to the schema,
+            e.g. additional Zotero fields, are stored JSON encoded.
+
+    Returns:
+        pa.Schema: Schema with the paper id first and the remaining columns in sorted order.
+    """
+    columns = sorted(set(UNION_COLUMNS if columns is None else columns) - {"id"} - set(FULLTEXT_COLUMNS))
+    fields = [pa.field("id", pa.string(), nullable=False)]
+    for column in columns:
+        fields.append(pa.field(column, NESTED_COLUMN_TYPES.get(column, pa.string())))
+    json_columns = [column for column in columns if _is_json_column(column)]
+    return pa.schema(fields, metadata={"json_columns": json.dumps(json_columns)})
+
+
+def _is_json_column(column: str) -> bool:
+    return column in JSON_COLUMNS or (column not in UNION_COLUMNS and column not in NESTED_COLUMN_TYPES)
+
+
+def _to_json(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return json.dumps(value)
+
+
+def _column_array(values: pd.Series, field: pa.Field, json_encoded: bool) -> pa.Array:
+    """Convert a library column to an Arrow array of the field's type."""
+    if json_encoded:
+        return pa.array([_to_json(value) for value in values], type=pa.string())
+    if field.type == pa.string():
+        return pa.array(values.astype("string"), type=pa.string(), from_pandas=True)
+    # nested values, missing values become nulls
+    return pa.array([value if isinstance(value, list) else None for value in values], type=field.type)
+
+
+def _write_table(table: pa.Table, path: str):
+    """Write a parquet file atomically."""
+    temp_path = f"{path}.tmp"
+    pq.write_table(table, temp_path, compression="zstd")
+    os.replace(temp_path, path)
+
+
+def save_library(papers_df: pd.DataFrame, path: str, unloaded_fulltext_ids: Optional[Iterable[str]] = None):
+    """
+    Save a library dataframe to a store directory of parquet files.
+
+    The metadata is written to metadata.parquet and the full texts to fulltext.parquet. If the
+    dataframe has no fulltext column, e.g. it was loaded without full texts, fulltext.parquet
+    is left unchanged.
+
+    Args:
+        papers_df: Library dataframe indexed by paper id.
+        path: Store directory, created if it does not exist.
+        unloaded_fulltext_ids: Ids of papers whose full texts the dataframe does not hold, e.g. as it
+            was loaded without full texts and a paper with full text was added since. Their stored
+            full texts are kept unless the dataframe has one.
+    """
+    os.makedirs(path, exist_ok=True)
+    schema = library_schema(papers_df.columns)
+    json_columns = set(json.loads(schema.metadata[b"json_columns"]))
+
+    ids = pa.array(papers_df.index.astype(str), type=pa.string())
+    arrays = [ids]
+    for field in list(schema)[1:]:
+        if field.name in papers_df.columns:
+            arrays.append(_column_array(papers_df[field.name], field, field.name in json_columns))
+        else:
+            arrays.append(pa.nulls(len(papers_df), type=field.type))
+    _write_table(pa.Table.from_arrays(arrays, schema=schema), os.path.join(path, METADATA_FILE))
+
+    fulltext_columns = [column for column in FULLTEXT_COLUMNS if column in papers_df.columns]
+    if fulltext_columns:
+        fulltext_schema = pa.schema(
+            [pa.field("id", pa.string(), nullable=False)] + [pa.field(column, pa.string()) for column in fulltext_columns]
+        )
+        fulltext_df = papers_df[fulltext_columns].astype("string")
+        fulltext_path = os.path.join(path, FULLTEXT_FILE)
+        unloaded_ids = papers_df.index.intersection(list(unloaded_fulltext_ids or ()))
+        if len(unloaded_ids) and os.path.exists(fulltext_path):
+            stored_df = pq.read_table(fulltext_path).to_pandas().set_index("id")
+            for column in fulltext_columns:
+                if column not in stored_df.columns:
+                    continue
+                stored = stored_df[column].reindex(unloaded_ids).astype("string")
+                fulltext_df.loc[unloaded_ids, column] = fulltext_df.loc[unloaded_ids, column].fillna(stored)
+        fulltext_arrays = [ids] + [
+            pa.array(fulltext_df[column], type=pa.string(), from_pandas=True) for column in fulltext_columns
+        ]
+        _write_table(pa.Table.from_arrays(fulltext_arrays, schema=fulltext_schema), fulltext_path)
+
+
+def _from_json(values: List[Optional[str]]) -> List:
+    """Decode a JSON encoded column."""
+    decoded = [None] * len(values)
+    positions = []
+    for position, value in enumerate(values):
+        # most tags and relations are empty
+        if value == "[]":
+            decoded[position] = []
+        elif value == "{}":
+            decoded[position] = {}
+        elif value is not None:
+            positions.append(position)
+    # decode the others as one document, saving the overhead per call
+    others = json.loads(f"[{','.join(values[position] for position in positions)}]")
+    for position, value in zip(positions, others):
+        decoded[position] = value
+    return decoded
+
+
+def _creators_to_pylist(column: pa.ChunkedArray) -> List:
+    """
+    Convert the creators column to lists of dicts without the null fields that Arrow adds to
+    structs, e.g. the name of a person.
+    """
+    creators = column.combine_chunks()
+    structs = creators.values
+    # drop fields null for all creators at once, only mixed libraries need to strip per creator
+    fields = [
+        structs.type.field(i).name
+        for i in range(structs.type.num_fields)
+        if structs.field(i).null_count < len(structs)
+    ]
+    if len(fields) < structs.type.num_fields:
+        structs = pa.StructArray.from_arrays(
+            [structs.field(name) for name in fields], names=fields, mask=structs.is_null()
+        )
+        creators = pa.ListArray.from_arrays(creators.offsets, structs, mask=creators.is_null())
+    values = creators.to_pylist()
+    if any(structs.field(name).null_count for name in fields):
+        values = [
+            None if items is None else [{key: value for key, value in item.items() if value is not None} for item in items]
+            for items in values
+        ]
+    return values
+
+
+def load_library(path: str, fulltext: bool = True, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Load a library dataframe from a store directory written by save_library.
+
+    Args:
+        path: Store directory.
+        fulltext: Whether to read the full texts. Without them the dataframe has no fulltext column.
+        columns: Metadata columns to read (default: all).
+
+    Returns:
+        pd.DataFrame: Library dataframe indexed by paper id.
+    """
+    metadata_path = os.path.join(path, METADATA_FILE)
+    if not os.path.exists(metadata_path):
+        raise ValueError(f"No library found at {path}.")
+
+    table = pq.read_table(metadata_path, columns=None if columns is None else ["id", *columns])
+    json_columns = set(json.loads(table.schema.metadata[b"json_columns"]))
+
+    data = {}
+    for field in table.schema:
+        column = table.column(field.name)
+        if field.name in json_columns:
+            data[field.name] = _from_json(column.to_pylist())
+        elif field.name == "creators":
+            data[field.name] = _creators_to_pylist(column)
+        elif field.type == pa.string():
+            data[field.name] = column.to_pandas()
+        else:
+            data[field.name] = column.to_pylist()
+    papers_df = pd.DataFrame(data)
+
+    fulltext_path = os.path.join(path, FULLTEXT_FILE)
+    if fulltext and os.path.exists(fulltext_path):
+        fulltext_df = pq.read_table(fulltext_path).to_pandas()
+        papers_df = papers_df.merge(fulltext_df, on="id", how="left")
+
+    return papers_df.set_index("id").rename_axis(None)
@@ -0,0 +1,326 @@
+import contextlib
+import io
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import pymupdf
+import pymupdf.layout  # enables the layout analysis of pymupdf4llm
+import pymupdf4llm
+from loguru import logger
+
+# Wall-clock seconds a single document may take to parse
+DEFAULT_TIMEOUT = 300.0
+# Address space limit of a parsing process, a parsing worker needs about 500 MB by itself
+DEFAULT_MAX_MEMORY_MB = 2048
+
+# Options of pymupdf4llm.to_markdown used unless given otherwise
+DEFAULT_MARKDOWN_OPTIONS = {"header": False, "footer": False}
+# Identifies the parser that produced a markdown text, e.g. for cached full texts
+PARSER_VERSION = f"pymupdf4llm-{pymupdf4llm.version}"
+
+PdfDocument = Union[str, bytes, bytearray]
+
+
+@dataclass
+class ParseResult:
+    """Result of parsing a single PDF document."""
+
+    source: str
+    markdown: str = ""
+    page_count: Optional[int] = None
+    parse_time: float = 0.0
+    error: Optional[str] = None
+    # markdown per parsed page number (0-based) when parsing a page range
+    pages: Optional[Dict[int, str]] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _parse_document(document: PdfDocument, options: Dict[str, Any], pages: Optional[List[int]] = None) -> dict:
+    """Parse a PDF path or PDF bytes with PyMuPDF4LLM, catching errors into the result fields."""
+    start = time.perf_counter()
+    result = {"markdown": "", "page_count": None, "error": None, "pages": None}
+    try:
+        if isinstance(document, (bytes, bytearray)):
+            # memory-backed document, no temporary file
+            pdf = pymupdf.open(stream=document, filetype="pdf")
+        else:
+            pdf = pymupdf.open(document, filetype="pdf")
+        with pdf:
+            result["page_count"] = pdf.page_count
+            # disable weirdly persistent print output, safe as the worker parses one document at a time
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                if pages is None:
+                    result["markdown"] = pymupdf4llm.to_markdown(pdf, **options)
+                else:
+                    pages = sorted({page for page in pages if 0 <= page < pdf.page_count})
+                    chunks = pymupdf4llm.to_markdown(pdf, pages=pages, page_chunks=True, **options) if pages else []
+                    result["pages"] = {chunk["metadata"]["page_number"] - 1: chunk["text"] for chunk in chunks}
+                    result["markdown"] = "".join(result["pages"][page] for page in sorted(result["pages"]))
+    except MemoryError:
+        result["error"] = "Exceeded the memory limit."
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["parse_time"] = time.perf_counter() - start
+    return result
+
+
+def _worker_main(connection: Connection, max_memory_bytes: Optional[int]):
+    """Parse documents received over the connection until None is received."""
+    if max_memory_bytes:
+        try:
+            import resource
+
+            resource.setrlimit(resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
+        except (ImportError, ValueError, OSError):
+            pass  # not enforceable on this platform, timeouts still apply
+    connection.send("ready")
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        connection.send(_parse_document(*task))
+
+
+class _Worker:
+    """A parsing process and the task it is working on."""
+
+    def __init__(self, context, max_memory_bytes: Optional[int]):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_connection, max_memory_bytes), daemon=True
+        )
+        self.process.start()
+        child_connection.close()
+        self.ready = False
+        self.future: Optional[Future] = None
+        self.source = ""
+        self.started = 0.0
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class BatchPdfParser:
+    """
+    Parse PDF documents to markdown in a pool of worker processes.
+
+    Each document is parsed under a wall-clock timeout and, on platforms supporting it, an
+    address space limit. A worker exceeding either is killed and replaced, and the document
+    gets a result with an error instead of blocking or crashing the batch.
+    """
+
+    def __init__(
+            self,
+            max_workers: Optional[int] = None,
+            timeout: Optional[float] = DEFAULT_TIMEOUT,
+            max_memory_mb: Optional[int] = DEFAULT_MAX_MEMORY_MB,
+            markdown_options: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize the parser. Worker processes are started on demand.
+
+        Args:
+            max_workers: Number of worker processes (default: number of CPUs).
+            timeout: Seconds a single document may take (None for no limit).
+            max_memory_mb: Address space limit of a worker in MB (None for no limit).
+            markdown_options: Keyword arguments of pymupdf4llm.to_markdown (default: without
+                headers and footers).
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.markdown_options = dict(DEFAULT_MARKDOWN_OPTIONS if markdown_options is None else markdown_options)
+        self.version = PARSER_VERSION
+
+        self._context = multiprocessing.get_context("spawn")
+        self._tasks: "queue.Queue" = queue.Queue()
+        self._wakeup_reader, self._wakeup_writer = self._context.Pipe(duplex=False)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._dispatcher: Optional[threading.Thread] = None
+
+    def submit(
+            self, document: PdfDocument, source: Optional[str] = None, pages: Optional[Iterable[int]] = None
+    ) -> Future:
+        """
+        Queue a document for parsing.
+
+        Args:
+            document: Path of a PDF file or the PDF content.
+            source: Name of the document in its result (default: the path).
+            pages: Page numbers (0-based) to parse, each into its own entry of ParseResult.pages
+                (default: the whole document). Pages beyond the end of the document are skipped.
+
+        Returns:
+            Future: Resolves to the ParseResult of the document, it never raises.
+        """
+        if source is None:
+            source = document if isinstance(document, str) else "<bytes>"
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot submit documents to a closed parser.")
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+                self._dispatcher.start()
+            self._tasks.put((future, (document, self.markdown_options, None if pages is None else list(pages)), source))
+            self._wakeup_writer.send_bytes(b"")
+        return future
+
+    def parse(
+            self, document: PdfDocument, source: Optional[str] = None, pages: Optional[Iterable[int]] = None
+    ) -> ParseResult:
+        """Parse a single document, see submit."""
+        return self.submit(document, source, pages).result()
+
+    def parse_many(self, documents: Iterable[PdfDocument]) -> List[ParseResult]:
+        """
+        Parse many documents in parallel.
+
+        Args:
+            documents: Paths of PDF files or PDF contents.
+
+        Returns:
+            list: The ParseResult of every document, in the order of the documents.
+        """
+        futures = [self.submit(document) for document in documents]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Finish the queued documents and stop the worker processes."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._dispatcher is None:
+                return
+            self._tasks.put(None)
+            self._wakeup_writer.send_bytes(b"")
+        self._dispatcher.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _new_worker(self) -> _Worker:
+        max_memory_bytes = self.max_memory_mb * 1024 * 1024 if self.max_memory_mb else None
+        return _Worker(self._context, max_memory_bytes)
+
+    def _finish(self, worker: _Worker, error: Optional[str] = None, result: Optional[dict] = None):
+        """Resolve the future of the worker's current task."""
+        if result is None:
+            result = {"error": error, "parse_time": time.perf_counter() - worker.started}
+        if result.get("error"):
+            logger.warning(f"Could not parse {worker.source}: {result['error']}")
+        worker.future.set_result(ParseResult(source=worker.source, **result))
+        worker.future = None
+
+    def _dispatch(self):
+        """Assign queued documents to workers and collect results, enforcing the limits."""
+        workers: List[_Worker] = []
+        pending = []
+        stopping = False
+
+        while True:
+            # take new tasks
+            while True:
+                try:
+                    task = self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if task is None:
+                    stopping = True
+                else:
+                    pending.append(task)
+
+            # start workers for queued documents, they report when ready
+            starting = sum(1 for worker in workers if not worker.ready)
+            idle = [worker for worker in workers if worker.ready and worker.future is None]
+            while len(workers) < self.max_workers and len(pending) > len(idle) + starting:
+                workers.append(self._new_worker())
+                starting += 1
+
+            # hand out documents
+            for worker in idle:
+                if not pending:
+                    break
+                worker.future, task, worker.source = pending.pop(0)
+                worker.started = time.perf_counter()
+                try:
+                    worker.connection.send(task)
+                except (BrokenPipeError, OSError) as e:
+                    self._finish(worker, error=f"Worker process failed: {e}")
+                    worker.kill()
+                    workers.remove(worker)
+
+            if stopping and not pending and all(worker.future is None for worker in workers):
+                break
+
+            # wait for results, new tasks or the next deadline
+            timeout = None
+            if self.timeout is not None:
+                deadlines = [worker.started + self.timeout for worker in workers if worker.future is not None]
+                if deadlines:
+                    timeout = max(0.0, min(deadlines) - time.perf_counter())
+            ready = wait([self._wakeup_reader, *(worker.connection for worker in workers)], timeout)
+
+            if self._wakeup_reader in ready:
+                while self._wakeup_reader.poll():
+                    self._wakeup_reader.recv_bytes()
+
+            for worker in list(workers):
+                if worker.connection in ready:
+                    try:
+                        message = worker.connection.recv()
+                    except (EOFError, OSError):
+                        worker.process.join()
+                        error = f"Worker process exited with code {worker.process.exitcode}"
+                        if worker.future is not None:
+                            self._finish(worker, error=f"{error}, possibly exceeding the memory limit.")
+                        elif pending:
+                            # the worker could not start, fail a document so that the batch ends
+                            worker.future, _, worker.source = pending.pop(0)
+                            self._finish(worker, error=f"{error} before parsing.")
+                        worker.kill()
+                        workers.remove(worker)
+                        continue
+                    if message == "ready":
+                        worker.ready = True
+                    else:
+                        self._finish(worker, result=message)
+                elif (
+                        worker.future is not None
+                        and self.timeout is not None
+                        and time.perf_counter() - worker.started >= self.timeout
+                ):
+                    self._finish(worker, error=f"Timed out after {self.timeout} seconds.")
+                    worker.kill()
+                    workers.remove(worker)
+
+        for worker in workers:
+            try:
+                worker.connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+            worker.connection.close()
@@ -1,30 +1,93 @@
-from langchain_community.document_loaders import DirectoryLoader, PyPDFLoader
+import glob
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from loguru import logger
+from tqdm import tqdm
 
-def load_and_process_pdfs(data_dir: str):
-    # noinspection PyTypeChecker
-    loader = DirectoryLoader(
-        data_dir,
-        glob="**/*.pdf",
-        show_progress=True,
-        loader_cls=PyPDFLoader,
-    )
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
 
-    documents = loader.load()
 
-    # Split documents into chunks
+def _load_and_split(path: str, chunk_size: int, chunk_overlap: int) -> List[Document]:
+    """Load one PDF and split it into chunks, run in a worker process."""
     text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
         length_function=len,
     )
+    return text_splitter.split_documents(PyPDFLoader(path).lazy_load())
+
+
+def iter_pdf_chunks(
+        data_dir: str,
+        workers: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+        chunk_overlap: int = CHUNK_OVERLAP,
+        show_progress: bool = True,
+) -> Iterator[Tuple[str, List[Document]]]:
+    """
+    Load and split the PDFs in a directory in parallel, yielding the chunks of one PDF at a time.
+
+    Only a bounded number of PDFs is loaded at once, so memory does not grow with the corpus.
+    The PDFs are yielded in sorted path order, a PDF loaded early waits for the ones before it.
+    PDFs that cannot be loaded are logged and skipped.
+
+    Args:
+        data_dir: Directory searched recursively for PDFs.
+        workers: Number of loader processes (default: one per CPU).
+        chunk_size: Maximum characters per chunk.
+        chunk_overlap: Characters shared by consecutive chunks.
+        show_progress: Whether to show a progress bar.
+
+    Yields:
+        tuple: Path of a PDF and its chunks, in sorted path order.
+    """
+    paths = sorted(glob.glob(os.path.join(data_dir, "**", "*.pdf"), recursive=True))
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+            tqdm(total=len(paths), disable=not show_progress, unit="file") as progress:
+        paths = iter(paths)
+        # PDFs being loaded, in path order
+        pending = deque()
+        while True:
+            while len(pending) < max_in_flight:
+                path = next(paths, None)
+                if path is None:
+                    break
+                pending.append((path, executor.submit(_load_and_split, path, chunk_size, chunk_overlap)))
+            if not pending:
+                return
+            path, future = pending.popleft()
+            try:
+                chunks = future.result()
+            except Exception as e:
+                logger.warning(f"Could not load {path}: {e}")
+                chunks = None
+            progress.update()
+            if chunks is not None:
+                yield path, chunks
+
+
+def load_and_process_pdfs(data_dir: str, workers: Optional[int] = None):
+    """
+    Load and split all PDFs in a directory, see iter_pdf_chunks.
+
+    Returns:
+        list: Chunks of all PDFs, in sorted path order.
+    """
+    return [chunk for _, chunks in iter_pdf_chunks(data_dir, workers=workers) for chunk in chunks]
 
-    return text_splitter.split_documents(documents)
 
 def process_text(text: str):
     text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
+        chunk_size=CHUNK_SIZE,
     )
 
     return text_splitter.split_text(text)
-
@@ -0,0 +1,167 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """Thread-safe token bucket that blocks callers until a request may be sent."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize the token bucket.
+
+        Args:
+            rate: Tokens added per second, i.e. the sustained requests per second.
+            capacity: Maximum number of tokens, i.e. the allowed burst (default: rate).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0):
+        """Take tokens from the bucket, sleeping until enough tokens are available."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def set_rate(self, rate: float):
+        """Change the refill rate, keeping the tokens accumulated so far."""
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+
+class RateLimiter:
+    """
+    Adaptive rate limiter with retries for API calls.
+
+    Calls are paced by a token bucket. Throttled (429) and server error (5xx) responses as well as
+    connection errors are retried with exponential backoff and full jitter, honoring Retry-After.
+    On throttling the rate is halved, and each success raises it again towards the configured
+    requests per second.
+    """
+
+    def __init__(
+            self,
+            requests_per_second: float = 10.0,
+            max_retries: int = 5,
+            backoff_factor: float = 0.5,
+            max_backoff: float = 60.0,
+            min_requests_per_second: float = 0.5,
+            retry_status_codes: Tuple[int, ...] = RETRY_STATUS_CODES,
+    ):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            requests_per_second: Maximum sustained request rate.
+            max_retries: Maximum number of retries per call.
+            backoff_factor: Base delay in seconds of the exponential backoff.
+            max_backoff: Maximum delay in seconds between retries.
+            min_requests_per_second: Lower bound for the rate when adapting to throttling.
+            retry_status_codes: HTTP status codes that are retried.
+        """
+        self.requests_per_second = requests_per_second
+        self.min_requests_per_second = min(min_requests_per_second, requests_per_second)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_status_codes = retry_status_codes
+        self.bucket = TokenBucket(requests_per_second)
+
+        self._metrics_lock = threading.Lock()
+        self._metrics = {"requests": 0, "retries": 0, "throttled": 0, "failures": 0}
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        """Counts of requests, retries, throttled responses and failed calls so far."""
+        with self._metrics_lock:
+            return dict(self._metrics)
+
+    def _count(self, metric: str):
+        with self._metrics_lock:
+            self._metrics[metric] += 1
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Delay before the next attempt, from Retry-After if given, else backoff with jitter."""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(self.max_backoff, max(0.0, float(retry_after)))
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                    return min(self.max_backoff, max(0.0, delay))
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+    def _on_success(self):
+        if self.bucket.rate < self.requests_per_second:
+            # additive increase back to the configured rate
+            self.bucket.set_rate(min(self.requests_per_second, self.bucket.rate + 0.1 * self.requests_per_second))
+
+    def _on_throttled(self):
+        self._count("throttled")
+        # multiplicative decrease while the API is throttling
+        self.bucket.set_rate(max(self.min_requests_per_second, self.bucket.rate / 2))
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call fn within the rate limit, retrying retryable failures.
+
+        Args:
+            fn: Function performing a single request.
+            *args: Positional arguments for fn.
+            **kwargs: Keyword arguments for fn.
+
+        Returns:
+            The return value of fn.
+        """
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            self._count("requests")
+            try:
+                result = fn(*args, **kwargs)
+            except requests.HTTPError as e:
+                response = e.response
+                status_code = response.status_code if response is not None else None
+                if status_code not in self.retry_status_codes or attempt >= self.max_retries:
+                    self._count("failures")
+                    raise
+                if status_code == 429:
+                    self._on_throttled()
+                delay = self._retry_delay(attempt, response)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    self._count("failures")
+                    raise
+                delay = self._retry_delay(attempt, None)
+            else:
+                self._on_success()
+                return result
+
+            self._count("retries")
+            attempt += 1
+            time.sleep(delay)
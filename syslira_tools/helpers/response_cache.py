@@ -0,0 +1,78 @@
+import hashlib
+import json
+import time
+import zlib
+from typing import Any, Optional
+
+from syslira_tools.helpers.sqlite_cache import SQLiteLRUCache
+
+
+class ResponseCache(SQLiteLRUCache):
+    """
+    Persistent cache for API responses, backed by SQLite.
+
+    Responses are stored JSON encoded and compressed under a content hash of the request. Entries
+    expire after a time to live, and the least recently used entries are evicted when the cache
+    grows beyond its size limit.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            ttl: Optional[float] = 7 * 24 * 3600,
+            max_size_bytes: int = 512 * 1024 * 1024,
+    ):
+        """
+        Initialize the cache, creating the database if it does not exist.
+
+        Args:
+            path: Path of the SQLite database file.
+            ttl: Seconds after which an entry expires (default: one week, None to never expire).
+            max_size_bytes: Maximum total size of the stored (compressed) responses.
+        """
+        super().__init__(path, "responses", ["key"], ["value BLOB NOT NULL"], max_size_bytes)
+        self.ttl = ttl
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Create a cache key from JSON serializable request parts, e.g. URL and paging params."""
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key: str, allow_expired: bool = False) -> Optional[Any]:
+        """
+        Get a cached response.
+
+        Args:
+            key: The cache key.
+            allow_expired: Whether to serve an expired entry, e.g. when it cannot be requested
+                again; otherwise expired entries are deleted.
+
+        Returns:
+            The cached response, or None if it is not cached or expired.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, size, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, size, created = row
+            if self.ttl is not None and time.time() - created > self.ttl and not allow_expired:
+                self._delete([key], size)
+                return None
+            self._touch([key])
+
+        return json.loads(zlib.decompress(value))
+
+    def set(self, key: str, value: Any):
+        """
+        Store a response, evicting least recently used entries if the cache is full.
+
+        Args:
+            key: The cache key.
+            value: JSON serializable response.
+        """
+        data = zlib.compress(json.dumps(value).encode())
+        with self._lock:
+            self._store([key], [data], len(data))
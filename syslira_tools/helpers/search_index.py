@@ -0,0 +1,235 @@
+import json
+import math
+import os
+import re
+from array import array
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Library fields indexed for search and the weight of a term occurrence in each field
+FIELD_WEIGHTS = {"title": 3.0, "abstractNote": 2.0, "fulltext": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+_TOKEN_PATTERN = re.compile(r"\w+")
+# Frequent English words, left out of the index to keep the postings of full texts small
+STOPWORDS = frozenset(
+    "about after all also an and any are as at be been but by can could did do does for from had has have "
+    "he her his how if in into is it its may more most no not of on or our she should so such than that "
+    "the their them then there these they this those to under was we were what when where which while who "
+    "will with would you your".split()
+)
+
+
+def tokenize(text: Any) -> List[str]:
+    """
+    Split a text into index terms (casefolded words of at least two characters, without stopwords).
+
+    Args:
+        text: Text to tokenize, missing values give no terms.
+
+    Returns:
+        list: Terms in order of occurrence.
+    """
+    if not isinstance(text, str):
+        return []
+    return [token for token in _TOKEN_PATTERN.findall(text.casefold()) if len(token) > 1 and token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Incremental inverted index with BM25 ranking over the text fields of library papers.
+
+    Every document gets a slot; the postings of a term are two flat arrays of slots and weighted
+    term frequencies, so a query scores all postings of its terms at once with numpy. Removed
+    or replaced documents leave a dead slot that is skipped at query time, and the postings are
+    compacted once more than half of the slots are dead.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B, field_weights: Optional[Dict[str, float]] = None):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: BM25 term frequency saturation.
+            b: BM25 document length normalization.
+            field_weights: Indexed fields and the weight of a term occurrence in each (default:
+                FIELD_WEIGHTS).
+        """
+        self.k1 = k1
+        self.b = b
+        self.field_weights = dict(FIELD_WEIGHTS if field_weights is None else field_weights)
+        self._doc_ids: List[Optional[str]] = []
+        self._slots: Dict[str, int] = {}
+        self._lengths = array("f")
+        self._alive = bytearray()
+        self._total_length = 0.0
+        self._postings: Dict[str, Tuple[array, array]] = {}
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, doc_id: str):
+        return doc_id in self._slots
+
+    def _weighted_terms(self, document: Dict[str, Any]) -> Counter:
+        terms = Counter()
+        for field, weight in self.field_weights.items():
+            for term, count in Counter(tokenize(document.get(field))).items():
+                terms[term] += weight * count
+        return terms
+
+    def add(self, doc_id: str, document: Dict[str, Any]):
+        """
+        Index a document, replacing a previous version with the same id.
+
+        Args:
+            doc_id: Document (paper) id.
+            document: Field values of the document, see field_weights.
+        """
+        self.remove(doc_id)
+        terms = self._weighted_terms(document)
+        slot = len(self._doc_ids)
+        self._doc_ids.append(doc_id)
+        self._slots[doc_id] = slot
+        length = sum(terms.values())
+        self._lengths.append(length)
+        self._alive.append(1)
+        self._total_length += length
+        for term, frequency in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("i"), array("f"))
+            postings[0].append(slot)
+            postings[1].append(frequency)
+
+    def add_many(self, doc_ids: Sequence[str], documents: Sequence[Dict[str, Any]]):
+        """Index documents, see add."""
+        for doc_id, document in zip(doc_ids, documents):
+            self.add(doc_id, document)
+
+    def remove(self, doc_id: str):
+        """Remove a document from the index if present."""
+        slot = self._slots.pop(doc_id, None)
+        if slot is None:
+            return
+        self._alive[slot] = 0
+        self._doc_ids[slot] = None
+        self._total_length -= self._lengths[slot]
+        if len(self._doc_ids) > 1024 and len(self._slots) < len(self._doc_ids) // 2:
+            self._compact()
+
+    def _compact(self):
+        """Drop dead slots from the postings and renumber the live documents."""
+        alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+        new_slots = np.cumsum(alive, dtype=np.int64) - 1
+        postings = {}
+        for term, (slots, frequencies) in self._postings.items():
+            slots = np.frombuffer(slots, dtype=np.int32)
+            keep = alive[slots]
+            if keep.any():
+                postings[term] = (
+                    array("i", new_slots[slots[keep]].astype(np.int32).tobytes()),
+                    array("f", np.frombuffer(frequencies, dtype=np.float32)[keep].tobytes()),
+                )
+        self._postings = postings
+        self._doc_ids = [doc_id for doc_id in self._doc_ids if doc_id is not None]
+        self._slots = {doc_id: slot for slot, doc_id in enumerate(self._doc_ids)}
+        self._lengths = array("f", np.frombuffer(self._lengths, dtype=np.float32)[alive].tobytes())
+        self._alive = bytearray(b"\x01" * len(self._doc_ids))
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Rank the indexed documents for a free-text query with BM25.
+
+        Args:
+            query: Query text, tokenized like the documents.
+            k: Maximum number of results.
+
+        Returns:
+            list: Document ids with their score, best match first.
+        """
+        n_docs = len(self._slots)
+        if n_docs == 0 or k <= 0:
+            return []
+        average_length = max(self._total_length / n_docs, 1e-9)
+        alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+        lengths = np.frombuffer(self._lengths, dtype=np.float32)[:len(alive)]
+        scores = np.zeros(len(alive), dtype=np.float32)
+
+        for term, query_count in Counter(tokenize(query)).items():
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            slots = np.frombuffer(postings[0], dtype=np.int32)
+            keep = alive[slots]
+            slots = slots[keep]
+            frequencies = np.frombuffer(postings[1], dtype=np.float32)[keep]
+            if len(slots) == 0:
+                continue
+            idf = math.log(1 + (n_docs - len(slots) + 0.5) / (len(slots) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[slots] / average_length)
+            scores[slots] += query_count * idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+
+        matches = np.flatnonzero(scores)
+        if len(matches) > k:
+            matches = matches[np.argpartition(-scores[matches], k - 1)[:k]]
+        matches = matches[np.argsort(-scores[matches], kind="stable")]
+        return [(self._doc_ids[slot], float(scores[slot])) for slot in matches]
+
+    def save(self, path: str):
+        """
+        Save the index to a file, written atomically.
+
+        Args:
+            path: Path of the index file.
+        """
+        if len(self._slots) < len(self._doc_ids):
+            self._compact()
+        terms = list(self._postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(self._postings[term][0]) for term in terms])
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(
+                f,
+                params=np.array(json.dumps({"k1": self.k1, "b": self.b, "field_weights": self.field_weights})),
+                doc_ids=np.array(self._doc_ids, dtype=str),
+                lengths=np.frombuffer(self._lengths, dtype=np.float32),
+                terms=np.array(terms, dtype=str),
+                offsets=offsets,
+                slots=np.frombuffer(b"".join(self._postings[term][0].tobytes() for term in terms), dtype=np.int32),
+                frequencies=np.frombuffer(
+                    b"".join(self._postings[term][1].tobytes() for term in terms), dtype=np.float32
+                ),
+            )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """
+        Load an index saved with save.
+
+        Args:
+            path: Path of the index file.
+
+        Returns:
+            BM25Index: The loaded index.
+        """
+        with np.load(path) as data:
+            index = cls(**json.loads(str(data["params"])))
+            index._doc_ids = data["doc_ids"].tolist()
+            index._slots = {doc_id: slot for slot, doc_id in enumerate(index._doc_ids)}
+            index._lengths = array("f", data["lengths"].tobytes())
+            index._alive = bytearray(b"\x01" * len(index._doc_ids))
+            index._total_length = float(data["lengths"].sum(dtype=np.float64))
+            offsets = data["offsets"]
+            slots = data["slots"]
+            frequencies = data["frequencies"]
+            for term, start, end in zip(data["terms"].tolist(), offsets[:-1].tolist(), offsets[1:].tolist()):
+                index._postings[term] = (
+                    array("i", slots[start:end].tobytes()),
+                    array("f", frequencies[start:end].tobytes()),
+                )
+        return index
@@ -0,0 +1,117 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Sequence
+
+
+class SQLiteLRUCache:
+    """
+    Base of the persistent caches kept in one SQLite table and bounded in size.
+
+    Every entry records its stored size and the times it was created and last accessed. The total
+    size is tracked in memory, and the least recently used entries are evicted when it exceeds the
+    size limit. Subclasses read entries holding _lock and write them through _store and _touch.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            table: str,
+            key_columns: Sequence[str],
+            value_columns: Sequence[str],
+            max_size_bytes: int,
+    ):
+        """
+        Open the cache, creating its database and table if they do not exist.
+
+        Args:
+            path: Path of the SQLite database file.
+            table: Table of the entries.
+            key_columns: Text columns identifying an entry.
+            value_columns: Definitions of the other columns of an entry, e.g. 'value BLOB NOT NULL'.
+            max_size_bytes: Maximum total size of the stored entries.
+        """
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self._table = table
+        self._key_columns = list(key_columns)
+        self._value_columns = [column.split()[0] for column in value_columns]
+        self._key_condition = " AND ".join(f"{column} = ?" for column in key_columns)
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                + "".join(f"{column} TEXT NOT NULL, " for column in key_columns)
+                + "".join(f"{column}, " for column in value_columns)
+                + "size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL, "
+                + f"PRIMARY KEY ({', '.join(key_columns)}))"
+            )
+            self._connection.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed)")
+        self._size = self._connection.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+
+    def _touch(self, key: Sequence[Any]):
+        """Mark an entry as recently used. Call holding _lock."""
+        with self._connection:
+            self._connection.execute(
+                f"UPDATE {self._table} SET accessed = ? WHERE {self._key_condition}", (time.time(), *key)
+            )
+
+    def _store(self, key: Sequence[Any], values: Sequence[Any], size: int):
+        """
+        Insert or replace an entry, evicting least recently used entries if the cache is full.
+        Call holding _lock.
+
+        Args:
+            key: Values of the key columns.
+            values: Values of the value columns.
+            size: Stored size of the entry.
+        """
+        now = time.time()
+        columns = [*self._key_columns, *self._value_columns, "size", "created", "accessed"]
+        with self._connection:
+            previous = self._connection.execute(
+                f"SELECT size FROM {self._table} WHERE {self._key_condition}", tuple(key)
+            ).fetchone()
+            if previous is not None:
+                self._size -= previous[0]
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self._table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                (*key, *values, size, now, now),
+            )
+            self._size += size
+            self._evict()
+
+    def _delete(self, key: Sequence[Any], size: int):
+        """Delete an entry of the given stored size. Call holding _lock."""
+        with self._connection:
+            self._connection.execute(f"DELETE FROM {self._table} WHERE {self._key_condition}", tuple(key))
+            self._size -= size
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits its size limit."""
+        while self._size > self.max_size_bytes:
+            rows = self._connection.execute(
+                f"SELECT {', '.join(self._key_columns)}, size FROM {self._table} ORDER BY accessed LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self._size = 0
+                return
+            for *key, size in rows:
+                self._connection.execute(f"DELETE FROM {self._table} WHERE {self._key_condition}", key)
+                self._size -= size
+                if self._size <= self.max_size_bytes:
+                    return
+
+    def clear(self):
+        """Delete all cached entries."""
+        with self._lock, self._connection:
+            self._connection.execute(f"DELETE FROM {self._table}")
+            self._size = 0
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()[0]
@@ -1,60 +1,314 @@
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
+import hashlib
 import os
-import shutil
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_community.vectorstores import Chroma
+
+from syslira_tools.helpers.embeddings import DEFAULT_EMBEDDING_MODEL, CachedEmbeddings
+from syslira_tools.helpers.pdf_util import iter_pdf_chunks, process_text
+
+# Chunks embedded and added per call, bounding the memory of one embedding batch
+UPSERT_BATCH_SIZE = 256
+# Papers collected from a stream before they are upserted together
+STREAM_BATCH_PAPERS = 32
+# Paper ids per metadata filter when looking up stored chunks
+_LOOKUP_BATCH_SIZE = 500
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
 
-def create_vector_store_from_documents(chunks, persist_directory: str) -> Chroma:
+def chunk_ids(paper_id: str, chunks: Iterable[str], model_name: str) -> List[str]:
     """
-    Create a vector store from the given chunks and persist it to the specified directory.
+    Create the store ids of the chunks of a paper.
+
+    An id identifies the paper, the chunk content and the embedding model, so unchanged chunks keep
+    their id across updates and a new model gives new ids. Repeated chunks of a paper are told
+    apart by their occurrence.
 
     Args:
-        chunks: List of document chunks to be stored in the vector store.
-        persist_directory: Directory where the vector store will be persisted.
+        paper_id: Id of the paper.
+        chunks: Chunk texts of the paper.
+        model_name: Name of the embedding model.
 
     Returns:
-        Chroma: The created vector store.
+        list: One id per chunk.
+    """
+    occurrences = Counter()
+    ids = []
+    for chunk in chunks:
+        chunk_hash = _hash(chunk)
+        ids.append(_hash(f"{model_name}\0{paper_id}\0{chunk_hash}\0{occurrences[chunk_hash]}"))
+        occurrences[chunk_hash] += 1
+    return ids
+
+
+class IncrementalVectorStore:
     """
-    if os.path.exists(persist_directory):
-        shutil.rmtree(persist_directory)
+    Chroma vector store of paper chunks that is updated incrementally.
 
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-mpnet-base-v2",
-        model_kwargs = {"device":"cpu"}
-    )
+    Chunks are stored under ids derived from the paper id, the chunk hash and the embedding model
+    (see chunk_ids). Upserting a paper only embeds its new or changed chunks and deletes its
+    chunks that are gone; chunks of removed papers are deleted with delete_papers or sync.
+    Vectors of different embedding models are not comparable, so a collection only holds the
+    chunks of one model.
+    """
 
-    vectordb = Chroma.from_documents(
-        documents=chunks,
-        embedding=embeddings,
-        persist_directory=persist_directory,
-    )
+    def __init__(
+            self,
+            persist_directory: str,
+            model_name: str = DEFAULT_EMBEDDING_MODEL,
+            embeddings: Optional[Embeddings] = None,
+            collection_name: str = "papers",
+    ):
+        """
+        Open or create the vector store.
 
-    return vectordb
+        Args:
+            persist_directory: Directory where the vector store is persisted.
+            model_name: Name of the HuggingFace embedding model.
+            embeddings: LangChain embeddings to use instead of CachedEmbeddings of model_name,
+                e.g. CachedEmbeddings with another batch size, thread count or backend.
+            collection_name: Name of the Chroma collection.
 
-def create_vector_store_from_texts(
-    texts, persist_directory: str
+        Raises:
+            ValueError: If the collection holds chunks embedded by another model, backend or
+                quantization. Use another collection_name or persist_directory for it.
+        """
+        self.embeddings = embeddings or CachedEmbeddings(model_name)
+        # chunk ids change with the model, and with the backend and quantization of CachedEmbeddings
+        self.model_name = getattr(self.embeddings, "model_id", model_name)
+        self.vectordb = Chroma(
+            collection_name=collection_name,
+            embedding_function=self.embeddings,
+            persist_directory=persist_directory,
+        )
+        stored = self.vectordb.get(limit=1, include=["metadatas"])
+        stored_model = stored["metadatas"][0].get("model") if stored["metadatas"] else None
+        if stored_model is not None and stored_model != self.model_name:
+            raise ValueError(
+                f"Collection {collection_name} in {persist_directory} holds chunks embedded by {stored_model}, "
+                f"not {self.model_name}."
+            )
+
+    def _stored_ids(self, paper_ids: Iterable[str]) -> Dict[str, Set[str]]:
+        """Ids of the stored chunks of the given papers."""
+        paper_ids = list(paper_ids)
+        stored = {}
+        for start in range(0, len(paper_ids), _LOOKUP_BATCH_SIZE):
+            batch = paper_ids[start:start + _LOOKUP_BATCH_SIZE]
+            result = self.vectordb.get(where={"paper_id": {"$in": batch}}, include=["metadatas"])
+            for chunk_id, metadata in zip(result["ids"], result["metadatas"]):
+                stored.setdefault(metadata["paper_id"], set()).add(chunk_id)
+        return stored
+
+    def paper_ids(self) -> Set[str]:
+        """Ids of all papers with chunks in the store."""
+        result = self.vectordb.get(include=["metadatas"])
+        return {metadata["paper_id"] for metadata in result["metadatas"]}
+
+    def upsert_documents(self, paper_documents: Dict[str, List[Document]]) -> Dict[str, int]:
+        """
+        Make the stored chunks of papers match the given chunks.
+
+        Args:
+            paper_documents: Chunks of each paper as LangChain documents.
+
+        Returns:
+            dict: Number of chunks added (embedded), unchanged and deleted.
+        """
+        stored = self._stored_ids(paper_documents)
+        new_ids = []
+        new_documents = []
+        stale_ids = []
+        unchanged = 0
+        for paper_id, documents in paper_documents.items():
+            ids = chunk_ids(paper_id, [document.page_content for document in documents], self.model_name)
+            stored_ids = stored.get(paper_id, set())
+            stale_ids.extend(stored_ids.difference(ids))
+            for chunk_id, document in zip(ids, documents):
+                if chunk_id in stored_ids:
+                    unchanged += 1
+                    continue
+                metadata = dict(document.metadata, paper_id=paper_id, model=self.model_name)
+                new_ids.append(chunk_id)
+                new_documents.append(Document(page_content=document.page_content, metadata=metadata))
+
+        if stale_ids:
+            self.vectordb.delete(ids=stale_ids)
+        for start in range(0, len(new_documents), UPSERT_BATCH_SIZE):
+            self.vectordb.add_documents(
+                new_documents[start:start + UPSERT_BATCH_SIZE], ids=new_ids[start:start + UPSERT_BATCH_SIZE]
+            )
+        return {"added": len(new_documents), "unchanged": unchanged, "deleted": len(stale_ids)}
+
+    def upsert_texts(
+            self, texts: Dict[str, str], metadatas: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, int]:
+        """
+        Split the texts of papers into chunks and upsert them, see upsert_documents.
+
+        Args:
+            texts: Text of each paper.
+            metadatas: Metadata of each paper, added to its chunks.
+
+        Returns:
+            dict: Number of chunks added (embedded), unchanged and deleted.
+        """
+        metadatas = metadatas or {}
+        return self.upsert_documents({
+            paper_id: [
+                Document(page_content=chunk, metadata=dict(metadatas.get(paper_id, {})))
+                for chunk in process_text(text)
+            ]
+            for paper_id, text in texts.items()
+        })
+
+    def delete_papers(self, paper_ids: Iterable[str]) -> int:
+        """
+        Delete all chunks of the given papers.
+
+        Returns:
+            int: Number of chunks deleted.
+        """
+        stale_ids = [chunk_id for ids in self._stored_ids(paper_ids).values() for chunk_id in ids]
+        if stale_ids:
+            self.vectordb.delete(ids=stale_ids)
+        return len(stale_ids)
+
+    def upsert_stream(
+            self, paper_documents: Iterable[Tuple[str, List[Document]]], batch_papers: int = STREAM_BATCH_PAPERS
+    ) -> Dict[str, int]:
+        """
+        Upsert papers from a stream of (paper id, chunks), e.g. pdf_util.iter_pdf_chunks, holding
+        only one batch of papers in memory.
+
+        Args:
+            paper_documents: Paper ids with their chunks.
+            batch_papers: Papers upserted together.
+
+        Returns:
+            dict: Number of chunks added (embedded), unchanged and deleted, and the ids of the
+                upserted papers under 'paper_ids'.
+        """
+        counts = {"added": 0, "unchanged": 0, "deleted": 0}
+        paper_ids = set()
+        batch = {}
+
+        def flush():
+            for key, count in self.upsert_documents(batch).items():
+                counts[key] += count
+            batch.clear()
+
+        for paper_id, documents in paper_documents:
+            paper_ids.add(paper_id)
+            batch[paper_id] = documents
+            if len(batch) >= batch_papers:
+                flush()
+        if batch:
+            flush()
+        counts["paper_ids"] = paper_ids
+        return counts
+
+    def sync_documents(self, paper_documents: Dict[str, List[Document]]) -> Dict[str, int]:
+        """
+        Make the store hold exactly the given papers: upsert them and delete all other papers.
+
+        Returns:
+            dict: Number of chunks added (embedded), unchanged and deleted.
+        """
+        removed = self.paper_ids().difference(paper_documents)
+        counts = self.upsert_documents(paper_documents)
+        counts["deleted"] += self.delete_papers(removed)
+        return counts
+
+
+def create_vector_store_from_pdfs(
+    data_dir: str,
+    persist_directory: str,
+    model_name: str = DEFAULT_EMBEDDING_MODEL,
+    embeddings: Optional[Embeddings] = None,
+    workers: Optional[int] = None,
 ) -> Chroma:
     """
-    Create a vector store from the given texts and persist it to the specified directory.
+    Create or update a vector store from the PDFs in a directory, streaming their chunks.
+
+    PDFs are loaded and split in parallel and upserted as they complete, so memory does not grow
+    with the corpus. Only new or changed chunks are embedded; chunks of PDFs that are no longer in
+    the directory are deleted. Chunks are keyed by the path of their PDF, as in
+    create_vector_store_from_documents.
 
     Args:
-        texts: List of texts to be stored in the vector store.
+        data_dir: Directory searched recursively for PDFs.
+        persist_directory: Directory where the vector store will be persisted.
+        model_name: Name of the HuggingFace embedding model.
+        embeddings: LangChain embeddings to use instead of CachedEmbeddings of model_name.
+        workers: Number of PDF loader processes (default: one per CPU).
+
+    Returns:
+        Chroma: The vector store.
+    """
+    store = IncrementalVectorStore(persist_directory, model_name=model_name, embeddings=embeddings)
+    counts = store.upsert_stream(iter_pdf_chunks(data_dir, workers=workers))
+    # PDFs that failed to load keep their chunks
+    removed = store.paper_ids().difference(counts["paper_ids"])
+    store.delete_papers([path for path in removed if not os.path.exists(path)])
+    return store.vectordb
+
+
+def create_vector_store_from_documents(
+    chunks,
+    persist_directory: str,
+    model_name: str = DEFAULT_EMBEDDING_MODEL,
+    paper_id_key: str = "source",
+    embeddings: Optional[Embeddings] = None,
+) -> Chroma:
+    """
+    Create or update a vector store from the given chunks and persist it to the specified directory.
+
+    Only new or changed chunks are embedded; chunks of documents that are no longer given are deleted.
+
+    Args:
+        chunks: List of document chunks to be stored in the vector store.
         persist_directory: Directory where the vector store will be persisted.
+        model_name: Name of the HuggingFace embedding model.
+        paper_id_key: Metadata key identifying the document a chunk belongs to, e.g. the PDF path.
+        embeddings: LangChain embeddings to use instead of CachedEmbeddings of model_name.
 
     Returns:
-        Chroma: The created vector store.
+        Chroma: The vector store.
     """
-    if os.path.exists(persist_directory):
-        shutil.rmtree(persist_directory)
+    paper_documents = {}
+    for chunk in chunks:
+        paper_documents.setdefault(str(chunk.metadata.get(paper_id_key, "")), []).append(chunk)
 
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-mpnet-base-v2",
-        model_kwargs = {"device":"cpu"}
-    )
+    store = IncrementalVectorStore(persist_directory, model_name=model_name, embeddings=embeddings)
+    store.sync_documents(paper_documents)
+    return store.vectordb
 
-    vectordb = Chroma.from_texts(
-        texts=texts,
-        embedding=embeddings,
-        persist_directory=persist_directory,
-    )
 
-    return vectordb
\ No newline at end of file
+def create_vector_store_from_texts(
+    texts, persist_directory: str, model_name: str = DEFAULT_EMBEDDING_MODEL, embeddings: Optional[Embeddings] = None
+) -> Chroma:
+    """
+    Create or update a vector store from the given texts and persist it to the specified directory.
+
+    Each text is keyed by its content, so only new texts are embedded and texts that are no longer
+    given are deleted.
+
+    Args:
+        texts: List of texts to be stored in the vector store.
+        persist_directory: Directory where the vector store will be persisted.
+        model_name: Name of the HuggingFace embedding model.
+        embeddings: LangChain embeddings to use instead of CachedEmbeddings of model_name.
+
+    Returns:
+        Chroma: The vector store.
+    """
+    store = IncrementalVectorStore(persist_directory, model_name=model_name, embeddings=embeddings)
+    store.sync_documents({_hash(text): [Document(page_content=text)] for text in texts})
+    return store.vectordb
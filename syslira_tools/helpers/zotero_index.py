@@ -0,0 +1,78 @@
+from typing import Dict, Iterable, Optional
+
+from syslira_tools.helpers.dedup import normalize_doi, normalize_title
+
+
+class ZoteroItemIndex:
+    """
+    In-memory lookup of the items of a Zotero collection by item key, DOI and normalized title.
+
+    The index remembers the library version it was built at, so it can be brought up to date with
+    the items changed since (see PaperLibrary._get_zotero_item_index) instead of being rebuilt.
+    """
+
+    def __init__(self, items: Iterable[Dict] = (), version: Optional[int] = None):
+        """
+        Build the index.
+
+        Args:
+            items: Zotero items.
+            version: Library version the items were fetched at.
+        """
+        self.version = version
+        self._items: Dict[str, Dict] = {}
+        self._doi_index: Dict[str, str] = {}
+        self._title_index: Dict[str, str] = {}
+        self.add(items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key: str):
+        return key in self._items
+
+    def add(self, items: Iterable[Dict]):
+        """Add items, replacing the indexed items with the same key."""
+        for item in items:
+            self.remove([item["key"]])
+            self._items[item["key"]] = item
+            doi = normalize_doi(item["data"].get("DOI"))
+            if doi:
+                self._doi_index.setdefault(doi, item["key"])
+            title = normalize_title(item["data"].get("title"))
+            if title:
+                self._title_index.setdefault(title, item["key"])
+
+    def remove(self, keys: Iterable[str]):
+        """Remove the items with the given keys, if indexed."""
+        for key in keys:
+            item = self._items.pop(key, None)
+            if item is None:
+                continue
+            doi = normalize_doi(item["data"].get("DOI"))
+            if self._doi_index.get(doi) == key:
+                del self._doi_index[doi]
+            title = normalize_title(item["data"].get("title"))
+            if self._title_index.get(title) == key:
+                del self._title_index[title]
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Get the item with the given key, if indexed."""
+        return self._items.get(key)
+
+    def find(self, key: Optional[str] = None, doi: Optional[str] = None, title: Optional[str] = None) -> Optional[Dict]:
+        """
+        Find an item by key, else by DOI, else by title. DOI and title are normalized.
+
+        Returns:
+            dict: The item, or None if no item matches.
+        """
+        if key and key in self._items:
+            return self._items[key]
+        doi = normalize_doi(doi)
+        if doi and doi in self._doi_index:
+            return self._items[self._doi_index[doi]]
+        title = normalize_title(title)
+        if title and title in self._title_index:
+            return self._items[self._title_index[title]]
+        return None
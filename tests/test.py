@@ -1,14 +1,37 @@
 from unittest import TestCase  #
+from unittest.mock import MagicMock, patch
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import io
 import os
+import sqlite3
+import tempfile
+import threading
+import numpy as np
 import pandas as pd
+import pymupdf
 
-from syslira_tools import PaperLibrary, ZoteroClient, OpenAlexClient
-from syslira_tools.const import PROJECT_PATH
+from syslira_tools import LocalZoteroClient, PaperLibrary, SQLitePaperLibrary, ZoteroClient, OpenAlexClient
 
 import json
+import httpx2
+import requests
+import urllib3
+import pyalex
+from pyalex.api import OpenAlexResponseList
 from syslira_tools.helpers import convert_inverted_index
+from syslira_tools.helpers.embedding_cache import EmbeddingCache
+from syslira_tools.helpers.dedup import find_duplicates, find_near_duplicates
+from syslira_tools.helpers.fulltext_cache import FulltextCache
+from syslira_tools.helpers.pdf_parsing import BatchPdfParser
+from syslira_tools.helpers.rate_limit import RateLimiter
+from syslira_tools.helpers.response_cache import ResponseCache
+from syslira_tools.helpers.search_index import BM25Index
 
-with open(f"{PROJECT_PATH}/tests/example_papers.json") as f:
+# test data next to this file
+TESTS_PATH = os.path.dirname(os.path.abspath(__file__))
+
+with open(f"{TESTS_PATH}/example_papers.json") as f:
     example_papers = json.load(f)
 
 # get zotero library env variables
@@ -92,6 +115,514 @@ class HelpersTestCase(TestCase):
 
         self.assertEqual(result, reference)
 
+    def test_02_rate_limiter_retries_throttled_requests(self):
+        throttled = requests.Response()
+        throttled.status_code = 429
+        throttled.headers["Retry-After"] = "0"
+        responses = [requests.HTTPError(response=throttled), requests.ConnectionError(), "ok"]
+
+        def flaky_request():
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        rate_limiter = RateLimiter(requests_per_second=100, backoff_factor=0.01)
+        self.assertEqual(rate_limiter.call(flaky_request), "ok")
+        self.assertEqual(rate_limiter.metrics, {"requests": 3, "retries": 2, "throttled": 1, "failures": 0})
+
+        not_found = requests.Response()
+        not_found.status_code = 404
+        responses.append(requests.HTTPError(response=not_found))
+        with self.assertRaises(requests.HTTPError):
+            rate_limiter.call(flaky_request)
+        self.assertEqual(rate_limiter.metrics["failures"], 1)
+
+    def test_03_bm25_index_compaction_and_persistence(self):
+        index = BM25Index()
+        index.add_many(
+            [f"W{i}" for i in range(2000)],
+            [{"title": f"Paper {i}", "abstractNote": "protein folding" if i % 2 else "graph networks"} for i in range(2000)],
+        )
+        index.add("W1", {"title": "Protein folding protein folding"})
+        self.assertEqual(index.search("protein folding", k=1)[0][0], "W1")
+
+        for i in range(1500):
+            index.remove(f"W{i}")
+        self.assertEqual(len(index), 500)
+        self.assertLess(len(index._doc_ids), 1000)  # compacted
+        results = index.search("protein", k=1000)
+        self.assertEqual({doc_id for doc_id, _ in results}, {f"W{i}" for i in range(1501, 2000, 2)})
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            index.save(os.path.join(tmp_dir, "index.npz"))
+            loaded = BM25Index.load(os.path.join(tmp_dir, "index.npz"))
+        self.assertEqual(loaded.search("protein graph paper 1999", k=5), index.search("protein graph paper 1999", k=5))
+        loaded.add("W-new", {"fulltext": "graph"})
+        self.assertIn("W-new", [doc_id for doc_id, _ in loaded.search("graph", k=1000)])
+
+    def test_04_embedding_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = EmbeddingCache(tmp_dir)
+            keys = [EmbeddingCache.make_key(text) for text in ("first chunk", "second chunk")]
+            cache.set_many("model-a", {keys[0]: [0.5, 1.0, -2.0]})
+            cache.set_many("model-b", {keys[1]: np.ones(3)})
+
+            found = cache.get_many("model-a", keys)
+            self.assertEqual(list(found), [keys[0]])
+            np.testing.assert_array_equal(found[keys[0]], np.array([0.5, 1.0, -2.0], dtype=np.float32))
+            self.assertEqual(list(EmbeddingCache(tmp_dir).get_many("model-b", keys)), [keys[1]])
+
+            cache.clear("model-a")
+            self.assertEqual(len(cache), 1)
+
+class DeduplicationTestCase(TestCase):
+    def test_01_find_duplicates_prioritizes_item_type(self):
+        papers_df = pd.DataFrame(
+            {
+                "title": ["Generative AI", "generative  AI!", "Generative AI", "Other paper", "Another paper"],
+                "DOI": ["", "", "", "10.1000/1", "https://doi.org/10.1000/1"],
+                "itemType": ["preprint", "journalArticle", "conferencePaper", "conferencePaper", "journalArticle"],
+            },
+            index=["W1", "W2", "W3", "W4", "W5"],
+        )
+        to_drop = find_duplicates(papers_df)
+
+        self.assertEqual(list(papers_df.index[~to_drop]), ["W2", "W5"])
+
+    def test_02_empty_titles_and_dois_are_not_duplicates(self):
+        papers_df = pd.DataFrame(
+            {"title": ["", None, "A"], "DOI": ["", None, ""], "itemType": [None, None, None]},
+            index=["W1", "W2", "W3"],
+        )
+        self.assertFalse(find_duplicates(papers_df).any())
+
+    def test_03_find_near_duplicates(self):
+        papers_df = pd.DataFrame(
+            {
+                "title": [
+                    "Large Language Model Adaptation for Financial Sentiment Analysis",
+                    "Large language model adaptation for financial sentiment analysis: A case study",
+                    "Large Language Model Adaptation for Financial Sentiment Analyses",
+                    "Retrieval &amp; Generation for Legal Question Answering",
+                    "Retrieval & generation for legal question answering.",
+                    "Generative Agents for Discrete Event Simulation",
+                ],
+                "itemType": ["preprint", "journalArticle", "preprint", "conferencePaper", "journalArticle", None],
+            },
+            index=["W1", "W2", "W3", "W4", "W5", "W6"],
+        )
+        to_drop = find_near_duplicates(papers_df, threshold=0.8)
+
+        self.assertEqual(list(papers_df.index[~to_drop]), ["W2", "W5", "W6"])
+
+    def test_04_distinct_subtitles_are_not_near_duplicates(self):
+        papers_df = pd.DataFrame(
+            {
+                "title": [
+                    "Deep Learning for Protein Structure Prediction: Part I",
+                    "Deep Learning for Protein Structure Prediction: Part II",
+                    "Deep learning for protein structure prediction: methods and benchmarks",
+                    "Deep Learning for Protein Structure Prediction: A Survey of Applications",
+                    "Deep Learning for Protein Structure Prediction",
+                ],
+                "itemType": ["journalArticle", "journalArticle", "journalArticle", "journalArticle", "preprint"],
+            },
+            index=["W1", "W2", "W3", "W4", "W5"],
+        )
+        to_drop = find_near_duplicates(papers_df, threshold=0.8)
+
+        # titles with distinct subtitles or part numbers are kept, the title without subtitle
+        # duplicates their main title
+        self.assertEqual(list(papers_df.index[~to_drop]), ["W1", "W2", "W3", "W4"])
+
+    def test_05_roman_numerals_need_context(self):
+        papers_df = pd.DataFrame(
+            {
+                "title": [
+                    "What I learned from reviewing graph neural networks for molecules",
+                    "What we learned from reviewing graph neural networks for molecules",
+                    "Graph neural networks for molecules, part v: benchmarks",
+                    "Graph neural networks for molecules, part vi: benchmarks",
+                    "Graph neural networks for molecules revisited II",
+                    "Graph neural networks for molecules revisited III",
+                ],
+            },
+            index=["W1", "W2", "W3", "W4", "W5", "W6"],
+        )
+        to_drop = find_near_duplicates(papers_df, threshold=0.8)
+
+        # "i" is a word, numbers after "part" or at the end of the title keep papers apart
+        self.assertEqual(list(papers_df.index[~to_drop]), ["W1", "W3", "W4", "W5", "W6"])
+
+
+class OpenAlexClientTestCase(TestCase):
+    @staticmethod
+    def fake_page(count):
+        def get_page(query, filter_args, page, per_page=200, select=None):
+            start = (page - 1) * per_page
+            results = [{"id": f"W{i}"} for i in range(start, min(start + per_page, count))]
+            return OpenAlexResponseList(results, meta={"count": count, "page": page})
+        return get_page
+
+    def test_01_concurrent_search_keeps_order_and_limit(self):
+        client = OpenAlexClient(max_workers=4)
+        with patch.object(client, "_get_page", side_effect=self.fake_page(1234)):
+            papers = client.search_papers(query={"title": "x"}, limit=1001)
+
+        self.assertEqual([paper["id"] for paper in papers], [f"W{i}" for i in range(1001)])
+
+    def test_02_iter_papers_follows_cursor(self):
+        def get_cursor_page(query, filter_args, cursor, per_page=200, select=None):
+            start = 0 if cursor == "*" else int(cursor)
+            results = [{"id": f"W{i}", "title": f"Paper {i}"} for i in range(start, min(start + per_page, 450))]
+            next_cursor = str(start + per_page) if start + per_page < 450 else None
+            return OpenAlexResponseList(results, meta={"count": 450, "next_cursor": next_cursor})
+
+        client = OpenAlexClient()
+        with patch.object(client, "_get_cursor_page", side_effect=get_cursor_page):
+            self.assertEqual(len(list(client.iter_papers(query={"title": "x"}))), 450)
+            self.assertEqual(len(list(client.iter_papers(query={"title": "x"}, limit=250))), 250)
+
+            library = PaperLibrary(zotero_client, client)
+            library.add_papers_to_library(client.iter_papers(query={"title": "x"}), batch_size=100)
+            self.assertEqual(len(library.get_library_df().index), 450)
+
+    def test_03_batched_doi_lookup(self):
+        requested_batches = []
+
+        def get(query, **params):
+            dois = query.params["filter"]["doi"]
+            requested_batches.append(dois)
+            return OpenAlexResponseList(
+                [{"id": f"W{doi.split('/')[-1]}", "doi": f"https://doi.org/{doi}"} for doi in dois if doi != "10.1/404"],
+                meta={"count": len(dois)},
+            )
+
+        dois = [f"https://doi.org/10.1/{i}" for i in range(150)] + ["10.1/404", "10.1/149"]
+        client = OpenAlexClient(max_workers=2)
+        with patch.object(client, "_get", side_effect=get):
+            found, missing = client.get_papers_by_dois(dois)
+
+        self.assertEqual([len(batch) for batch in requested_batches], [100, 51])
+        self.assertEqual(len(found), 151)
+        self.assertEqual(found["https://doi.org/10.1/7"]["id"], "W7")
+        self.assertEqual(found["10.1/149"]["id"], "W149")
+        self.assertEqual(missing, ["10.1/404"])
+
+    def test_04_response_cache_and_offline_mode(self):
+        requests_sent = []
+
+        def request(fn, **params):
+            requests_sent.append(params)
+            return OpenAlexResponseList([{"id": "W1"}], meta={"count": 1, "page": params.get("page")})
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ResponseCache(os.path.join(cache_dir, "openalex.sqlite"))
+            client = OpenAlexClient(cache=cache)
+            with patch.object(client, "_request", side_effect=request):
+                for _ in range(2):
+                    papers = client._get_page({"title": "x"}, None, page=1)
+                client._get_page({"title": "x"}, None, page=2)
+                self.assertEqual(client.get_papers_count({"title": "x"}), 1)
+
+            self.assertEqual(len(requests_sent), 3)
+            self.assertEqual(papers[0]["id"], "W1")
+            self.assertEqual(papers.meta["page"], 1)
+
+            offline_client = OpenAlexClient(cache=cache, offline=True)
+            self.assertEqual(offline_client._get_page({"title": "x"}, None, page=2).meta["page"], 2)
+            with self.assertRaises(ValueError):
+                offline_client._get_page({"title": "x"}, None, page=3)
+
+            # offline, expired responses are served and kept
+            cache.ttl = -1
+            for _ in range(2):
+                self.assertEqual(offline_client._get_page({"title": "x"}, None, page=2).meta["page"], 2)
+            self.assertEqual(len(cache), 3)
+
+    def test_05_response_cache_eviction(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ResponseCache(os.path.join(cache_dir, "cache.sqlite"), ttl=None, max_size_bytes=400)
+            for i in range(10):
+                cache.set(f"key{i}", {"value": os.urandom(50).hex()})
+                cache.get("key0")  # keep the first entry recently used
+            self.assertLess(len(cache), 10)
+            self.assertIsNotNone(cache.get("key0"))
+            self.assertIsNone(cache.get("key1"))
+
+            cache.ttl = -1
+            self.assertIsNone(cache.get("key9"))
+
+    def test_06_select_projection(self):
+        client = OpenAlexClient(select=["id", "title"])
+        self.assertIn("select=id,title", client._works_query({"title": "x"}, None, client._resolve_select(None)).url)
+        self.assertIsNone(client._resolve_select([]))
+        self.assertEqual(client._resolve_select(["title"], required=["doi"]), ["title", "doi"])
+
+        requested = []
+        with patch.object(client, "_get", side_effect=lambda query, **params: requested.append(query.url) or []):
+            client.get_papers_by_dois(["10.1/1"])
+        self.assertIn("select=id,title,doi", requested[0])
+        with patch.object(client, "_get", side_effect=lambda query, **params: requested.append(query.url) or []):
+            self.assertIsNone(client.get_paper_by_doi("10.1/2", select=["title"]))
+        self.assertIn("select=title,doi", requested[1])
+
+        work = {
+            "id": "https://openalex.org/W1",
+            "title": "Projected",
+            "doi": None,
+            "biblio": {"volume": "3", "issue": "2", "first_page": "10", "last_page": "20"},
+            "primary_location": {"source": {"display_name": "Proc. X", "type": "conference"}},
+        }
+        details = paper_library._extract_openalex_papers([work])[0]
+        self.assertEqual((details["volume"], details["issue"], details["pages"]), ("3", "2", "10-20"))
+        self.assertEqual((details["itemType"], details["proceedingsTitle"]), ("conferencePaper", "Proc. X"))
+
+    def test_07_throttling_through_pyalex_session(self):
+        responses = [(429, b'{"error": "Too many requests"}'), (200, b'{"meta": {"count": 7}, "results": []}')]
+
+        def make_request(pool, connection, method, url, **kwargs):
+            status, body = responses.pop(0)
+            return urllib3.HTTPResponse(
+                body=io.BytesIO(body), status=status, headers={"Content-Type": "application/json", "Retry-After": "0"},
+                preload_content=False, request_method=method, request_url=url,
+            )
+
+        client = OpenAlexClient(rate_limiter=RateLimiter(requests_per_second=100, backoff_factor=0.01))
+        with patch("urllib3.connectionpool.HTTPConnectionPool._make_request", make_request):
+            self.assertEqual(client.get_papers_count({"title": "x"}), 7)
+        self.assertEqual(client.get_request_metrics(), {"requests": 2, "retries": 1, "throttled": 1, "failures": 0})
+        # the retries of other pyalex users are kept
+        self.assertEqual(pyalex.config.retry_http_codes, [429, 500, 503])
+
+def make_pdf(text: str, pages: int = 1) -> bytes:
+    document = pymupdf.open()
+    for page_number in range(pages):
+        # the layout analysis drops lone lines as headers, so write a paragraph
+        body = f"{text} page {page_number + 1}. " + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20
+        document.new_page().insert_textbox(pymupdf.Rect(72, 120, 520, 600), body)
+    return document.tobytes()
+
+
+class ZoteroFulltextTestCase(TestCase):
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache = FulltextCache(cache_dir.name, compression="zlib")
+
+        self.files = {"A1": make_pdf("first paper"), "A2": make_pdf("second paper", pages=2), "A3": b"not a pdf"}
+        self.client = ZoteroClient(api_key="x", library_id="1")
+        self.client.init()
+        children = {
+            f"I{i}": [{"version": 1, "data": {"key": f"A{i}", "contentType": "application/pdf"}}] for i in range(1, 4)
+        }
+        children["I4"] = []
+        patch.object(self.client, "get_item", side_effect=lambda key: {"key": key}).start()
+        patch.object(self.client, "get_children", side_effect=children.__getitem__).start()
+        patch.object(self.client, "download_file", side_effect=self.files.__getitem__).start()
+        self.addCleanup(patch.stopall)
+
+    def test_01_concurrent_retrieval_isolates_failures(self):
+        library = PaperLibrary(self.client, openalex_client, fulltext_cache=self.cache)
+        finished = []
+        progress = type("Progress", (), {"update": lambda _, n: finished.append(n)})()
+        results = library.retrieve_fulltexts_from_zotero_items(
+            ["I1", "I2", "I3", "I4"], io_workers=2, parse_workers=2, progress=progress
+        )
+
+        self.assertEqual(len(finished), 4)
+        self.assertIn("first paper page 1", results["I1"]["content"])
+        self.assertIn("second paper page 2", results["I2"]["content"])
+        self.assertEqual(results["I3"]["content"], "")
+        self.assertEqual(results["I4"]["content"], "")
+
+        self.assertEqual(results["I2"]["totalPages"], 2)
+
+        # parsed results are served from the cache without downloading again
+        self.client.download_file.reset_mock()
+        self.assertEqual(library.retrieve_parsed_fulltext_from_zotero_item("I1"), results["I1"])
+        self.client.download_file.assert_not_called()
+
+    def test_02_batch_parser_limits(self):
+        with BatchPdfParser(max_workers=2, timeout=60) as parser:
+            results = parser.parse_many([self.files["A2"], b"not a pdf", "missing.pdf"])
+            self.assertEqual(results[0].page_count, 2)
+            self.assertIn("second paper page 1", results[0].markdown)
+            self.assertEqual([result.ok for result in results], [True, False, False])
+
+            # a document exceeding the timeout does not block the parser
+            parser.timeout = 0.001
+            self.assertIn("Timed out", parser.parse(self.files["A1"]).error)
+            parser.timeout = 60
+            self.assertTrue(parser.parse(self.files["A1"]).ok)
+
+    def test_03_fulltext_cache_skips_downloads_of_unchanged_attachments(self):
+        library = PaperLibrary(self.client, openalex_client, fulltext_cache=self.cache)
+        first = library.retrieve_parsed_fulltext_from_zotero_item("I1")
+        self.client.download_file.reset_mock()
+
+        self.assertEqual(library.retrieve_parsed_fulltext_from_zotero_item("I1"), first)
+        self.client.download_file.assert_not_called()
+
+        # entries of an older parser are reused unless re-parsing is requested
+        library.pdf_parser.version = "pymupdf4llm-next"
+        self.assertEqual(library.retrieve_parsed_fulltext_from_zotero_item("I1"), first)
+        self.client.download_file.assert_not_called()
+        library.retrieve_parsed_fulltext_from_zotero_item("I1", refresh="parser")
+        self.client.download_file.assert_called_once()
+        self.assertEqual(len(self.cache), 2)
+
+        # known attachments are looked up by their identity, without any request
+        self.client.get_children.reset_mock()
+        known = [{"key": "A1", "version": 1, "contentType": "application/pdf"}]
+        results = library.retrieve_fulltexts_from_zotero_items(["I1"], attachments={"I1": known})
+        self.assertEqual(results["I1"]["content"], first["content"])
+        self.client.get_children.assert_not_called()
+        self.client.download_file.assert_called_once()
+        replaced = [{"key": "A2", "version": 2, "contentType": "application/pdf"}]
+        results = library.retrieve_fulltexts_from_zotero_items(["I1"], attachments={"I1": replaced})
+        self.assertIn("second paper", results["I1"]["content"])
+
+    def test_04_fulltext_cache_eviction(self):
+        cache = FulltextCache(self.cache.root, max_size_bytes=600, compression="zlib")
+        for i in range(10):
+            cache.set(f"md5:{i}", {"content": os.urandom(100).hex()}, parser_version="v1")
+            cache.get("md5:0")  # keep the first entry recently used
+        self.assertLess(len(cache), 10)
+        self.assertIsNotNone(cache.get("md5:0"))
+        self.assertIsNone(cache.get("md5:1"))
+        self.assertIsNone(cache.get("md5:0", {"pages": [0]}))
+
+    def test_05_streamed_download(self):
+        content = self.files["A2"]
+
+        def handler(request):
+            self.assertTrue(request.url.path.endswith("/items/A2/file"))
+            # once with and once without content length
+            headers = {"Content-Length": str(len(content))} if handler.calls == 0 else {}
+            handler.calls += 1
+            return httpx2.Response(200, headers=headers, stream=httpx2.ByteStream(content))
+
+        handler.calls = 0
+        client = ZoteroClient(api_key="x", library_id="1")
+        client.init()
+        client.client.client = httpx2.Client(transport=httpx2.MockTransport(handler))
+        self.assertEqual(client.download_file("A2", chunk_size=64), content)
+        self.assertEqual(client.download_file("A2", chunk_size=64), content)
+
+    def test_06_page_range_parsing(self):
+        library = PaperLibrary(self.client, openalex_client, fulltext_cache=self.cache)
+        with patch.object(library.pdf_parser, "parse", wraps=library.pdf_parser.parse) as parse:
+            first_page = library.retrieve_parsed_fulltext_from_zotero_item("I2", pages=[0])
+            self.assertIn("second paper page 1", first_page["content"])
+            self.assertNotIn("second paper page 2", first_page["content"])
+            self.assertEqual((first_page["indexedPages"], first_page["totalPages"]), (1, 2))
+
+            # only the pages not parsed before are parsed, pages beyond the end are skipped
+            all_pages = library.retrieve_parsed_fulltext_from_zotero_item("I2", pages=range(10))
+            self.assertEqual(parse.call_args.kwargs["pages"], [1])
+            self.assertIn("second paper page 2", all_pages["content"])
+            self.assertEqual((all_pages["indexedPages"], all_pages["totalPages"]), (2, 2))
+
+            self.assertEqual(library.retrieve_parsed_fulltext_from_zotero_item("I2", pages=[1, 0]), all_pages)
+            self.assertEqual(parse.call_count, 2)
+
+    def test_07_concurrent_api_calls(self):
+        # all four threads are in a request at the same time
+        barrier = threading.Barrier(4, timeout=5)
+
+        def handler(request):
+            barrier.wait()
+            key = request.url.path.split("/")[-2]
+            return httpx2.Response(200, json=[{"key": f"{key}-child", "data": {"key": f"{key}-child"}}])
+
+        client = ZoteroClient(api_key="x", library_id="1")
+        client.init()
+        client.client.client = httpx2.Client(transport=httpx2.MockTransport(handler))
+        keys = [f"I{i}" for i in range(8)]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            children = list(pool.map(client.get_children, keys))
+        self.assertEqual([items[0]["key"] for items in children], [f"{key}-child" for key in keys])
+        # the clients of the finished threads leave the shared HTTP client open
+        barrier = threading.Barrier(1)
+        self.assertEqual(client.get_children("I9")[0]["key"], "I9-child")
+
+
+class FakeZoteroServer:
+    """Minimal Zotero web API of one user library with versioned items, for httpx2.MockTransport."""
+
+    def __init__(self):
+        self.version = 1
+        self.items = {}
+        self.deleted = {}
+        self.files = {}
+        self.requests = []
+
+    def put(self, key, **data):
+        self.version += 1
+        item = self.items.setdefault(key, {"key": key, "data": {"key": key}})
+        item["data"].update(data)
+        item["version"] = self.version
+
+    def delete(self, key):
+        self.version += 1
+        del self.items[key]
+        self.deleted[key] = self.version
+
+    def write(self, request):
+        response = {"successful": {}, "unchanged": {}, "failed": {}}
+        for i, data in enumerate(json.loads(request.content)):
+            if data.get("title") == "Rejected":
+                response["failed"][str(i)] = {"code": 400, "message": "Rejected by the server"}
+                continue
+            key = data.pop("key", None) or f"N{len(self.items) + 1}"
+            data.pop("version", None)
+            self.put(key, **data)
+            response["successful"][str(i)] = self.items[key]
+        return response
+
+    def __call__(self, request):
+        self.requests.append(request)
+        params = dict(request.url.params)
+        path = request.url.path.removeprefix("/users/1")
+        changed = [item for item in self.items.values() if item["version"] > int(params.get("since", 0))]
+        if request.method == "POST":
+            body = self.write(request)
+        elif path == "/items/new":
+            body = {"itemType": params["itemType"], "title": "", "creators": [{"creatorType": "author", "firstName": "", "lastName": ""}],
+                    "DOI": "", "extra": "", "tags": [], "collections": [], "relations": {}}
+        elif "q" in params:
+            body = [item for item in self.items.values() if item["data"].get("title") == params["q"]]
+        elif path == "/deleted":
+            body = {"items": [key for key, version in self.deleted.items() if version > int(params["since"])]}
+        elif params.get("format") == "versions":
+            body = {item["key"]: item["version"] for item in changed}
+        elif path.endswith("/children"):
+            body = [item for item in self.items.values() if item["data"].get("parentItem") == path.split("/")[2]]
+        elif path.endswith("/file"):
+            return httpx2.Response(200, content=self.files[path.split("/")[2]])
+        elif path.startswith("/collections/"):
+            # child items are listed with the collections of their parents
+            body = [
+                item for item in changed
+                if path.split("/")[2] in self.items[item["data"].get("parentItem", item["key"])]["data"].get("collections", [])
+                and not item["data"].get("deleted")
+            ]
+            if path.endswith("/top"):
+                body = [item for item in body if "parentItem" not in item["data"]]
+            if "itemType" in params:
+                body = [item for item in body if item["data"].get("itemType") == params["itemType"]]
+        elif "itemKey" in params:
+            body = [self.items[key] for key in params["itemKey"].split(",") if key in self.items]
+        elif params.get("itemType") == "attachment":
+            body = [item for item in changed if item["data"].get("itemType") == "attachment"]
+        else:
+            raise AssertionError(f"Unexpected request {request.url}")
+        headers = {"Last-Modified-Version": str(self.version), "Total-Results": str(len(body))}
+        return httpx2.Response(200, json=body, headers=headers)
+
+
 class PaperLibraryTestCase(TestCase):
 
     def setUp(self):
@@ -113,6 +644,327 @@ class PaperLibraryTestCase(TestCase):
         )
         self.assertTrue(len(self.paper_library.get_library_df().index) > 3)
 
+    def test_03_dedup_index_follows_library_updates(self):
+        library = PaperLibrary(zotero_client, openalex_client)
+        library.add_papers_to_library(papers=example_papers)
+        paper_id = library.get_library_df().index[0]
+        library.papers_df.loc[paper_id, "itemType"] = "preprint"
+
+        # a journal article with the same normalized title replaces the preprint
+        duplicate = {"id": "W-duplicate", "title": example_papers[0]["title"].upper(), "itemType": "journalArticle"}
+        library.update_library([duplicate])
+        self.assertNotIn(paper_id, library.get_library_df().index)
+        self.assertIn("W-duplicate", library.get_library_df().index)
+
+        # renaming through the library keeps the index consistent
+        library.set_paper_tags("W-duplicate", ["reviewed"])
+        library._set_paper_field("W-duplicate", "title", "Renamed paper")
+        result = library.update_library([{"id": "W-renamed", "title": "renamed paper", "itemType": "preprint"}])
+        self.assertIn("1 duplicates", result)
+        self.assertEqual(library.get_library_df().at["W-duplicate", "tags"], ["reviewed"])
+
+        # removing one of two papers with the same title keeps the other in the index
+        library.update_library([{"id": "W-copy", "title": "Renamed paper", "itemType": "preprint"}], deduplicate=False)
+        library._remove_papers(["W-duplicate"])
+        self.assertEqual(library._find_by_title("renamed paper"), "W-copy")
+
+    def test_04_fuzzy_deduplication(self):
+        library = PaperLibrary(zotero_client, openalex_client)
+        library.add_papers_to_library(papers=example_papers)
+        near_duplicate = {"id": "W-near", "title": f"&lt;i&gt;{example_papers[0]['title']}&lt;/i&gt;."}
+
+        library.update_library([near_duplicate])
+        self.assertIn("W-near", library.get_library_df().index)
+
+        library.update_library([dict(near_duplicate, id="W-near-2")], deduplicate="fuzzy")
+        self.assertNotIn("W-near-2", library.get_library_df().index)
+
+    def test_05_save_and_load(self):
+        library = PaperLibrary(zotero_client, openalex_client)
+        library.add_papers_to_library(papers=example_papers)
+        paper_id = library.get_library_df().index[0]
+        library.set_paper_tags(paper_id, ["reviewed"])
+        library.get_library_df().at[paper_id, "creators"] = [{"creatorType": "author", "name": "ACME Lab"}]
+
+        with tempfile.TemporaryDirectory() as store_dir:
+            library.save(store_dir)
+            loaded = PaperLibrary(zotero_client, openalex_client)
+            loaded.load(store_dir)
+            pd.testing.assert_frame_equal(loaded.get_library_df(), library.get_library_df(), check_like=True)
+            self.assertEqual(loaded._title_index, library._title_index)
+
+            # metadata only, saving it again keeps the stored full texts
+            loaded.load(store_dir, fulltext=False)
+            self.assertNotIn("fulltext", loaded.get_library_df().columns)
+            loaded.save(store_dir)
+            loaded.load(store_dir)
+            self.assertEqual(loaded.get_paper_text(paper_id), library.get_paper_text(paper_id))
+
+            # adding a paper with full text to a library loaded without them keeps the others
+            loaded.load(store_dir, fulltext=False)
+            loaded.update_library([{"id": "W-new", "title": "Zymurgy explained", "fulltext": "On brewing."}])
+            loaded.save(store_dir)
+            loaded.load(store_dir)
+            self.assertEqual(loaded.get_paper_text(paper_id), library.get_paper_text(paper_id))
+            self.assertEqual(loaded.get_paper_text("W-new"), "On brewing.")
+
+    def test_06_search_library(self):
+        library = PaperLibrary(zotero_client, openalex_client)
+        library.add_papers_to_library(papers=example_papers)
+        paper_id = library.get_library_df().index[0]
+        title = library.get_library_df().at[paper_id, "title"]
+        self.assertEqual(library.search_library(title, k=1).index.tolist(), [paper_id])
+
+        # the index follows updates of the library
+        library.update_library([{"id": "W-search", "title": "Zymurgy explained", "fulltext": "On brewing with xylophones."}])
+        results = library.search_library("xylophones", k=5)
+        self.assertEqual(results.index.tolist(), ["W-search"])
+        self.assertNotIn("fulltext", results.columns)
+        library._set_paper_field("W-search", "fulltext", "On brewing with kettles.")
+        self.assertEqual(len(library.search_library("xylophones")), 0)
+
+        with tempfile.TemporaryDirectory() as store_dir:
+            library.save(store_dir)
+            loaded = PaperLibrary(zotero_client, openalex_client)
+            loaded.load(store_dir, fulltext=False)
+            self.assertIsNotNone(loaded._search_index)
+            self.assertEqual(loaded.search_library("kettles").index.tolist(), ["W-search"])
+
+            # an index lacking full texts that were not loaded is not saved
+            loaded._set_paper_field("W-search", "title", "Zymurgy revisited")
+            loaded.save(store_dir)
+            loaded.load(store_dir)
+            self.assertEqual(loaded.search_library("kettles").index.tolist(), ["W-search"])
+            # as is an index built without them
+            loaded.load(store_dir, fulltext=False)
+            self.assertEqual(loaded.search_library("revisited").index.tolist(), ["W-search"])
+            loaded.save(store_dir)
+            loaded.load(store_dir)
+            self.assertEqual(loaded.search_library("kettles").index.tolist(), ["W-search"])
+
+    def test_07_vector_store_updates(self):
+        vector_store = MagicMock()
+        vector_store.upsert_texts.return_value = {"added": 1, "unchanged": 0, "deleted": 0}
+        vector_store.delete_papers.return_value = 0
+        library = PaperLibrary(zotero_client, openalex_client, vector_store=vector_store)
+        library.update_library([{"id": "W1", "title": "First paper", "itemType": "preprint", "fulltext": "Body."}])
+        texts, metadatas = vector_store.upsert_texts.call_args.args
+        self.assertEqual(texts, {"W1": "First paper\n\nBody."})
+        self.assertEqual(metadatas, {"W1": {"title": "First paper"}})
+
+        # a duplicate replaces W1, which is deleted from the store
+        library.update_library([{"id": "W2", "title": "First Paper", "itemType": "journalArticle"}])
+        self.assertEqual(list(vector_store.upsert_texts.call_args.args[0]), ["W2"])
+        self.assertEqual(vector_store.delete_papers.call_args.args[0], {"W1"})
+
+    def test_08_incremental_zotero_sync(self):
+        server = FakeZoteroServer()
+        for key, title in [("Z1", "First paper"), ("Z2", "Second paper"), ("Z3", "Third paper")]:
+            server.put(key, title=title, itemType="journalArticle", collections=["C"])
+        client = ZoteroClient(api_key="x", library_id="1")
+        client.init()
+        client.client.client = httpx2.Client(transport=httpx2.MockTransport(server))
+        library = PaperLibrary(client, openalex_client)
+
+        library.update_from_zotero(get_fulltext=None, collection_key="C")
+        self.assertEqual(sorted(library.get_library_df()["zoteroKey"]), ["Z1", "Z2", "Z3"])
+        self.assertEqual(library._get_zotero_version("C"), server.version)
+
+        # an unchanged library costs a single request
+        server.requests.clear()
+        self.assertIn("unchanged", library.update_from_zotero(get_fulltext=None, collection_key="C"))
+        self.assertEqual(len(server.requests), 1)
+
+        server.put("Z1", title="First paper, revised")
+        server.delete("Z2")
+        server.put("Z3", deleted=1)
+        server.put("Z4", title="Fourth paper", itemType="preprint", collections=["C"])
+        server.put("A1", itemType="attachment", parentItem="Z1")
+        server.requests.clear()
+        result = library.update_from_zotero(get_fulltext=None, collection_key="C")
+        self.assertIn("Removed 2 papers", result)
+        papers_df = library.get_library_df()
+        self.assertEqual(sorted(papers_df["zoteroKey"]), ["Z1", "Z4"])
+        self.assertEqual(papers_df.loc[papers_df["zoteroKey"] == "Z1", "title"].tolist(), ["First paper, revised"])
+        self.assertEqual(len(server.requests), 4)
+
+        # the sync state is saved with the library
+        with tempfile.TemporaryDirectory() as store_dir:
+            library.save(store_dir)
+            loaded = PaperLibrary(client, openalex_client)
+            loaded.load(store_dir)
+            self.assertIn("unchanged", loaded.update_from_zotero(get_fulltext=None, collection_key="C"))
+
+    def test_09_batched_zotero_writes(self):
+        server = FakeZoteroServer()
+        server.put("Z1", title="Existing paper", itemType="journalArticle", collections=["C"])
+        client = ZoteroClient(api_key="x", library_id="1")
+        client.init()
+        client.client.client = httpx2.Client(transport=httpx2.MockTransport(server))
+        library = PaperLibrary(client, openalex_client, collection_key="C")
+        papers = [
+            {"id": f"W{i}", "title": f"Paper {i}", "itemType": "preprint" if i % 2 else "journalArticle",
+             "DOI": f"10.1/{i}", "creators": [{"creatorType": "author", "name": f"Author {i}"}]}
+            for i in range(60)
+        ]
+        papers += [
+            {"id": "W-existing", "title": "Existing paper", "itemType": "journalArticle"},
+            {"id": "W-invalid", "title": "Invalid paper", "itemType": "journalArticle", "creators": [{"name": "Anonymous"}]},
+            {"id": "W-rejected", "title": "Rejected", "itemType": "preprint"},
+        ]
+        papers[0]["tags"] = ["reviewed"]
+        library.update_library(papers)
+
+        server.requests.clear()
+        results = library.push_papers_to_zotero()
+        writes = [request for request in server.requests if request.method == "POST"]
+        templates = [request for request in server.requests if request.url.path.endswith("/items/new")]
+        self.assertEqual(len(writes), 2)
+        self.assertEqual(len(templates), 2)
+        self.assertEqual((results["status"] == "added").sum(), 60)
+        self.assertEqual(results.at["W-existing", "status"], "skipped")
+        self.assertEqual(results.at["W-existing", "zoteroKey"], "Z1")
+        self.assertIn("creator", results.at["W-invalid", "error"])
+        self.assertEqual(results.at["W-rejected", "error"], "Rejected by the server")
+
+        # keys of written papers are stored in the library, items are created in the collection
+        zotero_key = library.get_library_df().at["W0", "zoteroKey"]
+        self.assertEqual(results.at["W0", "zoteroKey"], zotero_key)
+        self.assertEqual(server.items[zotero_key]["data"]["collections"], ["C"])
+        self.assertEqual(server.items[zotero_key]["data"]["tags"], [{"tag": "reviewed"}])
+        self.assertEqual(server.items[zotero_key]["data"]["extra"], "W0")
+
+        library._set_paper_field("W1", "title", "Paper 1, revised")
+        results = library.push_papers_to_zotero(["W1"], update_existing=True)
+        self.assertEqual(results.at["W1", "status"], "updated")
+        self.assertEqual(server.items[results.at["W1", "zoteroKey"]]["data"]["title"], "Paper 1, revised")
+
+    def test_10_zotero_item_index(self):
+        server = FakeZoteroServer()
+        server.put("Z1", title="Indexed paper", DOI="10.1/indexed", itemType="journalArticle", collections=["C"])
+        server.put("Z2", title="Paper in another collection", itemType="journalArticle", collections=["D"])
+        client = ZoteroClient(api_key="x", library_id="1")
+        client.init()
+        client.client.client = httpx2.Client(transport=httpx2.MockTransport(server))
+        library = PaperLibrary(client, openalex_client, collection_key="C")
+        library.update_library([
+            {"id": "W1", "title": "Indexed paper (preprint version)", "DOI": "https://doi.org/10.1/INDEXED", "itemType": "preprint"},
+            {"id": "W2", "title": "Paper in another collection", "zoteroKey": "Z2", "itemType": "journalArticle"},
+            {"id": "W3", "title": "New paper", "itemType": "journalArticle"},
+        ])
+
+        results = library.push_papers_to_zotero()
+        self.assertEqual(results["status"].tolist(), ["skipped", "skipped", "added"])
+        self.assertEqual(library.get_library_df().at["W1", "zoteroKey"], "Z1")
+        self.assertFalse(any("q" in request.url.params for request in server.requests))
+
+        # later pushes only fetch the changes of the collection, and the linked item outside of it
+        library.push_papers_to_zotero()
+        server.requests.clear()
+        results = library.push_papers_to_zotero()
+        self.assertEqual(results["status"].tolist(), ["skipped", "skipped", "skipped"])
+        self.assertEqual(len(server.requests), 2)
+
+        results = library.push_papers_to_zotero(update_existing=True)
+        self.assertEqual(results["status"].tolist(), ["updated", "updated", "updated"])
+        self.assertEqual(server.items["Z2"]["data"]["collections"], ["D", "C"])
+
+        server.delete("Z1")
+        library.push_papers_to_zotero(["W1"])
+        self.assertNotIn("Z1", library._get_zotero_item_index("C"))
+
+    def test_11_bulk_attachment_resolver(self):
+        server = FakeZoteroServer()
+        for i in range(1, 4):
+            server.put(f"Z{i}", title=f"Paper {i}", itemType="journalArticle", collections=["C"])
+            server.put(f"A{i}", itemType="attachment", parentItem=f"Z{i}", contentType="application/pdf",
+                       linkMode="imported_file", md5=f"md5-{i}")
+            server.files[f"A{i}"] = make_pdf(f"paper {i}")
+        server.put("N1", itemType="note", parentItem="Z1")
+        server.put("Z4", title="Paper without PDF", itemType="journalArticle", collections=["C"])
+        client = ZoteroClient(api_key="x", library_id="1")
+        client.init()
+        client.client.client = httpx2.Client(transport=httpx2.MockTransport(server))
+
+        attachments = client.get_pdf_attachments("C")
+        self.assertEqual(sorted(attachments), ["Z1", "Z2", "Z3"])
+        self.assertEqual(attachments["Z1"][0]["linkMode"], "imported_file")
+        self.assertEqual(attachments["Z1"][0]["md5"], "md5-1")
+
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        library = PaperLibrary(client, openalex_client, collection_key="C", fulltext_cache=FulltextCache(cache_dir.name))
+        server.requests.clear()
+        with patch("syslira_tools.clients.paper_library.BULK_ATTACHMENT_MIN_ITEMS", 2):
+            library.update_from_zotero(get_fulltext="parsed", collection_key="C")
+            self.assertIn("paper 2 page 1", library.get_paper_text("Z2"))
+            self.assertFalse(any(request.url.path.endswith("/children") for request in server.requests))
+
+            library.papers_df = library.get_library_df().drop(columns="fulltext")
+            library.vector_store = MagicMock()
+            library.vector_store.upsert_texts.return_value = {"added": 3, "unchanged": 0, "deleted": 0}
+            library.vector_store.delete_papers.return_value = 0
+            self.assertIn("Downloaded 3 files. 1 errors occurred.", library.retrieve_all_zotero_attachments())
+            self.assertIn("paper 3 page 1", library.get_paper_text("Z3"))
+            # the retrieved full texts are embedded
+            texts, _ = library.vector_store.upsert_texts.call_args.args
+            self.assertEqual(sorted(texts), ["Z1", "Z2", "Z3"])
+            self.assertIn("paper 3 page 1", texts["Z3"])
+
+    def test_12_zotero_sync_refetches_replaced_pdfs(self):
+        server = FakeZoteroServer()
+        server.put("Z1", title="First paper", itemType="journalArticle", collections=["C"])
+        server.put("A1", itemType="attachment", parentItem="Z1", contentType="application/pdf")
+        server.files["A1"] = make_pdf("original text")
+        client = ZoteroClient(api_key="x", library_id="1")
+        client.init()
+        client.client.client = httpx2.Client(transport=httpx2.MockTransport(server))
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        library = PaperLibrary(client, openalex_client, fulltext_cache=FulltextCache(cache_dir.name, compression="zlib"))
+
+        library.update_from_zotero(collection_key="C")
+        self.assertIn("original text", library.get_library_df().at["Z1", "fulltext"])
+
+        # replacing the PDF changes the attachment, not the version of its parent
+        server.put("A1", md5="replaced")
+        server.files["A1"] = make_pdf("replaced text")
+        library.update_from_zotero(collection_key="C")
+        self.assertIn("replaced text", library.get_library_df().at["Z1", "fulltext"])
+
+        server.put("A1", md5="replaced again")
+        server.files["A1"] = make_pdf("third text")
+        library.update_from_zotero(collection_key="C", incremental=False)
+        self.assertIn("third text", library.get_library_df().at["Z1", "fulltext"])
+
+    def test_13_updates_merge_with_stored_papers(self):
+        library = PaperLibrary(zotero_client, openalex_client)
+        library.update_library([{"id": "A", "title": "x"}, {"id": "A", "title": "y"}], deduplicate=False)
+        self.assertEqual(library.get_library_df().index.tolist(), ["A"])
+        self.assertEqual(library.get_library_df().at["A", "title"], "y")
+
+        # the stored fields the new version lacks are kept
+        library._set_paper_field("A", "summary", "A summary.")
+        library.update_library([{"id": "A", "title": "z", "citedByCount": 3}], deduplicate=False)
+        library.set_paper_tags("A", ["reviewed"])
+        paper = library.get_library_df().loc["A"]
+        self.assertEqual((paper["title"], paper["summary"], paper["citedByCount"]), ("z", "A summary.", 3))
+
+        # two Zotero items with the title of one paper do not both update it
+        server = FakeZoteroServer()
+        server.put("Z1", title="Y", itemType="journalArticle", collections=["C"])
+        server.put("Z2", title="y", itemType="preprint", collections=["C"])
+        client = ZoteroClient(api_key="x", library_id="1")
+        client.init()
+        client.client.client = httpx2.Client(transport=httpx2.MockTransport(server))
+        library = PaperLibrary(client, openalex_client)
+        library.update_library([{"id": "A", "title": "y", "summary": "A summary."}])
+        library.update_from_zotero(get_fulltext=None, collection_key="C")
+        papers_df = library.get_library_df()
+        self.assertEqual(sorted(papers_df.index), ["A", "Z2"])
+        self.assertEqual((papers_df.at["A", "zoteroKey"], papers_df.at["A", "summary"]), ("Z1", "A summary."))
+        library.update_library([{"id": "B", "title": "Another paper"}])
+
     def test_02_get_paper_text(self):
         paper_text = zotero_client.get_fulltext(
             item_key=example_papers[0]["id"]
@@ -121,6 +973,189 @@ class PaperLibraryTestCase(TestCase):
         self.assertTrue(True)
 
 
+class SQLitePaperLibraryTestCase(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "library.sqlite")
+        self.library = SQLitePaperLibrary(zotero_client, openalex_client, db_path=self.db_path)
+
+    def tearDown(self):
+        self.library.close()
+        self.tmp_dir.cleanup()
+
+    def test_01_same_results_as_in_memory_library(self):
+        memory_library = PaperLibrary(zotero_client, openalex_client)
+        for library in (memory_library, self.library):
+            library.add_papers_to_library(papers=example_papers)
+        pd.testing.assert_index_equal(self.library.get_library_df().index, memory_library.get_library_df().index)
+        self.assertEqual(self.library.get_library_df()["title"].tolist(), memory_library.get_library_df()["title"].tolist())
+
+        paper_id = self.library.get_library_df().index[0]
+        duplicate = {"id": "W-duplicate", "title": example_papers[0]["title"].upper(), "itemType": "journalArticle"}
+        for library in (memory_library, self.library):
+            library._set_paper_field(paper_id, "itemType", "preprint")
+            library.update_library([duplicate])
+            library.set_paper_tags("W-duplicate", ["reviewed"])
+            library._set_paper_field("W-duplicate", "title", "Renamed paper")
+        self.assertNotIn(paper_id, self.library.get_library_df().index)
+        self.assertEqual(self.library.get_library_df().at["W-duplicate", "tags"], ["reviewed"])
+        renamed = [{"id": "W-renamed", "title": "renamed paper", "itemType": "preprint"}]
+        self.assertEqual(self.library.update_library(renamed), memory_library.update_library(renamed))
+        for library in (memory_library, self.library):
+            library._set_paper_field("W-duplicate", "summary", "A summary.")
+            library.update_library([{"id": "W-duplicate", "title": "Renamed paper", "citedByCount": 3}])
+        self.assertEqual(self.library.get_library_df().loc["W-duplicate", ["tags", "summary", "citedByCount"]].tolist(),
+                         [["reviewed"], "A summary.", 3])
+        other_id = memory_library.get_library_df().index[1]
+        self.assertEqual(
+            self.library.get_paper_text(other_id, "abstractNote"),
+            memory_library.get_paper_text(other_id, "abstractNote"),
+        )
+
+    def test_02_shared_library_file(self):
+        self.library.add_papers_to_library(papers=example_papers)
+        other = SQLitePaperLibrary(zotero_client, openalex_client, db_path=self.db_path)
+        self.addCleanup(other.close)
+        self.assertEqual(len(other.get_library_df()), len(self.library.get_library_df()))
+
+        # the near-duplicate index follows changes of the other library
+        other.get_library_df()
+        self.library.update_library([{"id": "W-new", "title": "A completely new paper on shared libraries"}])
+        other.update_library([{"id": "W-new-2", "title": "A completely new paper on shared libraries."}], deduplicate="fuzzy")
+        self.assertNotIn("W-new-2", self.library.get_library_df().index)
+        self.assertIn("W-new", other.get_library_df().index)
+
+        # a failed merge leaves the library unchanged
+        count = len(self.library.get_library_df())
+        with patch.object(self.library.db, "upsert", side_effect=RuntimeError("disk full")):
+            with self.assertRaises(RuntimeError):
+                self.library.update_library([{"id": "W-new", "title": "Replaced paper"}])
+        self.assertEqual(len(other.get_library_df()), count)
+        self.assertEqual(other.get_library_df().at["W-new", "title"], "A completely new paper on shared libraries")
+
+    def test_03_indexed_lookups(self):
+        self.library.update_library([
+            {"id": "W1", "title": "Protein folding with transformers", "DOI": "https://doi.org/10.1/ABC",
+             "zoteroKey": "KEY1", "abstractNote": "We fold proteins."},
+            {"id": "W2", "title": "Graph neural networks", "fulltext": "Message passing for protein graphs."},
+            {"id": "W3", "title": "Unrelated work"},
+        ])
+        self.assertEqual(self.library.find_by_zotero_key("KEY1"), "W1")
+        self.assertEqual(self.library._find_by_doi("10.1/abc"), "W1")
+        self.assertEqual(self.library._find_by_title("graph neural networks"), "W2")
+
+        results = self.library.search_fulltext("protein*")
+        self.assertEqual(set(results.index), {"W1", "W2"})
+        self.assertNotIn("fulltext", results.columns)
+        self.assertEqual(self.library.search_fulltext("message passing").index.tolist(), ["W2"])
+        with self.assertRaises(ValueError):
+            self.library.search_fulltext("covid-19")
+        self.assertEqual(self.library.search_library("message-passing graphs", k=1).index.tolist(), ["W2"])
+        self.assertEqual(len(self.library.search_library("the")), 0)
+
+    def test_04_zotero_sync_state(self):
+        self.library._set_zotero_version("C", 7)
+        other = SQLitePaperLibrary(zotero_client, openalex_client, db_path=self.db_path)
+        self.addCleanup(other.close)
+        self.assertEqual(other._get_zotero_versions(), {"C": 7})
+
+        # replacing the library requires a full sync
+        other.papers_df = pd.DataFrame([{"id": "W1", "title": "First paper"}]).set_index("id")
+        self.assertIsNone(self.library._get_zotero_version("C"))
+
+
+class LocalZoteroClientTestCase(TestCase):
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.data_dir = tmp_dir.name
+        self.db_path = os.path.join(self.data_dir, "zotero.sqlite")
+        with open(f"{TESTS_PATH}/zotero_fixture.sql") as f, sqlite3.connect(self.db_path) as connection:
+            connection.executescript(f.read())
+        self.pdf = make_pdf("local paper")
+        os.makedirs(os.path.join(self.data_dir, "storage", "ATTACH01"))
+        with open(os.path.join(self.data_dir, "storage", "ATTACH01", "paper.pdf"), "wb") as f:
+            f.write(self.pdf)
+        with open(os.path.join(self.data_dir, "storage", "ATTACH01", ".zotero-ft-cache"), "w") as f:
+            f.write("local paper indexed by Zotero")
+        os.makedirs(os.path.join(self.data_dir, "linked"))
+        with open(os.path.join(self.data_dir, "linked", "linked.pdf"), "wb") as f:
+            f.write(make_pdf("linked paper"))
+
+        self.client = LocalZoteroClient(self.data_dir, linked_attachment_base_dir=os.path.join(self.data_dir, "linked"))
+        self.client.init()
+        self.addCleanup(self.client.close)
+
+    def test_01_items_in_web_api_format(self):
+        items = self.client.get_all_items("COLL0001")
+        self.assertEqual([item["key"] for item in items], ["ITEM0001", "ITEM0002"])
+        data = items[0]["data"]
+        self.assertEqual((data["itemType"], data["title"], data["DOI"]), ("journalArticle", "Protein folding with transformers", "10.1/protein"))
+        self.assertEqual(data["creators"], [
+            {"creatorType": "author", "firstName": "Ada", "lastName": "Lovelace"},
+            {"creatorType": "author", "name": "Folding Consortium"},
+        ])
+        self.assertEqual(data["tags"], [{"tag": "proteins"}, {"tag": "to read", "type": 1}])
+        self.assertEqual((data["collections"], data["dateAdded"]), (["COLL0001"], "2024-01-01T10:00:00Z"))
+        self.assertEqual(len(self.client.get_all_items()), 3)
+        self.assertEqual(self.client.get_item("ITEM0003")["data"]["deleted"], 1)
+
+        children = {item["key"]: item["data"] for item in self.client.get_children("ITEM0001")}
+        self.assertEqual(set(children), {"ATTACH01", "NOTE0001"})
+        self.assertEqual(children["NOTE0001"]["note"], "<p>Check the figures.</p>")
+        self.assertEqual((children["ATTACH01"]["linkMode"], children["ATTACH01"]["md5"]), ("imported_file", "md5-attach01"))
+
+        attachments = self.client.get_pdf_attachments("COLL0001")
+        self.assertEqual({key: [a["key"] for a in value] for key, value in attachments.items()},
+                         {"ITEM0001": ["ATTACH01"], "ITEM0002": ["ATTACH02"]})
+        self.assertEqual(attachments["ITEM0002"][0]["linkMode"], "linked_file")
+
+        self.assertEqual(self.client.download_file("ATTACH01"), self.pdf)
+        self.assertTrue(self.client.get_file("ATTACH02").startswith(b"%PDF"))
+        self.assertEqual(self.client.get_fulltext("ATTACH01"),
+                         {"content": "local paper indexed by Zotero", "indexedPages": 1, "totalPages": 1})
+        self.assertEqual([item["key"] for item in self.client.search_items("lovelace")], ["ITEM0001", "ITEM0002"])
+        self.assertEqual([c["data"]["name"] for c in self.client.get_collections()], ["Background", "Review"])
+        with self.assertRaises(ValueError):
+            self.client.create_items([{"itemType": "journalArticle"}])
+
+    def test_02_incremental_library_sync(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        library = PaperLibrary(self.client, openalex_client, fulltext_cache=FulltextCache(cache_dir.name))
+        library.update_from_zotero(get_fulltext="parsed", collection_key="COLL0001")
+        self.assertEqual(library.get_library_df().index.tolist(), ["ITEM0001", "ITEM0002"])
+        self.assertIn("local paper page 1", library.get_paper_text("ITEM0001"))
+        self.assertIn("linked paper page 1", library.get_paper_text("ITEM0002"))
+        self.assertEqual(library.get_library_df().at["ITEM0001", "creators"][1], {"creatorType": "author", "name": "Folding Consortium"})
+        self.assertIn("unchanged", library.update_from_zotero(get_fulltext=None, collection_key="COLL0001"))
+
+        # the client reads changes Zotero makes to the database
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute("INSERT INTO deletedItems VALUES (2, '2024-02-01 00:00:00')")
+            connection.execute("UPDATE items SET clientDateModified = '2024-02-01 00:00:00' WHERE itemID = 2")
+            connection.execute("UPDATE itemDataValues SET value = 'Protein folding revisited' WHERE valueID = 1")
+            connection.execute("UPDATE items SET clientDateModified = '2024-02-01 00:00:01' WHERE itemID = 1")
+        self.assertIn("Removed 1 papers", library.update_from_zotero(get_fulltext=None, collection_key="COLL0001"))
+        self.assertEqual(library.get_library_df().at["ITEM0001", "title"], "Protein folding revisited")
+        self.assertNotIn("ITEM0002", library.get_library_df().index)
+
+    def test_03_edits_in_the_second_of_the_last_sync(self):
+        # timestamps have whole seconds: an edit in the second of a sync must be fetched by the next one
+        now = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute("UPDATE items SET clientDateModified = ? WHERE itemID = 1", (now,))
+        items, version = self.client.get_items_since("COLL0001", since=0)
+        self.assertIn("ITEM0001", [item["key"] for item in items])
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute("UPDATE items SET clientDateModified = ? WHERE itemID = 2", (now,))
+        items, next_version = self.client.get_items_since("COLL0001", since=version)
+        self.assertEqual({item["key"] for item in items}, {"ITEM0001", "ITEM0002"})
+        self.assertGreaterEqual(next_version, version)
+
+
 # class OpenalexRetrievalTestCase(TestCase):
 #     def setUp(self):
 #         self.paper_library = _get_paper_library()
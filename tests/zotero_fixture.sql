@@ -0,0 +1,107 @@
+-- Subset of the schema of zotero.sqlite with a small user library, for LocalZoteroClientTestCase
+CREATE TABLE libraries (
+    libraryID INTEGER PRIMARY KEY, type TEXT NOT NULL, editable INT NOT NULL, filesEditable INT NOT NULL,
+    version INT NOT NULL DEFAULT 0, storageVersion INT NOT NULL DEFAULT 0, lastSync INT NOT NULL DEFAULT 0,
+    archived INT NOT NULL DEFAULT 0
+);
+CREATE TABLE groups (
+    groupID INTEGER PRIMARY KEY, libraryID INT NOT NULL UNIQUE, name TEXT NOT NULL, description TEXT NOT NULL,
+    version INT NOT NULL
+);
+CREATE TABLE itemTypesCombined (
+    itemTypeID INT NOT NULL, typeName TEXT NOT NULL, display INT DEFAULT 1 NOT NULL, custom INT NOT NULL,
+    PRIMARY KEY (itemTypeID)
+);
+CREATE TABLE fieldsCombined (
+    fieldID INT NOT NULL, fieldName TEXT NOT NULL, label TEXT, fieldFormatID INT, custom INT NOT NULL,
+    PRIMARY KEY (fieldID)
+);
+CREATE TABLE creatorTypes (creatorTypeID INTEGER PRIMARY KEY, creatorType TEXT);
+CREATE TABLE charsets (charsetID INTEGER PRIMARY KEY, charset TEXT UNIQUE);
+CREATE TABLE items (
+    itemID INTEGER PRIMARY KEY, itemTypeID INT NOT NULL, dateAdded TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    dateModified TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    clientDateModified TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, libraryID INT NOT NULL, key TEXT NOT NULL,
+    version INT NOT NULL DEFAULT 0, synced INT NOT NULL DEFAULT 0, UNIQUE (libraryID, key)
+);
+CREATE TABLE itemDataValues (valueID INTEGER PRIMARY KEY, value UNIQUE);
+CREATE TABLE itemData (itemID INT, fieldID INT, valueID, PRIMARY KEY (itemID, fieldID));
+CREATE TABLE itemNotes (itemID INTEGER PRIMARY KEY, parentItemID INT, note TEXT, title TEXT);
+CREATE TABLE itemAttachments (
+    itemID INTEGER PRIMARY KEY, parentItemID INT, linkMode INT, contentType TEXT, charsetID INT, path TEXT,
+    syncState INT DEFAULT 0, storageModTime INT, storageHash TEXT, lastProcessedModificationTime INT
+);
+CREATE TABLE itemAnnotations (
+    itemID INTEGER PRIMARY KEY, parentItemID INT NOT NULL, type INTEGER NOT NULL, authorName TEXT, text TEXT,
+    comment TEXT, color TEXT, pageLabel TEXT, sortIndex TEXT NOT NULL, position TEXT NOT NULL,
+    isExternal INT NOT NULL
+);
+CREATE TABLE tags (tagID INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE itemTags (itemID INT NOT NULL, tagID INT NOT NULL, type INT NOT NULL, PRIMARY KEY (itemID, tagID));
+CREATE TABLE creators (
+    creatorID INTEGER PRIMARY KEY, firstName TEXT, lastName TEXT, fieldMode INT,
+    UNIQUE (lastName, firstName, fieldMode)
+);
+CREATE TABLE itemCreators (
+    itemID INT NOT NULL, creatorID INT NOT NULL, creatorTypeID INT NOT NULL DEFAULT 1,
+    orderIndex INT NOT NULL DEFAULT 0, PRIMARY KEY (itemID, creatorID, creatorTypeID, orderIndex),
+    UNIQUE (itemID, orderIndex)
+);
+CREATE TABLE collections (
+    collectionID INTEGER PRIMARY KEY, collectionName TEXT NOT NULL, parentCollectionID INT DEFAULT NULL,
+    clientDateModified TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, libraryID INT NOT NULL, key TEXT NOT NULL,
+    version INT NOT NULL DEFAULT 0, synced INT NOT NULL DEFAULT 0, UNIQUE (libraryID, key)
+);
+CREATE TABLE collectionItems (
+    collectionID INT NOT NULL, itemID INT NOT NULL, orderIndex INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (collectionID, itemID)
+);
+CREATE TABLE deletedItems (itemID INTEGER PRIMARY KEY, dateDeleted DEFAULT CURRENT_TIMESTAMP NOT NULL);
+CREATE TABLE fulltextItems (
+    itemID INTEGER PRIMARY KEY, indexedPages INT, totalPages INT, indexedChars INT, totalChars INT,
+    version INT NOT NULL DEFAULT 0, synced INT NOT NULL DEFAULT 0
+);
+CREATE TABLE syncObjectTypes (syncObjectTypeID INTEGER PRIMARY KEY, name TEXT);
+CREATE TABLE syncDeleteLog (
+    syncObjectTypeID INT NOT NULL, libraryID INT NOT NULL, key TEXT NOT NULL,
+    dateDeleted TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP, UNIQUE (syncObjectTypeID, libraryID, key)
+);
+
+INSERT INTO libraries VALUES (1, 'user', 1, 1, 0, 0, 0, 0);
+INSERT INTO itemTypesCombined VALUES (1, 'annotation', 1, 0), (2, 'attachment', 1, 0), (3, 'note', 1, 0),
+    (4, 'journalArticle', 1, 0), (5, 'preprint', 1, 0);
+INSERT INTO fieldsCombined VALUES (1, 'title', NULL, NULL, 0), (2, 'DOI', NULL, NULL, 0), (3, 'date', NULL, NULL, 0),
+    (4, 'abstractNote', NULL, NULL, 0), (5, 'publicationTitle', NULL, NULL, 0), (6, 'url', NULL, NULL, 0);
+INSERT INTO creatorTypes VALUES (1, 'author'), (2, 'editor');
+INSERT INTO charsets VALUES (1, 'utf-8');
+INSERT INTO syncObjectTypes VALUES (1, 'collection'), (2, 'creator'), (3, 'item'), (4, 'search'), (5, 'tag');
+
+INSERT INTO items (itemID, itemTypeID, dateAdded, dateModified, clientDateModified, libraryID, key) VALUES
+    (1, 4, '2024-01-01 10:00:00', '2024-01-01 10:00:00', '2024-01-01 10:00:00', 1, 'ITEM0001'),
+    (2, 5, '2024-01-01 11:00:00', '2024-01-01 11:00:00', '2024-01-01 11:00:00', 1, 'ITEM0002'),
+    (3, 2, '2024-01-01 10:01:00', '2024-01-01 10:01:00', '2024-01-01 10:01:00', 1, 'ATTACH01'),
+    (4, 3, '2024-01-01 10:02:00', '2024-01-01 10:02:00', '2024-01-01 10:02:00', 1, 'NOTE0001'),
+    (5, 2, '2024-01-01 11:01:00', '2024-01-01 11:01:00', '2024-01-01 11:01:00', 1, 'ATTACH02'),
+    (6, 4, '2024-01-01 12:00:00', '2024-01-01 12:00:00', '2024-01-01 12:00:00', 1, 'ITEM0003'),
+    (7, 4, '2024-01-01 13:00:00', '2024-01-01 13:00:00', '2024-01-01 13:00:00', 1, 'ITEM0004'),
+    (8, 1, '2024-01-01 10:03:00', '2024-01-01 10:03:00', '2024-01-01 10:03:00', 1, 'ANNOT001');
+INSERT INTO itemDataValues VALUES (1, 'Protein folding with transformers'), (2, '10.1/protein'), (3, '2023-05-01'),
+    (4, 'We fold proteins.'), (5, 'Journal of Folding'), (6, 'Graph neural networks'), (7, 'Full Text PDF'),
+    (8, 'Trashed paper'), (9, 'Paper in a subcollection'), (10, 'Linked PDF');
+INSERT INTO itemData VALUES (1, 1, 1), (1, 2, 2), (1, 3, 3), (1, 4, 4), (1, 5, 5), (2, 1, 6), (3, 1, 7),
+    (5, 1, 10), (6, 1, 8), (7, 1, 9);
+INSERT INTO creators VALUES (1, 'Ada', 'Lovelace', 0), (2, NULL, 'Folding Consortium', 1), (3, 'Alan', 'Turing', 0);
+INSERT INTO itemCreators VALUES (1, 1, 1, 0), (1, 2, 1, 1), (2, 3, 1, 0), (2, 1, 2, 1);
+INSERT INTO tags VALUES (1, 'proteins'), (2, 'to read');
+INSERT INTO itemTags VALUES (1, 1, 0), (1, 2, 1);
+INSERT INTO itemNotes VALUES (4, 1, '<p>Check the figures.</p>', 'Check the figures.');
+INSERT INTO itemAttachments VALUES
+    (3, 1, 0, 'application/pdf', 1, 'storage:paper.pdf', 0, 1704103260000, 'md5-attach01', NULL),
+    (5, 2, 2, 'application/pdf', NULL, 'attachments:linked.pdf', 0, NULL, NULL, NULL);
+INSERT INTO itemAnnotations VALUES (8, 3, 1, NULL, 'Highlighted', NULL, '#ffd400', '1', '00000|000000|00000', '{}', 0);
+INSERT INTO collections (collectionID, collectionName, parentCollectionID, libraryID, key) VALUES
+    (1, 'Review', NULL, 1, 'COLL0001'), (2, 'Background', 1, 1, 'COLL0002');
+INSERT INTO collectionItems VALUES (1, 1, 0), (1, 2, 1), (1, 6, 2), (2, 7, 0);
+INSERT INTO deletedItems VALUES (6, '2024-01-02 09:00:00');
+INSERT INTO fulltextItems VALUES (3, 1, 1, NULL, NULL, 0, 0);
+INSERT INTO syncDeleteLog VALUES (3, 1, 'GONE0001', '2024-01-02 10:00:00');